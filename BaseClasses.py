@@ -1,7 +1,9 @@
 import copy
 from enum import Enum, unique
 import logging
+import collections
 from collections import OrderedDict
+from Stats import stats
 from version import __version__ as OoTRVersion
 
 
@@ -19,6 +21,12 @@ class World(object):
         self._entrance_cache = {}
         self._location_cache = {}
         self.required_locations = []
+        # inventory slot -> the entrances and locations whose access rule may
+        # read it. Set up by Rules.set_rules, there are no rules before that
+        self.entrances_by_slot = {}
+        self.locations_by_slot = {}
+        # the location rules of a multiworld as arrays, see ReachMatrix
+        self.collection_matrix = None
 
         # dump settings directly into world's namespace
         # this gives the world an attribute for every setting listed in Settings.py
@@ -51,10 +59,11 @@ class World(object):
         ret.id = self.id
         from Regions import create_regions
         from Dungeons import create_dungeons
-        from Rules import set_rules
+        from Rules import set_rules, specialize_rules
         create_regions(ret)
         create_dungeons(ret)
         set_rules(ret)
+        specialize_rules(ret)
 
         # connect copied world
         for region in self.regions:
@@ -81,6 +90,17 @@ class World(object):
 
         return ret
 
+    # Saves the item at every location, so that changes to the placements can
+    # be undone with restore_placements. The regions, rules and items are all
+    # shared, which makes this much cheaper than copy() when only the
+    # placements are changed, as in create_playthrough
+    def save_placements(self):
+        return [(location, location.item) for location in self.get_locations()]
+
+    def restore_placements(self, placements):
+        for location, item in placements:
+            location.item = item
+
     def initialize_regions(self):
         for region in self.regions:
             region.world = self
@@ -220,131 +240,200 @@ class World(object):
         return id_value
 
 
+# Inventories are kept as a list of item counts. Every item name in
+# Items.item_table is interned to an index into that list. The first few slots
+# count whole groups of items that the logic asks about as a group, so those
+# checks do not have to look at every item either.
+BOTTLE_SLOT = 0
+NORMAL_BOTTLE_SLOT = 1 # every bottle except Ruto's Letter
+BOMBCHU_SLOT = 2
+GROUP_SLOT_COUNT = 3
+
+# item name -> index of its count in the inventory
+item_ids = {}
+# item name -> every inventory slot that collecting the item increments
+item_slots = {}
+
+def intern_item_table():
+    # Items imports this module, so the table can only be built once both are loaded
+    from Items import item_table
+    for name in item_table:
+        item_id = GROUP_SLOT_COUNT + len(item_ids)
+        item_ids[name] = item_id
+        slots = [item_id]
+        if name.startswith('Bottle'):
+            slots.append(BOTTLE_SLOT)
+            if name != 'Bottle with Letter':
+                slots.append(NORMAL_BOTTLE_SLOT)
+        if name.startswith('Bombchus'):
+            slots.append(BOMBCHU_SLOT)
+        item_slots[name] = tuple(slots)
+
+
+# An inventory that remembers which of its slots were read, see CollectionState.get_read_slots
+class RecordingCounts(list):
+
+    def __init__(self, counts):
+        super().__init__(counts)
+        self.read = set()
+
+    def __getitem__(self, index):
+        self.read.add(index)
+        return list.__getitem__(self, index)
+
+
 class CollectionState(object):
 
     def __init__(self, parent):
-        self.prog_items = []
+        if not item_ids:
+            intern_item_table()
+        self.prog_items = [0] * (GROUP_SLOT_COUNT + len(item_ids))
         self.world = parent
-        self.region_cache = {}
-        self.location_cache = {}
-        self.entrance_cache = {}
-        self.recursion_count = 0
-        self.collected_locations = []
-
-    def clear_cached_unreachable(self):
-        # we only need to invalidate results which were False, places we could reach before we can still reach after adding more items
-        self.region_cache = {k: v for k, v in self.region_cache.items() if v}
-        self.location_cache = {k: v for k, v in self.location_cache.items() if v}
-        self.entrance_cache = {k: v for k, v in self.entrance_cache.items() if v}
+        # every region that can be reached with the current items, see sweep_regions
+        self.reachable_regions = set()
+        # exits out of reachable regions whose access rule failed during the last sweep
+        self.blocked_exits = []
+        # what has to happen to the regions before they can be used again:
+        # None when they are up to date, 'grow' after items were added, 'rebuild' after items were removed
+        self.sweep_needed = 'rebuild'
+        # the inventory slots read by entrance rules that changed since the
+        # last sweep, or None if every blocked exit has to be tried again
+        self.grown_slots = None
+        # the names of the item locations whose items were collected
+        self.collected_locations = set()
+
+    # Call with the inventory slots that were added to, if known. Adding to a
+    # slot that no entrance rule reads does not change the regions at all
+    def clear_cached_unreachable(self, slots=None):
+        # we only need to look for new regions. places we could reach before we can still reach after adding more items
+        if self.sweep_needed == 'rebuild':
+            return
+        if slots is None:
+            self.sweep_needed = 'grow'
+            self.grown_slots = None
+            return
+
+        slots = [slot for slot in slots if slot in self.world.entrances_by_slot]
+        if not slots:
+            return
+        if self.sweep_needed is None:
+            self.sweep_needed = 'grow'
+            self.grown_slots = set(slots)
+        elif self.grown_slots is not None:
+            self.grown_slots.update(slots)
 
     def copy(self):
         ret = CollectionState(self.world)
         ret.prog_items = copy.copy(self.prog_items)
-        ret.region_cache = copy.copy(self.region_cache)
-        ret.location_cache = copy.copy(self.location_cache)
-        ret.entrance_cache = copy.copy(self.entrance_cache)
+        # a sweep always builds new containers, so these can be shared
+        ret.reachable_regions = self.reachable_regions
+        ret.blocked_exits = self.blocked_exits
+        ret.sweep_needed = self.sweep_needed
+        ret.grown_slots = copy.copy(self.grown_slots)
         ret.collected_locations = copy.copy(self.collected_locations)
         return ret
 
     def can_reach(self, spot, resolution_hint=None):
+        stats.can_reach_calls += 1
         try:
             spot_type = spot.spot_type
-            if spot_type == 'Location':
-                correct_cache = self.location_cache
-            elif spot_type == 'Region':
-                correct_cache = self.region_cache
-            elif spot_type == 'Entrance':
-                correct_cache = self.entrance_cache
-            else:
-                raise AttributeError
         except AttributeError:
             # try to resolve a name
             if resolution_hint == 'Location':
                 spot = self.world.get_location(spot)
-                correct_cache = self.location_cache
             elif resolution_hint == 'Entrance':
                 spot = self.world.get_entrance(spot)
-                correct_cache = self.entrance_cache
             else:
                 # default to Region
                 spot = self.world.get_region(spot)
-                correct_cache = self.region_cache
-
-        if spot.recursion_count > 0:
-            return False
+            spot_type = spot.spot_type
 
-        if spot not in correct_cache:
-            # for the purpose of evaluating results, recursion is resolved by always denying recursive access (as that ia what we are trying to figure out right now in the first place
-            spot.recursion_count += 1
-            self.recursion_count += 1
-            can_reach = spot.can_reach(self)
-            spot.recursion_count -= 1
-            self.recursion_count -= 1
-
-            # we only store qualified false results (i.e. ones not inside a hypothetical)
-            if not can_reach:
-                if self.recursion_count == 0:
-                    correct_cache[spot] = can_reach
+        if spot_type == 'Region':
+            if self.sweep_needed is not None:
+                self.sweep_regions()
             else:
-                correct_cache[spot] = can_reach
-            return can_reach
-        return correct_cache[spot]
+                stats.region_cache_hits += 1
+            return spot in self.reachable_regions
+        # Locations and Entrances only need their own rule on top of their region
+        return spot.can_reach(self)
+
+    # Finds every region that can be reached with the current items by walking
+    # the region graph forward from Links House, the default save&quit point.
+    #
+    # Access rules may themselves ask whether some region can be reached. While
+    # the sweep is running, those questions are answered with the regions found
+    # so far, so the exits that were blocked are tried again every time the
+    # sweep finds something new, until it stops growing. Only the exits whose
+    # rules look at the regions have to be tried again for that, the others
+    # stay blocked until an item their rules read is collected.
+    def sweep_regions(self):
+        stats.region_sweeps += 1
+        # exits that stay blocked until the inventory changes
+        waiting = []
+        if self.sweep_needed == 'rebuild':
+            start_region = self.world.get_region('Links House')
+            reachable = {start_region}
+            exits = list(start_region.exits)
+        else:
+            # adding items never makes a region unreachable, so continue from the last sweep
+            reachable = set(self.reachable_regions)
+            if self.grown_slots is None:
+                exits = self.blocked_exits
+            else:
+                changed = set()
+                for slot in self.grown_slots:
+                    changed.update(self.world.entrances_by_slot[slot])
+                exits = []
+                for exit in self.blocked_exits:
+                    if exit.rule_reads_world or exit in changed:
+                        exits.append(exit)
+                    else:
+                        waiting.append(exit)
+
+        self.reachable_regions = reachable
+        self.sweep_needed = None
+        self.grown_slots = None
+
+        grown = True
+        while grown:
+            grown = False
+            blocked = []
+            queue = collections.deque(exits)
+            while queue:
+                exit = queue.popleft()
+                region = exit.connected_region
+                if region is None or region in reachable:
+                    continue
+                if exit.access_rule(self):
+                    reachable.add(region)
+                    queue.extend(region.exits)
+                    grown = True
+                elif exit.rule_constant is False:
+                    # never opens, so there is no point in keeping it around
+                    continue
+                elif exit.rule_reads_world:
+                    blocked.append(exit)
+                else:
+                    waiting.append(exit)
+            exits = blocked
+
+        self.blocked_exits = waiting + exits
 
     def has(self, item, count=1):
-        if count == 1:
-            return item in self.prog_items
-        return self.item_count(item) >= count
+        try:
+            return self.prog_items[item_ids[item]] >= count
+        except KeyError:
+            # not an item that exists in this game, e.g. the gauntlets before they became progressive
+            return False
 
     def item_count(self, item):
-        return len([pritem for pritem in self.prog_items if pritem == item])
-
-    def is_adult(self):
-        return self.has('Master Sword')
-
-    def has_ocarina(self):
-        return (self.has('Ocarina') or self.has("Fairy Ocarina") or self.has("Ocarina of Time"))
-
-    def can_play(self, song):
-        return self.has_ocarina() and self.has(song)
-
-    def has_bombchus(self):
-        return (self.world.bombchus_in_logic and \
-                    (any(pritem.startswith('Bombchus') for pritem in self.prog_items) \
-                    or (self.has('Progressive Wallet') and self.can_reach('Haunted Wasteland')))) \
-            or (not self.world.bombchus_in_logic and self.has('Bomb Bag'))
-
-    def has_explosives(self):
-        return self.has('Bomb Bag') or self.has_bombchus()
-
-    def can_blast_or_smash(self):
-        return self.has('Bomb Bag') or (self.is_adult() and self.has('Hammer')) or self.has_bombchus()
-
-    def can_dive(self):
-        return self.has('Progressive Scale')
-
-    def can_lift_rocks(self):
-        return (self.has('Silver Gauntlets') or self.has('Gold Gauntlets')) and self.is_adult()
-
-    def can_see_with_lens(self):
-        return ((self.has('Magic Meter') and self.has('Lens of Truth')) or self.world.logic_lens != 'all')
-
-    def has_GoronTunic(self):
-        return (self.has('Goron Tunic') or (self.has('Progressive Wallet') and (self.has_explosives() or self.has('Progressive Strength Upgrade') or self.has('Bow'))))
-
-    def has_ZoraTunic(self):
-        return (self.has('Zora Tunic') or (self.has('Progressive Wallet', 2) and self.has_bottle() and self.can_play('Zeldas Lullaby')))
-
-    def can_finish_adult_trades(self):
-        zora_thawed = self.has_bottle() and self.has('Zeldas Lullaby') and (self.can_reach('Ice Cavern') or self.can_reach('Ganons Castle Water Trial') or self.has('Progressive Wallet', 2))
-        carpenter_access = self.has('Epona') or self.has('Progressive Hookshot', 2)
-        return (self.has('Claim Check') or ((self.has('Eyedrops') or self.has('Eyeball Frog') or self.has('Prescription') or self.has('Broken Sword')) and zora_thawed) or ((self.has('Poachers Saw') or self.has('Odd Mushroom') or self.has('Cojiro') or self.has('Pocket Cucco') or self.has('Pocket Egg')) and zora_thawed and carpenter_access))
-
-    def has_bottle(self):
-        is_normal_bottle = lambda item: (item.startswith('Bottle') and item != 'Bottle with Letter')
-        return any(is_normal_bottle(pritem) for pritem in self.prog_items)
+        try:
+            return self.prog_items[item_ids[item]]
+        except KeyError:
+            return 0
 
     def bottle_count(self):
-        return len([pritem for pritem in self.prog_items if pritem.startswith('Bottle')])
+        return self.prog_items[BOTTLE_SLOT]
 
     def has_hearts(self, count):
         # Warning: This only considers items that are marked as advancement items
@@ -358,54 +447,45 @@ class CollectionState(object):
             + 3 # starting hearts
         )
 
-    def can_lift_pillars(self):
-        return self.has('Gold Gauntlets') and self.is_adult()
+    def collect(self, item):
+        if self.add_item(item):
+            self.clear_cached_unreachable(item_slots[item.name])
 
-    def has_fire_source(self):
-        return ((self.has('Dins Fire') or (self.has('Bow') and self.has('Fire Arrows') and self.is_adult())) and self.has('Magic Meter'))
+    # Collects every item in the list, only invalidating the cache once at the end
+    def collect_all(self, items):
+        changed = set()
+        for item in items:
+            if self.add_item(item):
+                changed.update(item_slots[item.name])
 
-    def guarantee_hint(self):
-        if(self.world.hints == 'mask'):
-            # has the mask of truth
-            return self.has('Zeldas Letter') and self.has('Sarias Song') and self.has('Kokiri Emerald') and self.has('Goron Ruby') and self.has('Zora Sapphire')
-        elif(self.world.hints == 'agony'):
-            # has the stone of agony
-            return self.has('Stone of Agony')
-        return True
+        if changed:
+            self.clear_cached_unreachable(changed)
 
-    def nighttime(self):
-        if self.world.logic_no_night_tokens_without_suns_song:
-            return self.has('Suns Song')
-        return True
+    # Adds the item to the inventory without touching the cache. Returns True if the inventory changed
+    def add_item(self, item):
+        slots = item_slots[item.name]
+        if BOTTLE_SLOT in slots:
+            if self.bottle_count() >= 4:
+                return False
+        elif not item.advancement:
+            return False
 
-    def collect(self, item):
-        changed = False
-        if item.name.startswith('Bottle'):
-            if self.bottle_count() < 4:
-                self.prog_items.append(item.name)
-                changed = True
-        elif item.advancement:
-            self.prog_items.append(item.name)
-            changed = True
+        for slot in slots:
+            self.prog_items[slot] += 1
+        return True
 
-        if changed:
-            self.clear_cached_unreachable()
-            
     def remove(self, item):
         if item.advancement:
-            to_remove = item.name
-
-            if to_remove is not None:
-                try:
-                    self.prog_items.remove(to_remove)
-                except ValueError:
-                    return
+            slots = item_slots[item.name]
+            if self.prog_items[slots[0]] == 0:
+                return
+            for slot in slots:
+                self.prog_items[slot] -= 1
 
-                # invalidate collected cache. unreachable locations are still unreachable
-                self.region_cache =   {k: v for k, v in self.region_cache.items() if not v}
-                self.location_cache = {k: v for k, v in self.location_cache.items() if not v}
-                self.entrance_cache = {k: v for k, v in self.entrance_cache.items() if not v}
-                self.recursion_count = 0
+            # regions may have become unreachable, so sweep again from the start.
+            # That is, unless no entrance rule reads the item
+            if any(slot in self.world.entrances_by_slot for slot in slots):
+                self.sweep_needed = 'rebuild'
 
     def __getattr__(self, item):
         if item.startswith('can_reach_'):
@@ -435,39 +515,103 @@ class CollectionState(object):
     # all new items that become accessible with a new item set
     @staticmethod
     def collect_locations(state_list):
-        # Get all item locations in the worlds
-        item_locations = [location for state in state_list for location in state.world.get_filled_locations() if location.item.advancement]
+        # with numpy, the rules of several worlds are checked much faster as arrays
+        import ReachMatrix
+        if ReachMatrix.available(state_list):
+            return ReachMatrix.CollectionMatrix.get(state_list).collect_locations(state_list)
+
+        # Get all item locations in the worlds that are still to be collected
+        item_locations = [location for state in state_list for location in state.world.get_filled_locations()
+            if location.item.advancement and location.rule_constant is not False and location.name not in state.collected_locations]
+
+        # locations in a reachable region whose rule failed. Their rules only
+        # have to be checked again once an item they read has been collected
+        blocked = set()
+        unblocked = [set() for state in state_list]
 
         # will loop if there is more items opened up in the previous iteration. Always run once
+        collected_item_locations = []
         reachable_items_locations = True
         while reachable_items_locations:
-            # get reachable new items locations
-            reachable_items_locations = [location for location in item_locations if location.name not in state_list[location.world.id].collected_locations and state_list[location.world.id].can_reach(location)]
+            # get reachable new items locations. The others are left for the next round
+            reachable_items_locations = []
+            remaining_locations = []
+            for location in item_locations:
+                state = state_list[location.world.id]
+                if location in blocked and location not in unblocked[location.world.id]:
+                    remaining_locations.append(location)
+                elif not state.can_reach(location.parent_region):
+                    remaining_locations.append(location)
+                elif location.access_rule(state):
+                    reachable_items_locations.append(location)
+                else:
+                    if not location.rule_reads_world:
+                        blocked.add(location)
+                    remaining_locations.append(location)
+            item_locations = remaining_locations
+
+            unblocked = [set() for state in state_list]
             for location in reachable_items_locations:
                 # Mark the location collected in the state world it exists in
-                state_list[location.world.id].collected_locations.append(location.name)
+                state_list[location.world.id].collected_locations.add(location.name)
                 # Collect the item for the state world it is for
-                state_list[location.item.world.id].collect(location.item)
+                item = location.item
+                state_list[item.world.id].collect(item)
+                for slot in item_slots[item.name]:
+                    unblocked[item.world.id].update(item.world.locations_by_slot.get(slot, ()))
+            collected_item_locations.extend(reachable_items_locations)
+
+        # the order the locations were collected in
+        return collected_item_locations
 
 
     # This removes all item locations collected in the state list given that
     # the states have collected items. The purpose is that it will search for
-    # all new items that become no longer accessible with a removed item
+    # all new items that become no longer accessible with a removed item.
+    # If the items that were removed are given, only the rules that read them
+    # are checked again, the others can't have changed
     @staticmethod
-    def remove_locations(state_list):
-        # Get all item locations in the worlds
-        item_locations = [location for state in state_list for location in state.world.get_filled_locations() if location.item.advancement]
+    def remove_locations(state_list, removed_items=None):
+        # Get all item locations in the worlds that were collected
+        item_locations = [location for state in state_list for location in state.world.get_filled_locations()
+            if location.item.advancement and location.name in state.collected_locations]
+
+        if removed_items is None:
+            recheck = None
+        else:
+            recheck = CollectionState.get_rules_reading(state_list, removed_items)
 
         # will loop if there is more items removed in the previous iteration. Always run once
         unreachable_items_locations = True
         while unreachable_items_locations:
             # get unreachable new items locations
-            unreachable_items_locations = [location for location in item_locations if location.name in state_list[location.world.id].collected_locations and not state_list[location.world.id].can_reach(location)]
+            unreachable_items_locations = []
+            remaining_locations = []
+            for location in item_locations:
+                state = state_list[location.world.id]
+                if not state.can_reach(location.parent_region):
+                    unreachable_items_locations.append(location)
+                elif (recheck is None or location.rule_reads_world or location in recheck[location.world.id]) and not location.access_rule(state):
+                    unreachable_items_locations.append(location)
+                else:
+                    remaining_locations.append(location)
+            item_locations = remaining_locations
+
             for location in unreachable_items_locations:
                 # Mark the location uncollected in the state world it exists in
-                state_list[location.world.id].collected_locations.remove(location.name)
+                state_list[location.world.id].collected_locations.discard(location.name)
                 # Remove the item for the state world it is for
                 state_list[location.item.world.id].remove(location.item)
+            recheck = CollectionState.get_rules_reading(state_list, [location.item for location in unreachable_items_locations])
+
+    # Returns for every state the locations whose rules read any of the items
+    @staticmethod
+    def get_rules_reading(state_list, items):
+        locations = [set() for state in state_list]
+        for item in items:
+            for slot in item_slots[item.name]:
+                locations[item.world.id].update(item.world.locations_by_slot.get(slot, ()))
+        return locations
 
 
     # This returns True is every state is beatable. It's important to ensure
@@ -496,27 +640,65 @@ class CollectionState(object):
                 return False
         return True
 
+    # Returns for every state the set of inventory slots read by the rules
+    # while sweeping the regions from scratch and checking every filled
+    # location. Rules only look at the inventory through prog_items, and they
+    # read the same slots in the same order as long as the counts they read are
+    # the same. So changing a count that was not read changes no rule at all
+    @staticmethod
+    def get_read_slots(state_list):
+        recording_states = []
+        for state in state_list:
+            recording_state = state.copy()
+            recording_state.prog_items = RecordingCounts(state.prog_items)
+            recording_state.sweep_needed = 'rebuild'
+            recording_states.append(recording_state)
+
+        for state in recording_states:
+            for location in state.world.get_filled_locations():
+                state.can_reach(location)
+        return [state.prog_items.read for state in recording_states]
+
     @staticmethod
     def update_required_items(worlds):
         state_list = [CollectionState(world) for world in worlds]
         CollectionState.collect_locations(state_list)
 
         item_locations = []
-        if not worlds[0].spoiler.playthrough:
+        # The playthrough used to be built on copies of the worlds. Those copies
+        # did not keep the event flag of a location, and emptying one of their
+        # locations did not empty it in the worlds. Playthrough locations are
+        # still checked that way, so that the required locations (and the hints
+        # based on them) stay the same for a seed
+        from_playthrough = bool(worlds[0].spoiler.playthrough)
+        if not from_playthrough:
             item_locations = [location for world in worlds for location in world.get_filled_locations() 
                 if location.item.advancement and location.item.type != 'Event' and not location.event and (worlds[0].settings.keysanity or not location.item.key)]
         else:
             item_locations = [location for _,sphere in worlds[0].spoiler.playthrough.items() for location in sphere
-                    if location.item.type != 'Event' and not location.event and (worlds[0].settings.keysanity or not location.item.key)]
+                    if location.item.type != 'Event' and (worlds[0].settings.keysanity or not location.item.key)]
+
+        # An item whose count no rule reads with everything collected can't
+        # change the result of any rule, so taking it away leaves every state
+        # as it is. That only proves it is not required if the game is beaten
+        # with everything collected, which it always should be
+        if CollectionState.can_beat_game(state_list, False):
+            read_slots = CollectionState.get_read_slots(state_list)
+        else:
+            read_slots = None
 
         required_locations = []
         for location in item_locations:
             old_item = location.item
+            if read_slots is not None and not any(slot in read_slots[old_item.world.id] for slot in item_slots[old_item.name]):
+                continue
+
             new_state_list = [state.copy() for state in state_list]
 
-            location.item = None
+            if not from_playthrough:
+                location.item = None
             new_state_list[old_item.world.id].remove(old_item)
-            CollectionState.remove_locations(new_state_list)
+            CollectionState.remove_locations(new_state_list, [old_item])
 
             if not CollectionState.can_beat_game(new_state_list):
                 required_locations.append(location)
@@ -550,13 +732,9 @@ class Region(object):
         self.dungeon = None
         self.world = None
         self.spot_type = 'Region'
-        self.recursion_count = 0
 
     def can_reach(self, state):
-        for entrance in self.entrances:
-            if state.can_reach(entrance):
-                return True
-        return False
+        return state.can_reach(self)
 
     def can_fill(self, item):
         if self.world.keysanity:
@@ -582,15 +760,21 @@ class Entrance(object):
         self.target = None
         self.addresses = None
         self.spot_type = 'Entrance'
-        self.recursion_count = 0
         self.vanilla = None
         self.access_rule = lambda state: True
+        # the parsed access rule and what it looks at, see Rules.set_rule.
+        # There is no rule to parse until one is set
+        self.rule = None
+        self.rule_slots = frozenset()
+        self.rule_reads_world = False
+        self.rule_names = frozenset()
+        # True or False if the rule does not depend on the state, see Rules.specialize_rules
+        self.rule_constant = None
 
     def can_reach(self, state):
-        if self.access_rule(state) and state.can_reach(self.parent_region):
-            return True
-
-        return False
+        if self.rule_constant is False:
+            return False
+        return state.can_reach(self.parent_region) and self.access_rule(state)
 
     def connect(self, region, addresses=None, target=None, vanilla=None):
         self.connected_region = region
@@ -633,6 +817,11 @@ class Dungeon(object):
         return '%s' % self.name
 
 
+FILL_NEVER = 0
+FILL_ALLOWED = 1
+FILL_ALWAYS = 2
+
+
 class Location(object):
 
     def __init__(self, name='', address=None, address2=None, default=None, type='Chest', scene=None, hint='Termina', parent=None):
@@ -646,23 +835,53 @@ class Location(object):
         self.scene = scene
         self.hint = hint
         self.spot_type = 'Location'
-        self.recursion_count = 0
         self.staleness_count = 0
         self.always_allow = lambda item, state: False
         self.access_rule = lambda state: True
+        # the parsed access rule and what it looks at, see Rules.set_rule.
+        # There is no rule to parse until one is set
+        self.rule = None
+        self.rule_slots = frozenset()
+        self.rule_reads_world = False
+        self.rule_names = frozenset()
+        # True or False if the rule does not depend on the state, see Rules.specialize_rules
+        self.rule_constant = None
         self.item_rule = lambda item: True
+        # item kind -> (fill, fast) for the items that were checked here, see allowed_item
+        self.allowed_items = {}
         self.event = False
 
     def can_fill(self, state, item, check_access=True):
-        return self.always_allow(item, self) or (self.parent_region.can_fill(item) and self.item_rule(item) and (not check_access or self.can_reach(state)))
+        fill = self.allowed_item(item)[0]
+        return fill == FILL_ALWAYS or (fill == FILL_ALLOWED and (not check_access or self.can_reach(state)))
 
     def can_fill_fast(self, item):
-        return self.item_rule(item)
+        return self.allowed_item(item)[1]
+
+    # Whether the item may be placed here, which only depends on the kind of
+    # the item and the rules of the world, so it is worked out once per kind.
+    # fill is FILL_ALWAYS if always_allow lets it in without a reachability
+    # check, FILL_ALLOWED if the location must also be reachable and
+    # FILL_NEVER otherwise. fast is just the item rule, see can_fill_fast.
+    # Rules.add_item_rule and friends clear the table when the rules change
+    def allowed_item(self, item):
+        kind = item.kind
+        allowed = self.allowed_items.get(kind)
+        if allowed is None:
+            fast = bool(self.item_rule(item))
+            if self.always_allow(item, self):
+                fill = FILL_ALWAYS
+            elif self.parent_region.can_fill(item) and fast:
+                fill = FILL_ALLOWED
+            else:
+                fill = FILL_NEVER
+            allowed = self.allowed_items[kind] = (fill, fast)
+        return allowed
 
     def can_reach(self, state):
-        if self.access_rule(state) and state.can_reach(self.parent_region):
-            return True
-        return False
+        if self.rule_constant is False:
+            return False
+        return state.can_reach(self.parent_region) and self.access_rule(state)
 
     def __str__(self):
         return str(self.__unicode__())
@@ -685,6 +904,13 @@ class Item(object):
     def copy(self):
         return Item(self.name, self.advancement, self.priority, self.type, self.code, self.index)
 
+    # Item rules only look at the name, type and world of an item, so items
+    # with the same name and world can go in the same locations. The fixed
+    # items of generate_itempool are placed without a world
+    @property
+    def kind(self):
+        return (self.name, self.world.id if hasattr(self, 'world') else None)
+
     @property
     def key(self):
         return self.type == 'SmallKey' or self.type == 'BossKey'
@@ -717,6 +943,7 @@ class Spoiler(object):
         self.locations = {}
         self.metadata = {}
         self.required_locations = {}
+        self.hints = ''
 
     def set_entrance(self, entrance, exit, direction):
         self.entrances.append(OrderedDict([('entrance', entrance), ('exit', exit), ('direction', direction)]))
@@ -760,9 +987,7 @@ class Spoiler(object):
             else:
                 outfile.write('\n'.join(['%s: %s' % (location.name, location.item.name) for location in self.required_locations]))
 
-            f = open('hints.txt','r')
             outfile.write('\n\n')
-            outfile.write(f.read())
-            f.close()
+            outfile.write(self.hints)
             
             
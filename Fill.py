@@ -1,13 +1,23 @@
 import random
 import logging
-from BaseClasses import CollectionState
+from collections import deque
+from BaseClasses import CollectionState, BOTTLE_SLOT, item_slots
+from Stats import stats
 
 class FillError(RuntimeError):
     pass
 
 
 # Places all items into the world
-def distribute_items_restrictive(worlds, fill_locations=None):
+# fill_mode selects how fill_restrictive computes its maximum exploration
+# states: 'incremental' keeps them up to date as items are removed from the
+# pool, 'rebuild' recomputes them from scratch for every item. Both place items
+# identically. Defaults to the fill_mode setting
+def distribute_items_restrictive(worlds, fill_locations=None, fill_mode=None):
+    if fill_mode is None:
+        fill_mode = worlds[0].fill_mode or 'incremental'
+    incremental = fill_mode == 'incremental'
+
     song_locations = [world.get_location(location) for world in worlds for location in
         ['Song from Composer Grave', 'Impa at Castle', 'Song from Malon', 'Song from Saria', 
         'Song from Ocarina of Time', 'Song at Windmill', 'Sheik Forest Song', 'Sheik at Temple', 
@@ -37,7 +47,8 @@ def distribute_items_restrictive(worlds, fill_locations=None):
     else:
         # place dungeon items
         random.shuffle(fill_locations)
-        fill_dungeons_restrictive(worlds, fill_locations, itempool + songitempool)
+        with stats.phase('fill_dungeons'):
+            fill_dungeons_restrictive(worlds, fill_locations, itempool + songitempool, incremental)
 
     # I have no idea why the locations are reversed but this is how it was, 
     # so whatever. It can't hurt I guess
@@ -50,26 +61,30 @@ def distribute_items_restrictive(worlds, fill_locations=None):
     # Placing songs on their own since they have a relatively high chance
     # of failing compared to other item type. So this way we only have retry
     # the song locations only.
-    fill_songs(worlds, song_locations, songitempool, progitempool)
+    with stats.phase('fill_songs'):
+        fill_songs(worlds, song_locations, songitempool, progitempool, incremental=incremental)
 
     # Place all progression items. This will include keys in keysanity.
     # Items in this group will check for reachability and will be placed
     # such that the game is guaranteed beatable.
     random.shuffle(fill_locations)
-    fill_restrictive(worlds, [world.state for world in worlds], fill_locations, progitempool)
+    with stats.phase('fill_progression'):
+        fill_restrictive(worlds, [world.state for world in worlds], fill_locations, progitempool, incremental)
 
     # Place all priority items.
     # These items are items that only check if the item is allowed to be
     # placed in the location, not checking reachability. This is important
     # for things like Ice Traps that can't be found at some locations
     random.shuffle(fill_locations)
-    fill_restrictive_fast(worlds, fill_locations, prioitempool)
+    with stats.phase('fill_priority'):
+        fill_restrictive_fast(worlds, fill_locations, prioitempool)
 
     # Place the rest of the items.
     # No restrictions at all. Places them completely randomly. Since they
     # cannot affect the beatability, we don't need to check them
     random.shuffle(fill_locations)
-    fast_fill(fill_locations, restitempool)
+    with stats.phase('fill_rest'):
+        fast_fill(fill_locations, restitempool)
 
     # Log unplaced item/location warnings
     for item in progitempool + prioitempool + restitempool:
@@ -82,7 +97,7 @@ def distribute_items_restrictive(worlds, fill_locations=None):
 
 # Places all dungeon items into the worlds. To ensure there is room for them.
 # they are placed first so it will assume all other items are reachable
-def fill_dungeons_restrictive(worlds, shuffled_locations, itempool):
+def fill_dungeons_restrictive(worlds, shuffled_locations, itempool, incremental=True):
     # List of states with all non-key items
     all_state_base_list = CollectionState.get_states_with_items([world.state for world in worlds], itempool)
     # list of all dungeon items to be placed
@@ -97,14 +112,14 @@ def fill_dungeons_restrictive(worlds, shuffled_locations, itempool):
     dungeon_items.sort(key=lambda item: sort_order.get(item.type, 1))
 
     # place dungeon items
-    fill_restrictive(worlds, all_state_base_list, shuffled_locations, dungeon_items)
+    fill_restrictive(worlds, all_state_base_list, shuffled_locations, dungeon_items, incremental)
 
     for world in worlds:
         world.state.clear_cached_unreachable()
 
 
 # Places the songs into the world at the Song locations
-def fill_songs(worlds, locations, songpool, itempool, attempts=15):
+def fill_songs(worlds, locations, songpool, itempool, attempts=15, incremental=True):
     # get the song locations for each world
 
     # look for preplaced items
@@ -122,7 +137,7 @@ def fill_songs(worlds, locations, songpool, itempool, attempts=15):
             prize_locs = list(empty_song_locations)
             random.shuffle(prizepool)
             random.shuffle(prize_locs)
-            fill_restrictive(worlds, all_state_base_list, prize_locs, prizepool)
+            fill_restrictive(worlds, all_state_base_list, prize_locs, prizepool, incremental)
         except FillError as e:
             logging.getLogger('').info("Failed to place songs. Will retry %s more times", attempts)
             for location in empty_song_locations:
@@ -143,74 +158,278 @@ def fill_songs(worlds, locations, songpool, itempool, attempts=15):
 # This means we first assume we have every item in the item pool and
 # remove an item and try to place it somewhere that is still reachable
 # This method helps distribution of items locked behind many requirements
-def fill_restrictive(worlds, base_state_list, locations, itempool):
-    # loop until there are no items or locations
-    while itempool and locations:
-        # get and item and remove it from the itempool
-        item_to_place = itempool.pop()
-
-        # generate the max states that include every remaining item
-        # this will allow us to place this item in a reachable location
-        maximum_exploration_state_list = CollectionState.get_states_with_items(base_state_list, itempool)     
-
-        # perform_access_check checks location reachability
-        perform_access_check = True
-        if worlds[0].check_beatable_only:
-            # if any world can not longer be beatable with the remaining items
-            # then we must check for reachability no matter what.
-            # This way the reachability test is monotonic. If we were to later
-            # stop checking, then we could place an item needed in one world
-            # in an unreachable place in another world
-            perform_access_check = not CollectionState.can_beat_game(maximum_exploration_state_list)
-
-        # find a location that the item can be places. It must be a valid location
-        # in the world we are placing it (possibly checking for reachability)
-        spot_to_fill = None
-        for location in locations:
-            if location.can_fill(maximum_exploration_state_list[location.world.id], item_to_place, perform_access_check):
-                spot_to_fill = location
+#
+# If incremental is set, the max states are kept up to date by an
+# IncrementalExploration instead of being rebuilt from scratch for every item.
+# The resulting states are identical, so the placements are as well
+def fill_restrictive(worlds, base_state_list, locations, itempool, incremental=True):
+    if incremental:
+        exploration = IncrementalExploration(base_state_list, itempool)
+
+    # the filled locations are only marked as placed while filling, as taking
+    # each one out of the list would shift everything behind it. The leading
+    # placed locations are skipped, and the list is compacted once half of it
+    # is placed. They are taken out at the end, even if placing an item fails
+    open_locations = list(locations)
+    placed = set()
+    first_open = 0
+
+    try:
+        # loop until there are no items or locations
+        while itempool and len(placed) < len(open_locations):
+            # get and item and remove it from the itempool
+            item_to_place = itempool.pop()
+
+            # generate the max states that include every remaining item
+            # this will allow us to place this item in a reachable location
+            if incremental:
+                maximum_exploration_state_list = exploration.get_states()
+            else:
+                maximum_exploration_state_list = CollectionState.get_states_with_items(base_state_list, itempool)
+
+            # perform_access_check checks location reachability
+            perform_access_check = True
+            if worlds[0].check_beatable_only:
+                # if any world can not longer be beatable with the remaining items
+                # then we must check for reachability no matter what.
+                # This way the reachability test is monotonic. If we were to later
+                # stop checking, then we could place an item needed in one world
+                # in an unreachable place in another world
+                perform_access_check = not CollectionState.can_beat_game(maximum_exploration_state_list)
+
+            # find a location that the item can be places. It must be a valid location
+            # in the world we are placing it (possibly checking for reachability)
+            spot_to_fill = None
+            for index in range(first_open, len(open_locations)):
+                location = open_locations[index]
+                if location not in placed and location.can_fill(maximum_exploration_state_list[location.world.id], item_to_place, perform_access_check):
+                    spot_to_fill = location
+                    break
+
+            # if we failed to find a suitable location, then stop placing items
+            if spot_to_fill is None:
+                # Maybe the game can be beaten anyway?
+                if not CollectionState.can_beat_game(maximum_exploration_state_list):
+                    raise FillError('Game unbeatable: No more spots to place %s [World %d]' % (item_to_place, item_to_place.world.id))
+
+                if not worlds[0].check_beatable_only:
+                    logging.getLogger('').warning('Not all items placed. Game beatable anyway.')
                 break
 
-        # if we failed to find a suitable location, then stop placing items
-        if spot_to_fill is None:
-            # Maybe the game can be beaten anyway?
-            if not CollectionState.can_beat_game(maximum_exploration_state_list):
-                raise FillError('Game unbeatable: No more spots to place %s [World %d]' % (item_to_place, item_to_place.world.id))
-
-            if not worlds[0].check_beatable_only:
-                logging.getLogger('').warning('Not all items placed. Game beatable anyway.')
-            break
-            
-        # Place the item in the world and continue
-        spot_to_fill.world.push_item(spot_to_fill, item_to_place)
-        locations.remove(spot_to_fill)
+            # Place the item in the world and continue
+            spot_to_fill.world.push_item(spot_to_fill, item_to_place)
+            placed.add(spot_to_fill)
+            while first_open < len(open_locations) and open_locations[first_open] in placed:
+                first_open += 1
+            if len(placed) * 2 > len(open_locations):
+                open_locations = [location for location in open_locations if location not in placed]
+                placed = set()
+                first_open = 0
+    finally:
+        locations[:] = [location for location in open_locations if location not in placed]
+
+
+# Maintains the maximum exploration states used by fill_restrictive.
+#
+# Rebuilding them from scratch means copying every state and collecting the
+# whole remaining pool item by item, then sweeping every filled location round
+# by round until nothing new is found. Instead, the base states with every item
+# of the pool are kept across calls, and each item that leaves the pool is
+# simply removed from them.
+#
+# The sweep itself is the same as collect_locations: every round collects the
+# locations that can be reached with the items of the rounds before, in the
+# same order. But it remembers the round each location was collected in. A
+# location collected in round n last time had its rule met with the items of
+# the rounds before it. If its rule reads none of the items that have gone
+# missing since, it is still met from round n on, and isn't checked again. The
+# items that went missing are the ones removed from the pool, and those of the
+# locations not collected again by the round they were collected in last time.
+# The rules reading them are found with locations_by_slot. Regions are always
+# checked, as they are swept again after a removal anyway.
+#
+# Bottles are counted up to a limit, so which of them count depends on the
+# order they are collected in. Rules reading bottles are always checked.
+#
+# The result is the same collected locations and items, in the same order, as
+# get_states_with_items would produce. Checking the previously collected
+# locations only for whether they are still reachable would not be, as a
+# location could then keep itself reachable with its own item, like a small
+# key behind the door it opens.
+class IncrementalExploration(object):
+
+    def __init__(self, base_state_list, itempool):
+        self.base_state_list = base_state_list
+        # this is the list fill_restrictive pops items from, so it always
+        # holds exactly the items that are still in the pool
+        self.itempool = itempool
+        # the base states with every item in pool_items collected
+        self.pool_state_list = None
+        self.pool_items = []
+        # location -> the round of the last sweep it was collected in, and
+        # the locations collected in each round
+        self.collected_rounds = {}
+        self.round_locations = []
+        self.bottle_slots = frozenset(slot for slots in item_slots.values() if BOTTLE_SLOT in slots for slot in slots)
+
+    # Brings the pool states up to date with the pool, and returns the items
+    # that have left it. Items only ever leave the pool from its end. Removing a
+    # bottle does not always undo collecting it, so the states are built again
+    # from scratch for those
+    def update_pool_states(self):
+        removed_items = self.pool_items[len(self.itempool):]
+        if self.pool_state_list is None or any(BOTTLE_SLOT in item_slots[item.name] for item in removed_items):
+            self.pool_state_list = []
+            for base_state in self.base_state_list:
+                new_state = base_state.copy()
+                new_state.collect_all([item for item in self.itempool if item.world.id == base_state.world.id])
+                self.pool_state_list.append(new_state)
+        else:
+            for item in removed_items:
+                self.pool_state_list[item.world.id].remove(item)
+        self.pool_items = list(self.itempool)
+        return removed_items
+
+    def get_states(self):
+        removed_items = self.update_pool_states()
+        state_list = [pool_state.copy() for pool_state in self.pool_state_list]
+
+        # the locations whose rules read an item that has gone missing
+        recheck = CollectionState.get_rules_reading(state_list, removed_items)
+
+        item_locations = [location for state in state_list for location in state.world.get_filled_locations()
+            if location.item.advancement and location.rule_constant is not False and location.name not in state.collected_locations]
+
+        # locations in a reachable region whose rule failed. Their rules only
+        # have to be checked again once an item they read has been collected
+        blocked = set()
+        collected_slots = [set() for state in state_list]
+
+        collected_rounds = {}
+        round_locations = []
+        sweep_round = 0
+        # will loop if there is more items opened up in the previous iteration. Always run once
+        reachable_items_locations = True
+        while reachable_items_locations:
+            for state in state_list:
+                if state.sweep_needed is not None:
+                    state.sweep_regions()
+
+            reachable_items_locations = []
+            remaining_locations = []
+            for location in item_locations:
+                state = state_list[location.world.id]
+                if location.parent_region not in state.reachable_regions:
+                    remaining_locations.append(location)
+                elif self.collected_rounds.get(location, sweep_round + 1) <= sweep_round and not location.rule_reads_world and \
+                     location not in recheck[location.world.id] and self.bottle_slots.isdisjoint(location.rule_slots):
+                    reachable_items_locations.append(location)
+                elif location in blocked and collected_slots[location.world.id].isdisjoint(location.rule_slots):
+                    remaining_locations.append(location)
+                elif location.access_rule(state):
+                    reachable_items_locations.append(location)
+                else:
+                    if not location.rule_reads_world:
+                        blocked.add(location)
+                    remaining_locations.append(location)
+            item_locations = remaining_locations
+
+            collected_items = [[] for state in state_list]
+            for location in reachable_items_locations:
+                # Mark the location collected in the state world it exists in
+                state_list[location.world.id].collected_locations.add(location.name)
+                # Collect the item for the state world it is for
+                collected_items[location.item.world.id].append(location.item)
+                collected_rounds[location] = sweep_round
+            collected_slots = [set() for state in state_list]
+            for state, items, slots in zip(state_list, collected_items, collected_slots):
+                state.collect_all(items)
+                for item in items:
+                    slots.update(item_slots[item.name])
+            round_locations.append(reachable_items_locations)
+
+            # the items of the locations collected by this round last time, but not this time
+            if sweep_round < len(self.round_locations):
+                missing = [location.item for location in self.round_locations[sweep_round] if location not in collected_rounds]
+                for world_recheck, world_locations in zip(recheck, CollectionState.get_rules_reading(state_list, missing)):
+                    world_recheck.update(world_locations)
+            sweep_round += 1
+
+        self.collected_rounds = collected_rounds
+        self.round_locations = round_locations
+        return state_list
 
 
 # This places items in the itempool into the locations
 # It does not check for reachability, only that the item is
 # allowed in the location
 def fill_restrictive_fast(worlds, locations, itempool):
-    while itempool and locations:
-        item_to_place = itempool.pop()
-
-        # get location that allows this item
-        spot_to_fill = None
-        for location in locations:
-            if location.can_fill_fast(item_to_place):
-                spot_to_fill = location
+    placement_index = PlacementIndex(locations, itempool)
+    placed = set()
+
+    # the filled locations are taken out of the list at the end, even if
+    # placing an item fails, so that callers never see them as open
+    try:
+        while itempool and placement_index:
+            item_to_place = itempool.pop()
+
+            # get location that allows this item
+            spot_to_fill = placement_index.pop(item_to_place)
+
+            # if we failed to find a suitable location, then stop placing items
+            # we don't need to check beatability since world must be beatable
+            # at this point
+            if spot_to_fill is None:
+                if not worlds[0].check_beatable_only:
+                    logging.getLogger('').warning('Not all items placed. Game beatable anyway.')
                 break
 
-        # if we failed to find a suitable location, then stop placing items
-        # we don't need to check beatability since world must be beatable
-        # at this point
-        if spot_to_fill is None:
-            if not worlds[0].check_beatable_only:
-                logging.getLogger('').warning('Not all items placed. Game beatable anyway.')
-            break
-
-        # Place the item in the world and continue
-        spot_to_fill.world.push_item(spot_to_fill, item_to_place)
-        locations.remove(spot_to_fill)
+            # Place the item in the world and continue
+            spot_to_fill.world.push_item(spot_to_fill, item_to_place)
+            placed.add(spot_to_fill)
+    finally:
+        locations[:] = [location for location in locations if location not in placed]
+
+
+# The locations left for fill_restrictive_fast, grouped by the items their
+# item rules accept. Item rules only look at the name, type and world of an
+# item, so items with the same name and world are accepted by the same
+# locations. Locations that accept the same items share a bucket, which keeps
+# them in the order of the list. The first location in the list that accepts
+# an item is then the first location of one of the buckets that accept it.
+# Most locations accept everything, so there are only a handful of buckets
+class PlacementIndex(object):
+
+    def __init__(self, locations, itempool):
+        kinds = {}
+        for item in itempool:
+            kinds.setdefault(item.kind, item)
+
+        self.position = {location: position for position, location in enumerate(locations)}
+        self.count = len(locations)
+        buckets = {}
+        for location in locations:
+            accepted = tuple(location.can_fill_fast(item) for item in kinds.values())
+            buckets.setdefault(accepted, deque()).append(location)
+
+        # item kind -> the buckets of the locations that accept it
+        self.buckets = {}
+        for kind_number, kind in enumerate(kinds):
+            self.buckets[kind] = [bucket for accepted, bucket in buckets.items() if accepted[kind_number]]
+
+    def __len__(self):
+        return self.count
+
+    # Removes and returns the first location that accepts the item, or None if there is none
+    def pop(self, item):
+        first_bucket = None
+        for bucket in self.buckets[item.kind]:
+            if bucket and (first_bucket is None or self.position[bucket[0]] < self.position[first_bucket[0]]):
+                first_bucket = bucket
+        if first_bucket is None:
+            return None
+        self.count -= 1
+        return first_bucket.popleft()
 
 
 # this places item in item_pool completely randomly into
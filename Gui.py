@@ -10,7 +10,7 @@ from urllib.parse import urlparse
 from urllib.request import urlopen
 
 from GuiUtils import ToolTips, set_icon, BackgroundTaskProgress
-from Main import main
+from Main import main, batch_main
 from Utils import is_bundled, local_path, default_output_path, open_file
 from Rom import get_tunic_color_options, get_navi_color_options
 from Settings import Settings, setting_infos
@@ -372,10 +372,9 @@ def guiMain(settings=None):
 
         try:
             if settings.count is not None:
-                orig_seed = settings.seed
-                for i in range(settings.count):
-                    settings.update_seed(orig_seed + '-' + str(i))
-                    main(settings)
+                errors = ['%s: %s' % (seed, error) for seed, error in batch_main(settings) if error is not None]
+                if errors:
+                    raise Exception('%d of %d seeds failed:\n%s' % (len(errors), settings.count, '\n'.join(errors)))
             else:
                 main(settings)
         except Exception as e:
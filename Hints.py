@@ -341,10 +341,8 @@ def buildGossipHints(world, messages):
 
     #spoilerHintsList.append('\n-Junk-\n')
     
-    f = open("hints.txt","w")
-    f.write('~~~ NEW HINTS ~~~\n\n')
-    f.write('\n'.join(spoilerHintsList))
-    f.close()
+    # kept with the spoiler instead of a shared hints.txt, so seeds generated in parallel don't mix up their hints
+    world.spoiler.hints = '~~~ NEW HINTS ~~~\n\n' + '\n'.join(spoilerHintsList)
     
     #print(*spoilerHintsList, sep='\n')
     # We don't need this anymore
@@ -1,11 +1,12 @@
 from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+import copy
 from itertools import zip_longest
 import json
 import logging
 import platform
 import random
 import subprocess
-import time
 import os
 
 from BaseClasses import World, CollectionState, Item
@@ -13,15 +14,23 @@ from EntranceShuffle import link_entrances
 from Rom import patch_rom, LocalRom
 from Regions import create_regions
 from Dungeons import create_dungeons
-from Rules import set_rules
+from Rules import set_rules, specialize_rules
+from Stats import stats
 from Fill import distribute_items_restrictive
 from ItemList import generate_itempool
-from Utils import default_output_path
+from Utils import default_output_path, local_path
 from version import __version__
 
-def main(settings):
-    start = time.clock()
+# base_rom is an optional, already checked base rom file, see LocalRom
+def main(settings, base_rom=None):
+    stats.reset(profile=settings.profile)
+    try:
+        return generate(settings, base_rom)
+    finally:
+        stats.stop_profile()
 
+
+def generate(settings, base_rom=None):
     # initialize the world
 
     worlds = []
@@ -47,23 +56,33 @@ def main(settings):
         logger.info('Generating World %d.' % id)
 
         logger.info('Creating Overworld')
-        create_regions(world)
+        with stats.phase('create_regions'):
+            create_regions(world)
         logger.info('Creating Dungeons')
-        create_dungeons(world)
+        with stats.phase('create_dungeons'):
+            create_dungeons(world)
         logger.info('Linking Entrances')
-        link_entrances(world)
+        with stats.phase('link_entrances'):
+            link_entrances(world)
         logger.info('Calculating Access Rules.')
-        set_rules(world)
+        with stats.phase('set_rules'):
+            set_rules(world)
         logger.info('Generating Item Pool.')
-        generate_itempool(world)
+        with stats.phase('generate_itempool'):
+            generate_itempool(world)
+        with stats.phase('specialize_rules'):
+            specialize_rules(world)
 
     logger.info('Fill the world.')
-    distribute_items_restrictive(worlds)
+    with stats.phase('fill'):
+        distribute_items_restrictive(worlds)
 
     if settings.create_spoiler:
         logger.info('Calculating playthrough.')
-        create_playthrough(worlds)
-    CollectionState.update_required_items(worlds)
+        with stats.phase('create_playthrough'):
+            create_playthrough(worlds)
+    with stats.phase('update_required_items'):
+        CollectionState.update_required_items(worlds)
 
     logger.info('Patching ROM.')
 
@@ -75,42 +94,130 @@ def main(settings):
     output_dir = default_output_path(settings.output_dir)
 
     if not settings.suppress_rom:
-        rom = LocalRom(settings)
-        patch_rom(worlds[settings.player_num - 1], rom)
-
-        rom_path = os.path.join(output_dir, '%s.z64' % outfilebase)
-
-        rom.write_to_file(rom_path)
-        if settings.compress_rom:
+        with LocalRom(settings, base_file=base_rom) as rom:
+            with stats.phase('patch_rom'):
+                patch_rom(worlds[settings.player_num - 1], rom)
+
+            with stats.phase('write_rom'):
+                if settings.create_patch:
+                    rom.write_patch_file(os.path.join(output_dir, '%s.zpf' % outfilebase))
+                else:
+                    rom_path = os.path.join(output_dir, '%s.z64' % outfilebase)
+
+                    rom.write_to_file(rom_path)
+        if settings.compress_rom and not settings.create_patch:
             logger.info('Compressing ROM.')
-            if platform.system() == 'Windows':
-                subprocess.call(["Compress\\Compress.exe", rom_path, os.path.join(output_dir, '%s-comp.z64' % outfilebase)])
-            elif platform.system() == 'Linux':
-                subprocess.call(["Compress/Compress", rom_path, os.path.join(output_dir, '%s-comp.z64' % outfilebase)])
-            elif platform.system() == 'Darwin':
-                subprocess.call(["Compress/Compress.out", ('%s.z64' % outfilebase)])
-            else:
-                logger.info('OS not supported for compression')
+            with stats.phase('compress_rom'):
+                if platform.system() == 'Windows':
+                    subprocess.call([local_path("Compress\\Compress.exe"), rom_path, os.path.join(output_dir, '%s-comp.z64' % outfilebase)])
+                elif platform.system() == 'Linux':
+                    subprocess.call([local_path("Compress/Compress"), rom_path, os.path.join(output_dir, '%s-comp.z64' % outfilebase)])
+                elif platform.system() == 'Darwin':
+                    subprocess.call([local_path("Compress/Compress.out"), rom_path])
+                else:
+                    logger.info('OS not supported for compression')
 
     if settings.create_spoiler:
         worlds[settings.player_num - 1].spoiler.to_file(os.path.join(output_dir, '%s_Spoiler.txt' % outfilebase))
-    os.remove('hints.txt')
+    if settings.create_stats:
+        stats.to_file(os.path.join(output_dir, '%s_Stats.json' % outfilebase))
+    if settings.profile:
+        stats.write_profile(os.path.join(output_dir, '%s.prof' % outfilebase))
     logger.info('Done. Enjoy.')
-    logger.debug('Total Time: %s', time.clock() - start)
+    logger.debug('Total Time: %s', stats.total_wall())
 
     return worlds[settings.player_num - 1]
 
-def create_playthrough(worlds):
-    if worlds[0].check_beatable_only and not CollectionState.can_beat_game([world.state for world in worlds]):
-        raise RuntimeError('Uncopied is broken too.')
-    # create a copy as we will modify it
-    old_worlds = worlds
-    worlds = [world.copy() for world in worlds]
 
-    # if we only check for beatable, we can do this sanity check first before writing down spheres
+# Creates the rom for a patch file made with create_patch, using settings.rom as the base rom
+def patch_file_main(settings):
+    logger = logging.getLogger('')
+
+    patch_file = os.path.abspath(settings.patch_file)
+    output_dir = default_output_path(settings.output_dir)
+    rom_path = os.path.join(output_dir, '%s.z64' % os.path.splitext(os.path.basename(patch_file))[0])
+
+    logger.info('Applying patch file.')
+    with LocalRom(settings) as rom:
+        rom.apply_patch_file(patch_file)
+        rom.write_to_file(rom_path)
+    logger.info('Done. Enjoy.')
+
+
+# Generates settings.count seeds with the same settings. Seed i uses the seed
+# string <seed>-<i>, exactly like generating them one after another, so every
+# seed produces the same output files no matter how the batch is run.
+#
+# The seeds are spread over settings.worker_count processes (one per cpu if not
+# set). The base rom is checked once up front and every worker maps the same
+# file. A seed that fails does not stop the others. Returns a list of
+# (seed, error) in seed order, where error is None if the seed was generated
+# successfully
+def batch_main(settings):
+    logger = logging.getLogger('')
+
+    orig_seed = settings.seed
+    seed_settings = []
+    for i in range(settings.count):
+        new_settings = copy.copy(settings)
+        new_settings.update_seed(orig_seed + '-' + str(i))
+        seed_settings.append(new_settings)
+
+    base_rom = None
+    if not settings.suppress_rom:
+        with LocalRom(settings) as rom:
+            base_rom = rom.base_file
+
+    worker_count = min(settings.worker_count or os.cpu_count() or 1, settings.count)
+    if worker_count <= 1:
+        init_batch_worker(base_rom, logger.level)
+        results = [generate_batch_seed(new_settings) for new_settings in seed_settings]
+    else:
+        with ProcessPoolExecutor(worker_count, initializer=init_batch_worker, initargs=(base_rom, logger.level)) as executor:
+            results = list(executor.map(generate_batch_seed, seed_settings))
+
+    for seed, error in results:
+        if error is not None:
+            logger.error('Seed %s failed: %s', seed, error)
+    return results
+
+
+# the base rom given to this worker process by batch_main
+batch_base_rom = None
+
+def init_batch_worker(base_rom, loglevel):
+    global batch_base_rom
+    batch_base_rom = base_rom
+    logging.basicConfig(format='%(message)s', level=loglevel)
+
+
+def generate_batch_seed(settings):
+    try:
+        main(settings, batch_base_rom)
+    except Exception as e:
+        logging.getLogger('').debug('Seed %s failed.', settings.seed, exc_info=True)
+        return (settings.seed, '%s: %s' % (type(e).__name__, e))
+    return (settings.seed, None)
+
+def create_playthrough(worlds):
     if worlds[0].check_beatable_only and not CollectionState.can_beat_game([world.state for world in worlds]):
         raise RuntimeError('Cannot beat game. Something went terribly wrong here!')
 
+    # the spheres are worked out on the worlds themselves. Only item placements
+    # are changed, and they are put back once the playthrough is written down
+    placements = [world.save_placements() for world in worlds]
+    try:
+        collection_spheres = get_playthrough_spheres(worlds)
+
+        # we can finally output our playthrough
+        for world in worlds:
+            world.spoiler.playthrough = OrderedDict([(str(i + 1), {location: location.item for location in sphere}) for i, sphere in enumerate(collection_spheres)])
+    finally:
+        for world, world_placements in zip(worlds, placements):
+            world.restore_placements(world_placements)
+
+
+def get_playthrough_spheres(worlds):
     state_list = [CollectionState(world) for world in worlds]
 
     # Get all item locations in the worlds
@@ -124,11 +231,19 @@ def create_playthrough(worlds):
     # will loop if there is more items opened up in the previous iteration. Always run once
     reachable_items_locations = True
     while reachable_items_locations:
-        # get reachable new items locations
-        reachable_items_locations = [location for location in item_locations if location.name not in state_list[location.world.id].collected_locations and state_list[location.world.id].can_reach(location)]
+        # get reachable new items locations. The others are left for the next round
+        reachable_items_locations = []
+        remaining_locations = []
+        for location in item_locations:
+            if state_list[location.world.id].can_reach(location):
+                reachable_items_locations.append(location)
+            else:
+                remaining_locations.append(location)
+        item_locations = remaining_locations
+
         for location in reachable_items_locations:
             # Mark the location collected in the state world it exists in
-            state_list[location.world.id].collected_locations.append(location.name)
+            state_list[location.world.id].collected_locations.add(location.name)
             # Collect the item for the state world it is for
             state_list[location.item.world.id].collect(location.item)
         if reachable_items_locations:
@@ -146,7 +261,7 @@ def create_playthrough(worlds):
 
             location.item = None
             state_list[old_item.world.id].remove(old_item)
-            CollectionState.remove_locations(state_list)
+            CollectionState.remove_locations(state_list, [old_item])
             if CollectionState.can_beat_game(state_list, False):
                 to_delete.append(location)
             else:
@@ -159,7 +274,4 @@ def create_playthrough(worlds):
             sphere.remove(location)
     collection_spheres = [sphere for sphere in collection_spheres if sphere]
 
-    # we can finally output our playthrough
-    for world in old_worlds:
-        world.spoiler.playthrough = OrderedDict([(str(i + 1), {location: location.item for location in sphere}) for i, sphere in enumerate(collection_spheres)])
-
+    return collection_spheres
@@ -1,6 +1,8 @@
 # text details: https://wiki.cloudmodding.com/oot/Text_Format
 
 import random
+import re
+import struct
 
 TABLE_START = 0xB849EC
 TEXT_START = 0x92D000
@@ -43,6 +45,13 @@ CONTROL_CODES = {
     0x1F: ('time', 0, lambda _: '<current time>' ),
 }
 
+# everything below 0x20 may be a control code, the rest are characters
+CONTROL_CODE_PATTERN = re.compile(b'[\x00-\x1f]')
+
+ENDING_CODES = [0x02, 0x07, 0x0A, 0x0B, 0x0E, 0x10]
+BOX_BREAKS = [0x04, 0x0C]
+SLOWS_TEXT = [0x08, 0x09, 0x14]
+
 SPECIAL_CHARACTERS = {
     0x96: 'é',
     0x9F: '[A]',
@@ -325,7 +334,8 @@ class Message():
     def is_id_message(self):
         if self.unpadded_length == 5:
             for i in range(4):
-                code = self.text_codes[i].code
+                # none of the digits is a control code, so the first four codes are the first four bytes
+                code = self.raw_text[i]
                 if not (code in range(ord('0'),ord('9')+1) or code in range(ord('A'),ord('F')+1) or code in range(ord('a'),ord('f')+1) ):
                     return False
             return True
@@ -333,6 +343,14 @@ class Message():
 
     def parse_text(self):
         self.text_codes = []
+        self.has_goto = False
+        self.has_keep_open = False
+        self.has_event = False
+        self.has_fade = False
+        self.has_ocarina = False
+        self.has_two_choice = False
+        self.has_three_choice = False
+        self.ending = None
 
         index = 0
         while index < self.length:
@@ -370,6 +388,42 @@ class Message():
         self.text = display_code_list(self.text_codes)
         self.unpadded_length = index
 
+    # the length of the text up to and including the end code, found without parsing the text
+    def get_unpadded_length(self):
+        index = 0
+        for _, index, code, _ in self.iter_control_codes():
+            if code == 0x02: # message end code
+                return index
+        return max(self.length, index)
+
+    # sets the has_ flags the same way parse_text does, from the control codes alone
+    def find_flags(self):
+        codes = set(code for _, _, code, _ in self.iter_control_codes())
+        self.has_goto = 0x07 in codes
+        self.has_keep_open = 0x0A in codes
+        self.has_event = 0x0B in codes
+        self.has_fade = 0x0E in codes
+        self.has_ocarina = 0x10 in codes
+        self.has_two_choice = 0x1B in codes
+        self.has_three_choice = 0x1C in codes
+
+    # Most messages are only copied back into the rom as they are, so the text
+    # is only parsed the first time one of the attributes set by parse_text is
+    # needed. The length up to the end code and the has_ flags are found on
+    # their own, so that is_id_message and the grouping of shuffle_messages
+    # do not need a parse
+    def __getattr__(self, name):
+        if name in FLAG_ATTRIBUTES:
+            self.find_flags()
+            return self.__dict__[name]
+        if name in PARSED_ATTRIBUTES:
+            self.parse_text()
+            return self.__dict__[name]
+        if name == 'unpadded_length':
+            self.unpadded_length = self.get_unpadded_length()
+            return self.unpadded_length
+        raise AttributeError(name)
+
     def is_basic(self):
         return not (self.has_goto or self.has_keep_open or self.has_event or self.has_fade or self.has_ocarina or self.has_two_choice or self.has_three_choice)
 
@@ -385,43 +439,97 @@ class Message():
         entry_offset = TABLE_START + 8 * index
         rom.write_bytes(entry_offset, entry)
 
-        ending_codes = [0x02, 0x07, 0x0A, 0x0B, 0x0E, 0x10]
-        box_breaks = [0x04, 0x0C]
-        slows_text = [0x08, 0x09, 0x14]
+        if ending is not None:
+            ending = (ending.code, int_to_bytes(ending.data, CONTROL_CODES[ending.code][1]))
+        text = self.encode(offset, replace_ending, ending, always_allow_skip, speed_up_text)
+        rom.write_bytes(TEXT_START + offset, text)
+        return offset + len(text)
+
+    # The control codes of the text up to and including the end code, as
+    # (start, end, code, data) where start and end are the offsets of the code
+    # and of the byte after its data, and data is the bytes after the code.
+    # Only the control codes are looked at, the characters between them are
+    # skipped in one go
+    def iter_control_codes(self):
+        raw_text = self.raw_text
+        length = min(self.length, len(raw_text))
+        index = 0
+        while index < length:
+            match = CONTROL_CODE_PATTERN.search(raw_text, index, length)
+            if match is None:
+                return
+            start = match.start()
+            code = raw_text[start]
+            index = start + 1
+            if code not in CONTROL_CODES:
+                continue
+            extra_bytes = CONTROL_CODES[code][1]
+            data = bytes(raw_text[index : index + extra_bytes])
+            if len(data) < extra_bytes:
+                # cut off by the end of the text, see parse_text
+                data = int_to_bytes(bytes_to_int(data), extra_bytes)
+            index += extra_bytes
+            yield start, index, code, data
+            if code == 0x02: # message end code
+                return
+
+    # the ending code of the message as (code, data), or None if it has none
+    def get_ending(self):
+        ending = None
+        for _, _, code, data in self.iter_control_codes():
+            if code in ENDING_CODES and code != 0x02:
+                ending = (code, data)
+        return ending
+
+    # Returns the bytes write writes for the message at the offset, including
+    # the padding to 4 bytes. The characters between the control codes are
+    # copied as they are. If replace_ending is set, the message's own ending
+    # is replaced by ending, a (code, data) pair or None, unless own_ending is
+    # set, in which case its own ending is moved to the end
+    def encode(self, offset, replace_ending=False, ending=None, always_allow_skip=True, speed_up_text=True, own_ending=False):
+        raw_text = self.raw_text
+        text = bytearray()
 
         # # speed the text
         if speed_up_text:
-            offset = Text_Code(0x08, 0).write(rom, offset) # allow instant
+            text.append(0x08) # allow instant
+
+        index = 0
+        ended = False
+        for start, end, code, data in self.iter_control_codes():
+            text += raw_text[index:start]
+            index = end
+            if own_ending and code in ENDING_CODES and code != 0x02:
+                ending = (code, data)
 
-        # write the message
-        for code in self.text_codes:
             # ignore ending codes if it's going to be replaced
-            if replace_ending and code.code in ending_codes:
+            if replace_ending and code in ENDING_CODES:
                 pass
             # ignore the "make unskippable flag"
-            elif always_allow_skip and code.code == 0x1A:
+            elif always_allow_skip and code == 0x1A:
                 pass
             # ignore anything that slows down text
-            elif speed_up_text and code.code in slows_text:
+            elif speed_up_text and code in SLOWS_TEXT:
                 pass
-            elif speed_up_text and code.code in box_breaks:
-                offset = Text_Code(0x04, 0).write(rom, offset) # un-delayed break
-                offset = Text_Code(0x08, 0).write(rom, offset) # allow instant
+            elif speed_up_text and code in BOX_BREAKS:
+                text += b'\x04\x08' # un-delayed break, allow instant
             else:
-                offset = code.write(rom, offset)
+                text.append(code)
+                text += data
+            ended = code == 0x02
+        if not ended:
+            text += raw_text[index : min(self.length, len(raw_text))]
 
         if replace_ending:
             if ending:
-                if speed_up_text and ending.code == 0x10: # ocarina
-                    offset = Text_Code(0x09, 0).write(rom, offset) # disallow instant text
-                offset = ending.write(rom, offset) # write special ending
-            offset = Text_Code(0x02, 0).write(rom, offset) # write end code
-
-
-        while offset % 4 > 0:
-            offset = Text_Code(0x00, 0).write(rom, offset) # pad to 4 byte align
+                if speed_up_text and ending[0] == 0x10: # ocarina
+                    text.append(0x09) # disallow instant text
+                text.append(ending[0]) # write special ending
+                text += ending[1]
+            text.append(0x02) # write end code
 
-        return offset
+        text += bytes(-(offset + len(text)) % 4) # pad to 4 byte align
+        return text
 
     def __init__(self, raw_text, index, id, opts, offset, length):
 
@@ -435,17 +543,6 @@ class Message():
         self.offset = offset
         self.length = length
 
-        self.has_goto = False
-        self.has_keep_open = False
-        self.has_event = False
-        self.has_fade = False
-        self.has_ocarina = False
-        self.has_two_choice = False
-        self.has_three_choice = False
-        self.ending = None
-
-        self.parse_text()
-
     # read a single message from rom
     @classmethod
     def from_rom(cls, rom, index):
@@ -465,12 +562,15 @@ class Message():
 
     @classmethod
     def from_string(cls, text, id=0, opts=0x00):
-        bytes = list(text.encode('utf-8')) + [0x02]
+        bytes = text.encode('utf-8') + b'\x02'
 
         return cls(bytes, 0, id, opts, 0, len(bytes) + 1)
 
     __str__ = __repr__ = display
 
+FLAG_ATTRIBUTES = {'has_goto', 'has_keep_open', 'has_event', 'has_fade', 'has_ocarina', 'has_two_choice', 'has_three_choice'}
+PARSED_ATTRIBUTES = {'text_codes', 'text', 'ending'}
+
 # wrapper for updating the text of a message, given its message id
 # if the id does not exist in the list, this will silently do nothing
 def update_message_by_id(messages, id, text, opts=None):
@@ -646,63 +746,99 @@ def message_patch_for_dungeon_items(messages, shop_items, world):
     move_shop_item_messages(messages, shop_items)
     add_keysanity_messages(messages, world)
 
-# reads each of the game's messages into a list of Message objects
+# reads each of the game's messages into a list of Message objects.
+# The table is read in one go, and the text of all the messages as well.
+# Each message keeps a view of its part of the text, which it only parses
+# when it has to, see Message.__getattr__
 def read_messages(rom):
 
-    table_offset = TABLE_START
-    index = 0
-    messages = []
-    while True:
-        entry = rom.read_bytes(table_offset, 8)
-        id = bytes_to_int(entry[0:2])
+    # each entry is the id, the box options, two fixed bytes and the offset of the text
+    table = rom.read_bytes(TABLE_START, TABLE_SIZE_LIMIT)
+    ids = []
+    options = []
+    offsets = []
+    message_count = 0
+    for id, opts, offset in struct.iter_unpack('>HBxI', table):
+        ids.append(id)
+        options.append(opts)
+        offsets.append(offset & 0x00FFFFFF)
 
         if id == 0xFFFD:
-            table_offset += 8
             continue # this is only here to give an ending offset
         if id == 0xFFFF:
             break # this marks the end of the table
+        message_count += 1
 
-        messages.append( Message.from_rom(rom, index) )
+    # a message runs up to the offset in the entry after its own. An ending
+    # entry in the middle of the table would shift the entries, which is how
+    # they have always been read
+    text_end = max(offsets[:message_count + 1], default=0)
+    text = memoryview(rom.read_bytes(TEXT_START, text_end))
 
-        index += 1
-        table_offset += 8
+    messages = []
+    for index in range(message_count):
+        offset = offsets[index]
+        length = offsets[index + 1] - offset
+        messages.append( Message(text[offset : offset + max(length, 0)], index, ids[index], options[index], offset, length) )
 
     return messages
 
-# wrtie the messages back
+# wrtie the messages back. The text and the table are put together in memory
+# first, and written to the rom in one go each
 def repack_messages(rom, messages, permutation=None, always_allow_skip=True, speed_up_text=True):
+    text, table, _ = pack_messages(messages, permutation, always_allow_skip, speed_up_text)
+    rom.write_bytes(TEXT_START, text)
+    rom.write_bytes(TABLE_START, table)
+
+# Returns the text and the table repack_messages writes, and the offset of the text of each message
+def pack_messages(messages, permutation=None, always_allow_skip=True, speed_up_text=True):
 
     if permutation is None:
         permutation = range(len(messages))
 
     # repack messages
-    offset = 0
+    text = bytearray()
+    table = bytearray()
+    offsets = []
     for old_index, new_index in enumerate(permutation):
         old_message = messages[old_index]
         new_message = messages[new_index]
-        remember_id = new_message.id 
-        new_message.id = old_message.id
-        offset = new_message.write(rom, old_index, offset, True, old_message.ending, always_allow_skip, speed_up_text)
-        new_message.id = remember_id
+        # the new message takes the id and the ending of the old one
+        offsets.append(len(text))
+        table += int_to_bytes(old_message.id, 2) + bytes([new_message.opts, 0x00, 0x07]) + int_to_bytes(len(text), 3)
+        if old_message is new_message:
+            text += new_message.encode(len(text), True, None, always_allow_skip, speed_up_text, own_ending=True)
+        else:
+            text += new_message.encode(len(text), True, old_message.get_ending(), always_allow_skip, speed_up_text)
+    offset = len(text)
 
     if offset > TEXT_SIZE_LIMIT:
         raise(TypeError("Message Text table is too large: 0x" + "{:x}".format(offset) + " written / 0x" + "{:x}".format(TEXT_SIZE_LIMIT) + " allowed."))
 
     # end the table
-    table_index = len(messages)
-    entry = bytes([0xFF, 0xFD, 0x00, 0x00, 0x07]) + int_to_bytes(offset, 3)
-    entry_offset = TABLE_START + 8 * table_index
-    rom.write_bytes(entry_offset, entry)
-    table_index += 1
-    entry_offset = TABLE_START + 8 * table_index
+    table += bytes([0xFF, 0xFD, 0x00, 0x00, 0x07]) + int_to_bytes(offset, 3)
+    table_index = len(messages) + 1
     if 8 * (table_index + 1) > TABLE_SIZE_LIMIT:
         raise(TypeError("Message ID table is too large: 0x" + "{:x}".format(8 * (table_index + 1)) + " written / 0x" + "{:x}".format(TABLE_SIZE_LIMIT) + " allowed."))
-    rom.write_bytes(entry_offset, [0xFF, 0xFF, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00])
-
-# shuffles the messages in the game, making sure to keep various message types in their own group
-def shuffle_messages(rom, except_hints=True, always_allow_skip=True):
-
-    messages = read_messages(rom)
+    table += bytes([0xFF, 0xFF, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00])
+
+    return text, table, offsets
+
+# Repacks the messages with their text shuffled, making sure to keep various
+# message types in their own group. This is used instead of repack_messages.
+#
+# The shuffle works on the messages the way repack_messages would leave them
+# in the rom, with the text sped up and the ending moved to the end, which
+# changes what counts as an unused message, and the shuffled messages are
+# packed from that text as well. That text is only put together in memory
+# here, the same way read_messages would read it back
+def shuffle_messages(rom, messages, except_hints=True, always_allow_skip=True):
+
+    packed_text, _, offsets = pack_messages(messages)
+    offsets.append(len(packed_text))
+    text = memoryview(bytes(packed_text))
+    messages = [Message(text[offsets[index] : offsets[index + 1]], index, message.id, message.opts, offsets[index], offsets[index + 1] - offsets[index])
+                for index, message in enumerate(messages)]
 
     permutation = [i for i, _ in enumerate(messages)]
 
@@ -736,5 +872,9 @@ def shuffle_messages(rom, except_hints=True, always_allow_skip=True):
         have_three_choice,
     ]))
 
-    # write the messages back
-    repack_messages(rom, messages, permutation, always_allow_skip, False)
+    # write the messages back. Whatever the unshuffled text has past the end
+    # of the shuffled text is kept, as if it had been written first
+    shuffled_text, table, _ = pack_messages(messages, permutation, always_allow_skip, False)
+    shuffled_text += packed_text[len(shuffled_text):]
+    rom.write_bytes(TEXT_START, shuffled_text)
+    rom.write_bytes(TABLE_START, table)
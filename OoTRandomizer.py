@@ -2,12 +2,13 @@
 import argparse
 import os
 import logging
+import multiprocessing
 import random
 import textwrap
 import sys
 
 from Gui import guiMain
-from Main import main
+from Main import main, batch_main, patch_file_main
 from Utils import is_bundled, close_console
 from Rom import get_tunic_color_options, get_navi_color_options
 from Settings import get_settings_from_command_line_args
@@ -43,13 +44,16 @@ def start():
 
     if gui:
         guiMain(settings)
+    elif settings.patch_file:
+        patch_file_main(settings)
     elif settings.count is not None:
-        orig_seed = settings.seed
-        for i in range(settings.count):
-            settings.update_seed(orig_seed + '-' + str(i))
-            main(settings)
+        results = batch_main(settings)
+        if any(error is not None for _, error in results):
+            sys.exit(1)
     else:
         main(settings)
 
 if __name__ == '__main__':
+    # batch generation starts worker processes, which needs this in bundled builds
+    multiprocessing.freeze_support()
     start()
@@ -0,0 +1,227 @@
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from RuleExpr import And, CanReach, Const, Has, Or
+
+
+# Checking which item locations can be reached is the bulk of the work in
+# CollectionState.collect_locations, and it grows with the number of worlds.
+# With numpy available, the location rules of all the worlds are checked at
+# once instead, as a few array operations per round of collecting.
+#
+# A location rule is written out as an or of terms, where each term is an and
+# of item counts (has at least count of the slot) and of regions (can reach
+# the region). A term is then a row of slots, a row of counts and a row of
+# regions, and it holds if every count is met and every region is reachable.
+# A location is reachable if any of its terms hold. Its own region is added to
+# every term, so the terms answer all of Location.can_reach.
+#
+# Rules that look at anything else, like which item was placed where, or that
+# would need too many terms, are still checked one by one with access_rule.
+
+# Worlds needed before the matrices pay for building the arrays every round
+MIN_WORLDS = 2
+
+# The most terms a rule may be written out into
+MAX_TERMS = 16
+
+
+def available(state_list):
+    return numpy is not None and len(state_list) >= MIN_WORLDS
+
+
+# The or of terms the rule is the same as, each term a pair of a dict of slot
+# to count and a set of regions. None if the rule can't be written that way
+def rule_terms(rule):
+    if isinstance(rule, Const):
+        return [({}, frozenset())] if rule.value else []
+    if isinstance(rule, Has):
+        return [({rule.slot: rule.count}, frozenset())]
+    if isinstance(rule, CanReach):
+        if rule.spot.spot_type != 'Region':
+            return None
+        return [({}, frozenset([rule.spot]))]
+    if isinstance(rule, Or):
+        terms = []
+        for child in rule.children:
+            child_terms = rule_terms(child)
+            if child_terms is None:
+                return None
+            terms.extend(child_terms)
+    elif isinstance(rule, And):
+        terms = [({}, frozenset())]
+        for child in rule.children:
+            child_terms = rule_terms(child)
+            if child_terms is None or len(terms) * len(child_terms) > MAX_TERMS:
+                return None
+            terms = [(merge_counts(counts, child_counts), regions | child_regions)
+                for counts, regions in terms for child_counts, child_regions in child_terms]
+    else:
+        return None
+    if len(terms) > MAX_TERMS:
+        return None
+    return terms
+
+
+def merge_counts(counts, other_counts):
+    merged = dict(counts)
+    for slot, count in other_counts.items():
+        if count > merged.get(slot, 0):
+            merged[slot] = count
+    return merged
+
+
+# The terms of every location in one world. Slots and regions are numbered
+# within the world, CollectionMatrix moves them to where the world's counts
+# and regions are in its arrays
+class WorldTerms(object):
+
+    def __init__(self, world):
+        self.locations = world.get_locations()
+        self.region_index = {region: index for index, region in enumerate(world.regions)}
+
+        # per term: the location it belongs to, its slots, counts and regions
+        self.term_location = []
+        self.term_slots = []
+        self.term_counts = []
+        self.term_regions = []
+        # per location: the first of its terms, and whether access_rule must be used instead
+        self.location_start = []
+        self.fallback = []
+
+        for location_index, location in enumerate(self.locations):
+            terms = None
+            if location.rule is None:
+                terms = [({}, frozenset())]
+            elif location.rule_constant is not False:
+                terms = rule_terms(location.rule)
+            self.fallback.append(terms is None)
+            if not terms:
+                # a dummy term. It is never used, but every location needs one
+                terms = [({}, frozenset())]
+
+            self.location_start.append(len(self.term_location))
+            for counts, regions in terms:
+                self.term_location.append(location_index)
+                self.term_slots.append(list(counts.keys()))
+                self.term_counts.append(list(counts.values()))
+                self.term_regions.append([self.region_index[location.parent_region]] + [self.region_index[region] for region in regions])
+
+
+# The terms of all the worlds in one set of arrays, padded to the same width.
+# Unused slots are padded with slot 0 and a count of 0, which always holds,
+# and unused regions with the one past the last region, which is always set
+class CollectionMatrix(object):
+
+    def __init__(self, worlds, slot_count):
+        self.worlds = worlds
+        self.slot_count = slot_count
+        world_terms = [WorldTerms(world) for world in worlds]
+
+        self.locations = [location for terms in world_terms for location in terms.locations]
+        self.region_index = [terms.region_index for terms in world_terms]
+        self.region_offset = []
+        self.location_offset = []
+        region_count = 0
+        location_count = 0
+        for terms in world_terms:
+            self.region_offset.append(region_count)
+            self.location_offset.append(location_count)
+            region_count += len(terms.region_index)
+            location_count += len(terms.locations)
+        self.region_count = region_count
+        self.location_index = [{location.name: index for index, location in enumerate(terms.locations)} for terms in world_terms]
+
+        slot_width = max(len(slots) for terms in world_terms for slots in terms.term_slots) or 1
+        region_width = max(len(regions) for terms in world_terms for regions in terms.term_regions)
+
+        term_slots = []
+        term_counts = []
+        term_regions = []
+        location_start = []
+        fallback = []
+        term_count = 0
+        for world_number, terms in enumerate(world_terms):
+            slot_offset = world_number * slot_count
+            region_offset = self.region_offset[world_number]
+            for slots, counts, regions in zip(terms.term_slots, terms.term_counts, terms.term_regions):
+                padding = slot_width - len(slots)
+                term_slots.append([slot_offset + slot for slot in slots] + [slot_offset] * padding)
+                term_counts.append(counts + [0] * padding)
+                term_regions.append([region_offset + region for region in regions] + [region_count] * (region_width - len(regions)))
+            location_start.extend(term_count + start for start in terms.location_start)
+            fallback.extend(terms.fallback)
+            term_count += len(terms.term_location)
+
+        self.term_slots = numpy.array(term_slots, dtype=numpy.intp)
+        self.term_counts = numpy.array(term_counts, dtype=numpy.int32)
+        self.term_regions = numpy.array(term_regions, dtype=numpy.intp)
+        self.location_start = numpy.array(location_start, dtype=numpy.intp)
+        self.fallback = numpy.array(fallback, dtype=bool)
+
+    @staticmethod
+    def get(state_list):
+        worlds = [state.world for state in state_list]
+        slot_count = len(state_list[0].prog_items)
+        # rules are final once the worlds are filled, so the matrix is kept
+        # with the first world for as long as the same worlds are used
+        matrix = worlds[0].collection_matrix
+        if matrix is None or matrix.worlds != worlds or matrix.slot_count != slot_count:
+            matrix = CollectionMatrix(worlds, slot_count)
+            worlds[0].collection_matrix = matrix
+        return matrix
+
+    # Which locations have their rules met, checked with the current items and
+    # regions of every state. Does not include the locations in fallback
+    def reachable(self, state_list):
+        counts = numpy.array([state.prog_items for state in state_list], dtype=numpy.int32).ravel()
+        regions = numpy.zeros(self.region_count + 1, dtype=bool)
+        regions[self.region_count] = True
+        for world_number, state in enumerate(state_list):
+            if state.sweep_needed is not None:
+                state.sweep_regions()
+            region_index = self.region_index[world_number]
+            offset = self.region_offset[world_number]
+            regions[[offset + region_index[region] for region in state.reachable_regions]] = True
+
+        terms = (counts[self.term_slots] >= self.term_counts).all(axis=1)
+        terms &= regions[self.term_regions].all(axis=1)
+        return numpy.logical_or.reduceat(terms, self.location_start)
+
+    # Does the same as CollectionState.collect_locations, and collects the
+    # locations in the same order
+    def collect_locations(self, state_list):
+        candidates = numpy.array([location.item is not None and location.item.advancement and location.rule_constant is not False
+            for location in self.locations], dtype=bool)
+        collected = numpy.zeros(len(self.locations), dtype=bool)
+        for world_number, state in enumerate(state_list):
+            location_index = self.location_index[world_number]
+            offset = self.location_offset[world_number]
+            collected[[offset + location_index[name] for name in state.collected_locations]] = True
+
+        collected_item_locations = []
+        while True:
+            open_locations = candidates & ~collected
+            reachable = self.reachable(state_list) & ~self.fallback
+            for index in numpy.flatnonzero(open_locations & self.fallback):
+                location = self.locations[index]
+                state = state_list[location.world.id]
+                if location.parent_region in state.reachable_regions and location.access_rule(state):
+                    reachable[index] = True
+            reachable &= open_locations
+
+            reachable_items_locations = [self.locations[index] for index in numpy.flatnonzero(reachable)]
+            if not reachable_items_locations:
+                break
+
+            collected |= reachable
+            for location in reachable_items_locations:
+                # Mark the location collected in the state world it exists in
+                state_list[location.world.id].collected_locations.add(location.name)
+                # Collect the item for the state world it is for
+                state_list[location.item.world.id].collect(location.item)
+            collected_item_locations.extend(reachable_items_locations)
+
+        return collected_item_locations
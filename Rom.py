@@ -1,11 +1,15 @@
+import hashlib
 import io
 import json
 import logging
+import mmap
 import os
 import platform
 import struct
 import subprocess
 import random
+import zlib
+from bisect import bisect_left, bisect_right
 
 from Hints import buildGossipHints, buildBossRewardHints, buildGanonText
 from Utils import local_path, default_output_path
@@ -64,48 +68,81 @@ def get_navi_color_options():
 
 class LocalRom(object):
 
-    def __init__(self, settings, patch=True):
-        file = settings.rom
-        decomp_file = os.path.join(default_output_path(settings.output_dir), 'ZOOTDEC.z64')
+    # base_file can be the base_file of an already loaded LocalRom. It is used
+    # as the base rom as is, without reading or checking settings.rom again
+    def __init__(self, settings, patch=True, base_file=None):
+        # Journal of the written address ranges, kept sorted with overlapping
+        # and adjacent ranges merged. dirty_starts[i] to dirty_ends[i] (exclusive)
+        # is one range. See get_dirty_ranges
+        self.dirty_starts = []
+        self.dirty_ends = []
+
+        # The base rom is mapped read only, so every process using the same
+        # base rom file shares its memory. Written pages are copied into
+        # self.pages (by page number) and changed there. Everything past the
+        # end of the base rom reads as 0, up to ROM_SIZE
+        self.pages = {}
+
+        if base_file is None:
+            base_file = get_base_rom_file(settings)
+        self.base_file = base_file
+        self.base = map_rom_file(base_file)
+        self.base_size = min(len(self.base), ROM_SIZE)
+
+    # Unmaps the base rom. The rom can't be read or written after this. Can
+    # also be used as a context manager, which closes the rom at the end
+    def close(self):
+        close_rom_file(self.base)
+        self.base = b''
+        self.base_size = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    # in case the rom was not closed, so the base rom file is not kept mapped
+    def __del__(self):
+        if hasattr(self, 'base'):
+            self.close()
+
+    # Returns the writable copy of a page, copying it from the base rom first if needed
+    def get_page(self, page_number):
+        page = self.pages.get(page_number)
+        if page is None:
+            address = page_number << PAGE_BITS
+            page = bytearray(self.base[address : min(address + PAGE_SIZE, self.base_size)])
+            page.extend(bytes(PAGE_SIZE - len(page)))
+            self.pages[page_number] = page
+        return page
 
-        validCRC = []
-        validCRC.append(bytearray([0xEC, 0x70, 0x11, 0xB7, 0x76, 0x16, 0xD7, 0x2B])) # Compressed
-        validCRC.append(bytearray([0x70, 0xEC, 0xB7, 0x11, 0x16, 0x76, 0x2B, 0xD7])) # Byteswap compressed
-        validCRC.append(bytearray([0x93, 0x52, 0x2E, 0x7B, 0xE5, 0x06, 0xD4, 0x27])) # Decompressed
-
-        os.chdir(os.path.dirname(os.path.realpath(__file__)))
-        #os.chdir(output_path(os.path.dirname(os.path.realpath(__file__))))
-        with open(file, 'rb') as stream:
-            self.buffer = read_rom(stream)
-        file_name = os.path.splitext(file)
-        romCRC = self.buffer[0x10:0x18]
-        if romCRC not in validCRC:
-            raise RuntimeError('ROM is not a valid OoT 1.0 US ROM.')
-        if len(self.buffer) < 33554432 or len(self.buffer) > 67108864 or file_name[1] not in ['.z64', '.n64']:
-            raise RuntimeError('ROM is not a valid OoT 1.0 ROM.')
-        if len(self.buffer) == 33554432:
-            if platform.system() == 'Windows':
-                subprocess.call(["Decompress\\Decompress.exe", file, decomp_file])
-                with open(decomp_file, 'rb') as stream:
-                    self.buffer = read_rom(stream)
-            elif platform.system() == 'Linux':
-                subprocess.call(["Decompress/Decompress", file])
-                with open(("ZOOTDEC.z64"), 'rb') as stream:
-                    self.buffer = read_rom(stream)
-            elif platform.system() == 'Darwin':
-                subprocess.call(["Decompress/Decompress.out", file])
-                with open(("ZOOTDEC.z64"), 'rb') as stream:
-                    self.buffer = read_rom(stream)
-            else:
-                raise RuntimeError('Unsupported operating system for decompression. Please supply an already decompressed ROM.')
-        # extend to 64MB
-        self.buffer.extend(bytearray([0x00] * (67108864 - len(self.buffer))))
-            
     def read_byte(self, address):
-        return self.buffer[address]
-
-    def read_bytes(self, address, len):
-        return self.buffer[address : address + len]
+        page = self.pages.get(address >> PAGE_BITS)
+        if page is not None:
+            return page[address & PAGE_MASK]
+        if 0 <= address < self.base_size:
+            return self.base[address]
+        if 0 <= address < ROM_SIZE:
+            return 0
+        raise IndexError('Read at 0x%X is outside of the rom.' % address)
+
+    def read_bytes(self, address, length):
+        data = bytearray()
+        end = min(address + length, ROM_SIZE)
+        while address < end:
+            page_number = address >> PAGE_BITS
+            count = min((page_number + 1) << PAGE_BITS, end) - address
+            page = self.pages.get(page_number)
+            if page is not None:
+                offset = address & PAGE_MASK
+                data += page[offset : offset + count]
+            else:
+                chunk = self.base[address : min(address + count, self.base_size)]
+                data += chunk
+                data += bytes(count - len(chunk))
+            address += count
+        return data
 
     def read_int16(self, address):
         return bytes_as_int16(self.read_bytes(address, 2))
@@ -117,30 +154,298 @@ class LocalRom(object):
         return bytes_as_int32(self.read_bytes(address, 4))
 
     def write_byte(self, address, value):
-        self.buffer[address] = value
+        if not 0 <= address < ROM_SIZE:
+            raise IndexError('Write at 0x%X is outside of the rom.' % address)
+        self.get_page(address >> PAGE_BITS)[address & PAGE_MASK] = value
+        self.mark_dirty(address, 1)
 
+    # values can be bytes, a bytearray, a memoryview or a list of ints. They are
+    # written with one slice assignment per page
     def write_bytes(self, startaddress, values):
-        for i, value in enumerate(values):
-            self.write_byte(startaddress + i, value)
+        length = len(values)
+        if startaddress < 0 or startaddress + length > ROM_SIZE:
+            raise IndexError('Write of %d bytes at 0x%X is outside of the rom.' % (length, startaddress))
+        address = startaddress
+        offset = 0
+        while offset < length:
+            page_offset = address & PAGE_MASK
+            count = min(PAGE_SIZE - page_offset, length - offset)
+            page = self.get_page(address >> PAGE_BITS)
+            page[page_offset : page_offset + count] = values[offset : offset + count]
+            address += count
+            offset += count
+        self.mark_dirty(startaddress, length)
 
     def write_int16(self, address, value):
-        self.write_bytes(address, int16_as_bytes(value))
+        self.write_bytes(address, (value & 0xFFFF).to_bytes(2, 'big'))
 
     def write_int24(self, address, value):
-        self.write_bytes(address, int24_as_bytes(value))
+        self.write_bytes(address, (value & 0xFFFFFF).to_bytes(3, 'big'))
 
     def write_int32(self, address, value):
-        self.write_bytes(address, int32_as_bytes(value))
+        self.write_bytes(address, (value & 0xFFFFFFFF).to_bytes(4, 'big'))
 
+    # Adds a range to the dirty journal, merging it with every range it
+    # overlaps or touches
+    def mark_dirty(self, address, length):
+        if length <= 0:
+            return
+        end = address + length
+        first = bisect_left(self.dirty_ends, address)
+        last = bisect_right(self.dirty_starts, end)
+        if first < last:
+            address = min(address, self.dirty_starts[first])
+            end = max(end, self.dirty_ends[last - 1])
+        self.dirty_starts[first:last] = [address]
+        self.dirty_ends[first:last] = [end]
+
+    # Returns the written ranges as (address, length), sorted by address.
+    # If start and end are given, only the parts of the ranges between them
+    # are returned
+    def get_dirty_ranges(self, start=0, end=None):
+        if end is None:
+            end = ROM_SIZE
+        first = bisect_right(self.dirty_ends, start)
+        last = bisect_left(self.dirty_starts, end)
+        ranges = []
+        for range_start, range_end in zip(self.dirty_starts[first:last], self.dirty_ends[first:last]):
+            range_start = max(range_start, start)
+            range_end = min(range_end, end)
+            if range_end > range_start:
+                ranges.append((range_start, range_end - range_start))
+        return ranges
+
+    # Returns True if any byte from address to address + length was written
+    def is_dirty(self, address, length=1):
+        return len(self.get_dirty_ranges(address, address + length)) > 0
+
+    # The full rom only exists while it is written out, one chunk at a time
     def write_to_file(self, file):
         with open(file, 'wb') as outfile:
-            outfile.write(self.buffer)
+            with memoryview(self.base) as base:
+                address = 0
+                for page_number in sorted(self.pages):
+                    page_address = page_number << PAGE_BITS
+                    write_base_range(outfile, base, self.base_size, address, page_address)
+                    outfile.write(self.pages[page_number])
+                    address = page_address + PAGE_SIZE
+                write_base_range(outfile, base, self.base_size, address, ROM_SIZE)
+
+    # SHA-1 of the base rom as it is read, including the 0 past its end. It
+    # only depends on the content, so a 32MB and a 64MB decompressed rom hash
+    # the same. Kept for as long as the base file is the same
+    def get_base_hash(self):
+        stat = os.stat(self.base_file)
+        key = (os.path.abspath(self.base_file), stat.st_size, stat.st_mtime)
+        if LocalRom.base_hash_key != key:
+            sha1 = hashlib.sha1()
+            with memoryview(self.base) as base:
+                for address in range(0, ROM_SIZE, 0x100000):
+                    chunk = base[address : min(address + 0x100000, self.base_size)]
+                    sha1.update(chunk)
+                    sha1.update(bytes(0x100000 - len(chunk)))
+            LocalRom.base_hash_key = key
+            LocalRom.base_hash = sha1.digest()
+        return LocalRom.base_hash
+
+    base_hash_key = None
+    base_hash = None
+
+    # Writes only the changed bytes of the rom, see apply_patch_file
+    def write_patch_file(self, file):
+        body = pack_patch_records((address, self.read_bytes(address, length)) for address, length in self.get_dirty_ranges())
+        with open(file, 'wb') as outfile:
+            outfile.write(PATCH_MAGIC)
+            outfile.write(self.get_base_hash())
+            outfile.write(zlib.compress(body, 9))
+
+    # Applies a patch file written by write_patch_file. The rom has to be the
+    # same base rom the patch was created from, which is checked before any
+    # of the patch is applied
+    def apply_patch_file(self, file):
+        with open(file, 'rb') as stream:
+            data = stream.read()
+        if data[:len(PATCH_MAGIC)] != PATCH_MAGIC:
+            raise RuntimeError('%s is not a valid patch file.' % file)
+        header_size = len(PATCH_MAGIC) + 20
+        if data[len(PATCH_MAGIC):header_size] != self.get_base_hash():
+            raise RuntimeError('%s was not created from this base ROM.' % file)
+        try:
+            body = zlib.decompress(data[header_size:])
+        except zlib.error:
+            raise RuntimeError('%s is not a valid patch file.' % file)
+
+        for address, values in unpack_patch_records(body):
+            self.write_bytes(address, values)
+
+
+# Patch files are this header, then the SHA-1 of the base rom (see
+# LocalRom.get_base_hash), then a zlib compressed list of
+# (4 byte address, 4 byte length, data) records
+PATCH_MAGIC = b'OOTRZPF2'
+
+def pack_patch_records(records):
+    body = bytearray()
+    for address, values in records:
+        body.extend(struct.pack('>II', address, len(values)))
+        body.extend(values)
+    return bytes(body)
+
+# Returns the (address, values) records of a packed body, in their original order
+def unpack_patch_records(body):
+    records = []
+    offset = 0
+    while offset < len(body):
+        address, length = struct.unpack_from('>II', body, offset)
+        offset += 8
+        records.append((address, body[offset : offset + length]))
+        offset += length
+    return records
+
+
+# data/base2current.json compiled to patch records. They are cached next to
+# the json file in base2current.bin, after the SHA-1 of the json file they were
+# compiled from, and compiled again whenever the json file changes
+def get_base_patch():
+    json_file = local_path('data/base2current.json')
+    with open(json_file, 'rb') as stream:
+        json_data = stream.read()
+    json_hash = hashlib.sha1(json_data).digest()
+    if get_base_patch.cached_hash == json_hash:
+        return get_base_patch.cached_records
+
+    compiled_file = os.path.splitext(json_file)[0] + '.bin'
+    records = None
+    if os.path.isfile(compiled_file):
+        with open(compiled_file, 'rb') as stream:
+            compiled_data = stream.read()
+        if compiled_data[:len(BASE_PATCH_MAGIC)] == BASE_PATCH_MAGIC and \
+           compiled_data[len(BASE_PATCH_MAGIC):len(BASE_PATCH_MAGIC) + 20] == json_hash:
+            records = unpack_patch_records(compiled_data[len(BASE_PATCH_MAGIC) + 20:])
+
+    if records is None:
+        records = []
+        for patch in json.loads(json_data.decode('utf-8')):
+            if isinstance(patch, dict):
+                for baseaddress, values in patch.items():
+                    records.append((int(baseaddress), bytes(values)))
+        # the compiled file is only a cache, so it is fine if it can't be written
+        try:
+            temp_file = '%s.%d.tmp' % (compiled_file, os.getpid())
+            with open(temp_file, 'wb') as outfile:
+                outfile.write(BASE_PATCH_MAGIC + json_hash + pack_patch_records(records))
+            os.replace(temp_file, compiled_file)
+        except OSError:
+            logging.getLogger('').debug('Could not write %s', compiled_file)
+
+    get_base_patch.cached_hash = json_hash
+    get_base_patch.cached_records = records
+    return records
+
+get_base_patch.cached_hash = None
+get_base_patch.cached_records = None
+
+BASE_PATCH_MAGIC = b'OOTRB2C1'
+
+ROM_SIZE = 67108864
+PAGE_BITS = 12
+PAGE_SIZE = 1 << PAGE_BITS
+PAGE_MASK = PAGE_SIZE - 1
 
 def read_rom(stream):
     "Reads rom into bytearray"
     buffer = bytearray(stream.read())
     return buffer
 
+def map_rom_file(file):
+    "Maps rom file read only"
+    if os.path.getsize(file) == 0:
+        return b''
+    with open(file, 'rb') as stream:
+        return mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ)
+
+def close_rom_file(base):
+    if isinstance(base, mmap.mmap):
+        base.close()
+
+# Writes the base rom from start to end, with 0 past the end of the base rom
+def write_base_range(outfile, base, base_size, start, end):
+    if start < base_size:
+        outfile.write(base[start : min(end, base_size)])
+        start = base_size
+    while start < end:
+        count = min(end - start, 0x100000)
+        outfile.write(bytes(count))
+        start += count
+
+# Checks settings.rom and returns the file to use as base rom. That is either
+# settings.rom itself or the cached decompressed version of it
+def get_base_rom_file(settings):
+    file = settings.rom
+    output_dir = default_output_path(settings.output_dir)
+
+    validCRC = []
+    validCRC.append(bytearray([0xEC, 0x70, 0x11, 0xB7, 0x76, 0x16, 0xD7, 0x2B])) # Compressed
+    validCRC.append(bytearray([0x70, 0xEC, 0xB7, 0x11, 0x16, 0x76, 0x2B, 0xD7])) # Byteswap compressed
+    validCRC.append(bytearray([0x93, 0x52, 0x2E, 0x7B, 0xE5, 0x06, 0xD4, 0x27])) # Decompressed
+
+    rom = map_rom_file(file)
+    try:
+        file_name = os.path.splitext(file)
+        romCRC = rom[0x10:0x18]
+        if romCRC not in validCRC:
+            raise RuntimeError('ROM is not a valid OoT 1.0 US ROM.')
+        if len(rom) < 33554432 or len(rom) > ROM_SIZE or file_name[1] not in ['.z64', '.n64']:
+            raise RuntimeError('ROM is not a valid OoT 1.0 ROM.')
+        if len(rom) == 33554432:
+            return get_decompressed_rom(file, rom, output_dir, validCRC[2])
+        return file
+    finally:
+        close_rom_file(rom)
+
+
+# Decompressed roms are cached in the output directory as ZOOTDEC_<sha1>.z64,
+# where sha1 is the hash of the compressed rom, so the Decompress tool only runs
+# the first time a rom is used. The cached image is already extended to 64MB.
+# Returns the path of the cached image
+def get_decompressed_rom(file, buffer, output_dir, decompressed_crc):
+    logger = logging.getLogger('')
+
+    cache_file = os.path.join(output_dir, 'ZOOTDEC_%s.z64' % hashlib.sha1(buffer).hexdigest())
+    if os.path.isfile(cache_file):
+        # only the size and the crc are checked, so the file is not kept open
+        with open(cache_file, 'rb') as stream:
+            stream.seek(0x10)
+            cache_crc = stream.read(8)
+        if os.path.getsize(cache_file) == ROM_SIZE and cache_crc == decompressed_crc:
+            return cache_file
+        logger.warning('Decompressed ROM cache %s is invalid, decompressing the ROM again.', cache_file)
+
+    decomp_file = os.path.join(output_dir, 'ZOOTDEC.z64')
+    if platform.system() == 'Windows':
+        subprocess.call([local_path("Decompress\\Decompress.exe"), file, decomp_file])
+    elif platform.system() == 'Linux':
+        subprocess.call([local_path("Decompress/Decompress"), os.path.abspath(file)], cwd=output_dir)
+    elif platform.system() == 'Darwin':
+        subprocess.call([local_path("Decompress/Decompress.out"), os.path.abspath(file)], cwd=output_dir)
+    else:
+        raise RuntimeError('Unsupported operating system for decompression. Please supply an already decompressed ROM.')
+
+    with open(decomp_file, 'rb') as stream:
+        decompressed = read_rom(stream)
+    os.remove(decomp_file)
+    if decompressed[0x10:0x18] != decompressed_crc:
+        raise RuntimeError('ROM could not be decompressed.')
+    decompressed.extend(bytes(ROM_SIZE - len(decompressed)))
+
+    # write to a temporary name first, so that an interrupted write never leaves
+    # a partial cache file behind
+    temp_file = '%s.%d.tmp' % (cache_file, os.getpid())
+    with open(temp_file, 'wb') as outfile:
+        outfile.write(decompressed)
+    os.replace(temp_file, cache_file)
+    return cache_file
+
 
 def int16_as_bytes(value):
     value = value & 0xFFFF
@@ -167,12 +472,8 @@ def bytes_as_int32(values):
 
 
 def patch_rom(world, rom):
-    with open(local_path('data/base2current.json'), 'r') as stream:
-        patches = json.load(stream)
-    for patch in patches:
-        if isinstance(patch, dict):
-            for baseaddress, values in patch.items():
-                rom.write_bytes(int(baseaddress), values)
+    for address, values in get_base_patch():
+        rom.write_bytes(address, values)
 
     # Can always return to youth
     rom.write_byte(0xCB6844, 0x35)
@@ -1039,7 +1340,8 @@ def patch_rom(world, rom):
 
     # Write item overrides
     override_table = get_override_table(world)
-    rom.write_bytes(0x3481000, sum(override_table, []))
+    rom.write_bytes(0x3481000, [byte for entry in override_table for byte in entry])
+    override_index = get_override_index(override_table)
     rom.write_byte(0x03481C00, world.id + 1) # Write player ID
 
     # Revert Song Get Override Injection
@@ -1172,7 +1474,7 @@ def patch_rom(world, rom):
 
     # Update chest type sizes
     if world.correct_chest_sizes:
-        update_chest_sizes(rom, override_table)
+        update_chest_sizes(rom, override_index)
 
     # give dungeon items the correct messages
     message_patch_for_dungeon_items(messages, shop_items, world)
@@ -1180,14 +1482,14 @@ def patch_rom(world, rom):
     # reduce item message lengths
     update_item_messages(messages, world)
 
-    repack_messages(rom, messages)
-    write_shop_items(rom, shop_items)
-
     # text shuffle
     if world.text_shuffle == 'except_hints':
-        shuffle_messages(rom, True)
+        shuffle_messages(rom, messages, True)
     elif world.text_shuffle == 'complete':
-        shuffle_messages(rom, False)
+        shuffle_messages(rom, messages, False)
+    else:
+        repack_messages(rom, messages)
+    write_shop_items(rom, shop_items)
 
     # output a text dump, for testing...
     #with open('keysanity_' + str(world.seed) + '_dump.txt', 'w', encoding='utf-16') as f:
@@ -1356,6 +1658,16 @@ def get_override_table(world):
     override_entries.sort()
     return override_entries
 
+# The item id of the override table entries by (scene, type, flags). The
+# table is sorted, and the game uses the first entry that matches, so the
+# index keeps the first one as well
+def get_override_index(override_table):
+    override_index = {}
+    for entry in override_table:
+        if len(entry) == 4:
+            override_index.setdefault((entry[0], entry[1] & 0x07, entry[2]), entry[3])
+    return override_index
+
 def get_override_entry(location):
     scene = location.scene
     default = location.default
@@ -1413,7 +1725,12 @@ chestAnimationExtendedFast = [
 ]
 
 
-def room_get_chests(rom, room_data, scene, chests, alternate=None):
+# The actors of every room of every scene, as (scene, address, actor id,
+# actor var) in the order the scene headers list them. address is where the
+# actor's 16 byte entry starts. Scenes 81 to 99 have alternate headers, and
+# the actors of those are listed as well
+
+def room_get_actors(rom, room_data, scene, actors, alternate=None):
     room_start = alternate or room_data
     command = 0
     while command != 0x14: # 0x14 = end header
@@ -1424,20 +1741,19 @@ def room_get_chests(rom, room_data, scene, chests, alternate=None):
             for _ in range(0, actor_count):
                 actor_id = rom.read_int16(actor_list);
                 actor_var = rom.read_int16(actor_list + 14)
-                if actor_id == 0x000A: #Chest Actor
-                    chests[actor_list + 14] = [scene, actor_var & 0x001F]
+                actors.append((scene, actor_list, actor_id, actor_var))
                 actor_list = actor_list + 16
         if command == 0x18 and scene >= 81 and scene <= 99: # Alternate header list
             header_list = room_start + (rom.read_int32(room_data + 4) & 0x00FFFFFF)
             for alt_id in range(0,2):
                 header_data = room_start + (rom.read_int32(header_list + 4) & 0x00FFFFFF)
                 if header_data != 0 and not alternate:
-                    room_get_chests(rom, header_data, scene, chests, room_start)
+                    room_get_actors(rom, header_data, scene, actors, room_start)
                 header_list = header_list + 4
         room_data = room_data + 8
 
 
-def scene_get_chests(rom, scene_data, scene, chests, alternate=None):
+def scene_get_actors(rom, scene_data, scene, actors, alternate=None):
     scene_start = alternate or scene_data
     command = 0
     while command != 0x14: # 0x14 = end header
@@ -1447,38 +1763,128 @@ def scene_get_chests(rom, scene_data, scene, chests, alternate=None):
             room_list = scene_start + (rom.read_int32(scene_data + 4) & 0x00FFFFFF)
             for _ in range(0, room_count):
                 room_data = rom.read_int32(room_list);
-                room_get_chests(rom, room_data, scene, chests)
+                room_get_actors(rom, room_data, scene, actors)
                 room_list = room_list + 8
         if command == 0x18 and scene >= 81 and scene <= 99: # Alternate header list
             header_list = scene_start + (rom.read_int32(scene_data + 4) & 0x00FFFFFF)
             for alt_id in range(0,2):
                 header_data = scene_start + (rom.read_int32(header_list + 4) & 0x00FFFFFF)
                 if header_data != 0 and not alternate:
-                    scene_get_chests(rom, header_data, scene, chests, scene_start)
+                    scene_get_actors(rom, header_data, scene, actors, scene_start)
                 header_list = header_list + 4
 
         scene_data = scene_data + 8
 
 
-def get_chest_list(rom):
-    chests = {}
+# Reads through to a rom and keeps track of every address range that was read
+class RecordingRom(object):
+
+    def __init__(self, rom):
+        self.rom = rom
+        self.reads = []
+
+    def read_byte(self, address):
+        self.reads.append((address, 1))
+        return self.rom.read_byte(address)
+
+    def read_int16(self, address):
+        self.reads.append((address, 2))
+        return self.rom.read_int16(address)
+
+    def read_int32(self, address):
+        self.reads.append((address, 4))
+        return self.rom.read_int32(address)
+
+    # The ranges that were read, sorted and merged. Ranges less than gap bytes
+    # apart are merged as well, so an actor list is one range and not two per actor
+    def get_read_ranges(self, gap=0x20):
+        ranges = []
+        for address, length in sorted(self.reads):
+            if ranges and address <= ranges[-1][0] + ranges[-1][1] + gap:
+                ranges[-1][1] = max(ranges[-1][1], address + length - ranges[-1][0])
+            else:
+                ranges.append([address, length])
+        return ranges
+
+
+def get_ranges_hash(rom, ranges):
+    ranges_hash = hashlib.sha1()
+    for address, length in ranges:
+        ranges_hash.update(rom.read_bytes(address, length))
+    return ranges_hash.hexdigest()
+
+
+# Walking the scene headers takes tens of thousands of reads, and the headers
+# are the same for every seed made from the same base rom. So the actor list
+# is kept, in memory and in data/actor_index.json, with the address ranges it
+# was read from and the SHA-1 of their contents. The list is the same as long
+# as those bytes are, because the walk only looks at them, so it is only made
+# again when the base rom or the patches to the headers change
+def get_actor_index(rom):
+    candidates = []
+    if get_actor_index.cached_index is not None:
+        candidates.append(get_actor_index.cached_index)
+
+    index_file = local_path('data/actor_index.json')
+    if os.path.isfile(index_file):
+        try:
+            with open(index_file, 'r') as stream:
+                candidates.append(json.load(stream))
+        except ValueError:
+            logging.getLogger('').debug('Could not read %s', index_file)
+
+    for index in candidates:
+        if index.get('version') == ACTOR_INDEX_VERSION and get_ranges_hash(rom, index['ranges']) == index['hash']:
+            get_actor_index.cached_index = index
+            return index['actors']
+
+    recording_rom = RecordingRom(rom)
+    actors = []
     scene_table = 0x00B71440
     for scene in range(0x00, 0x65):
-        scene_data = rom.read_int32(scene_table + (scene * 0x14));
-        scene_get_chests(rom, scene_data, scene, chests)
+        scene_data = recording_rom.read_int32(scene_table + (scene * 0x14));
+        scene_get_actors(recording_rom, scene_data, scene, actors)
+
+    ranges = recording_rom.get_read_ranges()
+    index = {
+        'version': ACTOR_INDEX_VERSION,
+        'ranges': ranges,
+        'hash': get_ranges_hash(rom, ranges),
+        'actors': [list(actor) for actor in actors],
+    }
+    get_actor_index.cached_index = index
+
+    # the index file is only a cache, so it is fine if it can't be written
+    try:
+        temp_file = '%s.%d.tmp' % (index_file, os.getpid())
+        with open(temp_file, 'w') as outfile:
+            json.dump(index, outfile)
+        os.replace(temp_file, index_file)
+    except OSError:
+        logging.getLogger('').debug('Could not write %s', index_file)
+
+    return index['actors']
+
+get_actor_index.cached_index = None
+
+ACTOR_INDEX_VERSION = 1
+
+
+def get_chest_list(rom):
+    chests = {}
+    for scene, address, actor_id, actor_var in get_actor_index(rom):
+        if actor_id == 0x000A: #Chest Actor
+            chests[address + 14] = [scene, actor_var & 0x001F]
     return chests
 
 
-def get_override_itemid(override_table, scene, type, flags):
-    for entry in override_table:
-        if len(entry) == 4 and entry[0] == scene and (entry[1] & 0x07) == type and entry[2] == flags:
-            return entry[3]
-    return None
+def get_override_itemid(override_index, scene, type, flags):
+    return override_index.get((scene, type, flags))
 
-def update_chest_sizes(rom, override_table):
+def update_chest_sizes(rom, override_index):
     chest_list = get_chest_list(rom)
     for address, [scene, flags] in chest_list.items():
-        item_id = get_override_itemid(override_table, scene, 1, flags)
+        item_id = get_override_itemid(override_index, scene, 1, flags)
 
         if None in [address, scene, flags, item_id]:
             continue
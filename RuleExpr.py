@@ -0,0 +1,429 @@
+import ast
+import sys
+
+from BaseClasses import BOMBCHU_SLOT, NORMAL_BOTTLE_SLOT, intern_item_table, item_ids
+
+
+# Access rules are written as python expressions in strings, for example
+# "has('Bow') and (is_adult() or open_forest)". parse_rule turns one into a
+# small tree of the nodes below for a world. Settings are read from the world
+# right away and folded into constants, and the helpers like can_play are
+# expanded into the items they check, so the tree only keeps what depends on
+# the state. compile_rule then turns the tree into a plain function that looks
+# the items up directly in prog_items.
+#
+# The trees are kept with the spots (see Rules.set_rule), so a rule can be
+# printed, and it can be told which items and regions it looks at.
+
+class Rule(object):
+
+    children = ()
+
+    # Every node of the tree, depth first
+    def walk(self):
+        yield self
+        for child in self.children:
+            yield from child.walk()
+
+    # The inventory slots the rule reads
+    def slots(self):
+        return frozenset(node.slot for node in self.walk() if isinstance(node, Has))
+
+    # Whether the rule looks at anything besides the inventory: which regions
+    # can be reached, or which items were placed where
+    def reads_world(self):
+        return any(isinstance(node, (CanReach, Placed)) for node in self.walk())
+
+    def __str__(self):
+        return self.to_string()
+
+    def __repr__(self):
+        return '<%s %s>' % (type(self).__name__, self.to_string())
+
+
+class Const(Rule):
+
+    def __init__(self, value):
+        self.value = bool(value)
+
+    def to_source(self, constant):
+        return repr(self.value)
+
+    def to_string(self):
+        return repr(self.value)
+
+
+# Has at least count of whatever is counted in the inventory slot
+class Has(Rule):
+
+    def __init__(self, slot, count, text):
+        self.slot = slot
+        self.count = count
+        self.text = text
+
+    def to_source(self, constant):
+        return 'p[%d] >= %d' % (self.slot, self.count)
+
+    def to_string(self):
+        return self.text
+
+
+class And(Rule):
+
+    def __init__(self, children):
+        self.children = tuple(children)
+
+    def to_source(self, constant):
+        return ' and '.join(child.to_source(constant) if not child.children else '(%s)' % child.to_source(constant) for child in self.children)
+
+    def to_string(self):
+        return ' and '.join(child.to_string() if not child.children else '(%s)' % child.to_string() for child in self.children)
+
+
+class Or(Rule):
+
+    def __init__(self, children):
+        self.children = tuple(children)
+
+    def to_source(self, constant):
+        return ' or '.join(child.to_source(constant) if not child.children else '(%s)' % child.to_source(constant) for child in self.children)
+
+    def to_string(self):
+        return ' or '.join(child.to_string() if not child.children else '(%s)' % child.to_string() for child in self.children)
+
+
+class CanReach(Rule):
+
+    def __init__(self, spot):
+        self.spot = spot
+
+    def to_source(self, constant):
+        return 'state.can_reach(%s)' % constant(self.spot)
+
+    def to_string(self):
+        if self.spot.spot_type == 'Region':
+            return 'can_reach(%r)' % self.spot.name
+        return 'can_reach(%r, %r)' % (self.spot.name, self.spot.spot_type)
+
+
+# A setting that is only decided after the rules are set, like the trials to skip
+class Setting(Rule):
+
+    def __init__(self, name, key):
+        self.name = name
+        self.key = key
+
+    def to_source(self, constant):
+        return 'bool(world.%s[%r])' % (self.name, self.key)
+
+    def to_string(self):
+        return '%s[%r]' % (self.name, self.key)
+
+
+# The item placed at the location is the named item
+class Placed(Rule):
+
+    def __init__(self, location, item):
+        self.location = location
+        self.item = item
+
+    def to_source(self, constant):
+        location = constant(self.location)
+        return '(%s.item is not None and %s.item.name == %r)' % (location, location, self.item)
+
+    def to_string(self):
+        return 'item_name(%r) == %r' % (self.location.name, self.item)
+
+
+# Helpers often check the same items, like has_explosives and
+# can_blast_or_smash both checking for the Bomb Bag. Checking one twice in the
+# same and/or gives the same answer, so only the first is kept. Counts of the
+# same slot are merged the same way: in an and only the highest count matters,
+# in an or only the lowest, like has('Progressive Hookshot', 2) or
+# has('Progressive Hookshot') is only has('Progressive Hookshot')
+def unique_rules(rules, keep_highest):
+    seen = set()
+    counts = {}
+    unique = []
+    for rule in rules:
+        if isinstance(rule, Has):
+            if rule.slot in counts:
+                index = counts[rule.slot]
+                if (rule.count > unique[index].count) == keep_highest and rule.count != unique[index].count:
+                    unique[index] = rule
+                continue
+            counts[rule.slot] = len(unique)
+            unique.append(rule)
+            continue
+        text = rule.to_string()
+        if text not in seen:
+            seen.add(text)
+            unique.append(rule)
+    return unique
+
+
+def all_of(rules):
+    children = []
+    for rule in rules:
+        if isinstance(rule, Const):
+            if not rule.value:
+                return rule
+        elif isinstance(rule, And):
+            children.extend(rule.children)
+        else:
+            children.append(rule)
+    children = unique_rules(children, True)
+    if not children:
+        return Const(True)
+    if len(children) == 1:
+        return children[0]
+    return And(children)
+
+
+def any_of(rules):
+    children = []
+    for rule in rules:
+        if isinstance(rule, Const):
+            if rule.value:
+                return rule
+        elif isinstance(rule, Or):
+            children.extend(rule.children)
+        else:
+            children.append(rule)
+    children = unique_rules(children, False)
+    if not children:
+        return Const(False)
+    if len(children) == 1:
+        return children[0]
+    return Or(children)
+
+
+# Replaces the settings left in the rule by the values they have now, and
+# simplifies the rule around them. Returns the rule itself if it has none
+def fold_settings(world, rule):
+    if not any(isinstance(node, Setting) for node in rule.walk()):
+        return rule
+    if isinstance(rule, Setting):
+        return Const(getattr(world, rule.name)[rule.key])
+    if isinstance(rule, And):
+        return all_of([fold_settings(world, child) for child in rule.children])
+    return any_of([fold_settings(world, child) for child in rule.children])
+
+
+# The helpers that can be called in a rule. Each gets the world first, and
+# returns the tree to use for the call
+
+def has(world, item, count=1):
+    if not item_ids:
+        intern_item_table()
+    if item not in item_ids:
+        # not an item that exists in this game, e.g. the gauntlets before they became progressive
+        return Const(False)
+    if count == 1:
+        return Has(item_ids[item], count, 'has(%r)' % item)
+    return Has(item_ids[item], count, 'has(%r, %d)' % (item, count))
+
+def is_adult(world):
+    return has(world, 'Master Sword')
+
+def has_ocarina(world):
+    return any_of([has(world, 'Ocarina'), has(world, 'Fairy Ocarina'), has(world, 'Ocarina of Time')])
+
+def can_play(world, song):
+    return all_of([has_ocarina(world), has(world, song)])
+
+def has_bombchus(world):
+    if world.bombchus_in_logic:
+        return any_of([has_bombchu_item(world), all_of([has(world, 'Progressive Wallet'), can_reach(world, 'Haunted Wasteland')])])
+    return has(world, 'Bomb Bag')
+
+# Any of the Bombchus items
+def has_bombchu_item(world):
+    return Has(BOMBCHU_SLOT, 1, 'has_bombchu_item()')
+
+def has_explosives(world):
+    return any_of([has(world, 'Bomb Bag'), has_bombchus(world)])
+
+def can_blast_or_smash(world):
+    return any_of([has(world, 'Bomb Bag'), all_of([is_adult(world), has(world, 'Hammer')]), has_bombchus(world)])
+
+def can_dive(world):
+    return has(world, 'Progressive Scale')
+
+def can_see_with_lens(world):
+    return any_of([all_of([has(world, 'Magic Meter'), has(world, 'Lens of Truth')]), Const(world.logic_lens != 'all')])
+
+def has_GoronTunic(world):
+    return any_of([has(world, 'Goron Tunic'), all_of([has(world, 'Progressive Wallet'), any_of([has_explosives(world), has(world, 'Progressive Strength Upgrade'), has(world, 'Bow')])])])
+
+def has_ZoraTunic(world):
+    return any_of([has(world, 'Zora Tunic'), all_of([has(world, 'Progressive Wallet', 2), has_bottle(world), can_play(world, 'Zeldas Lullaby')])])
+
+def can_finish_adult_trades(world):
+    zora_thawed = all_of([has_bottle(world), has(world, 'Zeldas Lullaby'), any_of([can_reach(world, 'Ice Cavern'), can_reach(world, 'Ganons Castle Water Trial'), has(world, 'Progressive Wallet', 2)])])
+    carpenter_access = any_of([has(world, 'Epona'), has(world, 'Progressive Hookshot', 2)])
+    # the trades after King Zora all need him thawed, so that is only checked once
+    return any_of([has(world, 'Claim Check'), all_of([zora_thawed, any_of([
+        has(world, 'Eyedrops'), has(world, 'Eyeball Frog'), has(world, 'Prescription'), has(world, 'Broken Sword'),
+        all_of([any_of([has(world, 'Poachers Saw'), has(world, 'Odd Mushroom'), has(world, 'Cojiro'), has(world, 'Pocket Cucco'), has(world, 'Pocket Egg')]), carpenter_access])])])])
+
+def has_bottle(world):
+    return Has(NORMAL_BOTTLE_SLOT, 1, 'has_bottle()')
+
+def has_fire_source(world):
+    return all_of([any_of([has(world, 'Dins Fire'), all_of([has(world, 'Bow'), has(world, 'Fire Arrows'), is_adult(world)])]), has(world, 'Magic Meter')])
+
+def guarantee_hint(world):
+    if world.hints == 'mask':
+        # has the mask of truth
+        return all_of([has(world, 'Zeldas Letter'), has(world, 'Sarias Song'), has(world, 'Kokiri Emerald'), has(world, 'Goron Ruby'), has(world, 'Zora Sapphire')])
+    elif world.hints == 'agony':
+        # has the stone of agony
+        return has(world, 'Stone of Agony')
+    return Const(True)
+
+def nighttime(world):
+    if world.logic_no_night_tokens_without_suns_song:
+        return has(world, 'Suns Song')
+    return Const(True)
+
+def can_reach(world, spot, resolution_hint='Region'):
+    if resolution_hint == 'Location':
+        return CanReach(world.get_location(spot))
+    elif resolution_hint == 'Entrance':
+        return CanReach(world.get_entrance(spot))
+    return CanReach(world.get_region(spot))
+
+# Only to be compared with an item name, see Placed
+def item_name(world, location):
+    return PlacedItem(world.get_location(location))
+
+class PlacedItem(object):
+
+    def __init__(self, location):
+        self.location = location
+
+
+rule_helpers = {helper.__name__: helper for helper in [
+    has, is_adult, has_ocarina, can_play, has_bombchus, has_bombchu_item, has_explosives, can_blast_or_smash, can_dive, can_see_with_lens,
+    has_GoronTunic, has_ZoraTunic, can_finish_adult_trades, has_bottle, has_fire_source, guarantee_hint, nighttime,
+    can_reach, item_name,
+]}
+
+# Settings that are decided after the rules are set, so they can't be folded
+late_settings = {'skipped_trials'}
+
+
+# Before python 3.8, literals are parsed into a node per kind of literal
+# instead of ast.Constant, and before 3.9 a subscript is wrapped in ast.Index
+if sys.version_info < (3, 8):
+    legacy_literals = {ast.Num: 'n', ast.Str: 's', ast.NameConstant: 'value'}
+else:
+    legacy_literals = {}
+
+
+parsed_rules = {}
+
+def parse_rule(world, text):
+    try:
+        tree = parsed_rules[text]
+    except KeyError:
+        tree = ast.parse(text.strip(), mode='eval').body
+        parsed_rules[text] = tree
+    try:
+        return to_rule(build_rule(world, tree))
+    except ValueError as e:
+        raise ValueError('%s in rule: %s' % (e, text))
+
+
+def to_rule(value):
+    if isinstance(value, Rule):
+        return value
+    if isinstance(value, PlacedItem):
+        raise ValueError('item_name can only be compared to an item')
+    return Const(value)
+
+
+# Returns the node for a part of the rule, or the value if it only depends on settings
+def build_rule(world, node):
+    if isinstance(node, ast.BoolOp):
+        children = [to_rule(build_rule(world, value)) for value in node.values]
+        if isinstance(node.op, ast.And):
+            return all_of(children)
+        return any_of(children)
+
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+        operand = build_rule(world, node.operand)
+        if isinstance(operand, Const):
+            return not operand.value
+        if isinstance(operand, Rule):
+            raise ValueError('Only settings can be negated')
+        return not operand
+
+    if isinstance(node, ast.Constant):
+        return node.value
+
+    if type(node) in legacy_literals:
+        return getattr(node, legacy_literals[type(node)])
+
+    if isinstance(node, ast.Name):
+        if node.id in late_settings or node.id in rule_helpers or not hasattr(world, node.id):
+            raise ValueError('Unknown setting %s' % node.id)
+        return getattr(world, node.id)
+
+    if isinstance(node, ast.Subscript):
+        key_node = node.slice
+        if sys.version_info < (3, 9) and isinstance(key_node, ast.Index):
+            key_node = key_node.value
+        key = build_rule(world, key_node)
+        if isinstance(node.value, ast.Name) and node.value.id in late_settings:
+            return Setting(node.value.id, key)
+        return build_rule(world, node.value)[key]
+
+    if isinstance(node, ast.Compare) and len(node.ops) == 1:
+        left = build_rule(world, node.left)
+        right = build_rule(world, node.comparators[0])
+        op = node.ops[0]
+        if isinstance(left, PlacedItem) and isinstance(op, ast.Eq):
+            return Placed(left.location, right)
+        if isinstance(left, Rule) or isinstance(right, Rule) or isinstance(left, PlacedItem):
+            raise ValueError('Only settings can be compared')
+        if isinstance(op, ast.Eq):
+            return left == right
+        if isinstance(op, ast.NotEq):
+            return left != right
+        if isinstance(op, ast.GtE):
+            return left >= right
+        if isinstance(op, ast.Gt):
+            return left > right
+        if isinstance(op, ast.LtE):
+            return left <= right
+        if isinstance(op, ast.Lt):
+            return left < right
+
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id in rule_helpers and not node.keywords:
+        args = [build_rule(world, arg) for arg in node.args]
+        return rule_helpers[node.func.id](world, *args)
+
+    raise ValueError('Unsupported expression %s' % ast.dump(node))
+
+
+compiled_rules = {}
+
+# Turns the tree into a function of the state. Regions and locations the rule
+# looks at are passed in as constants, so the same code is used in every world
+def compile_rule(world, rule):
+    constants = {'world': world}
+    def constant(value):
+        name = 'c%d' % (len(constants) - 1)
+        constants[name] = value
+        return name
+
+    source = 'def rule(state):\n    p = state.prog_items\n    return %s\n' % rule.to_source(constant)
+    try:
+        code = compiled_rules[source]
+    except KeyError:
+        code = compile(source, '<rule>', 'exec')
+        compiled_rules[source] = code
+    exec(code, constants)
+    return constants['rule']
@@ -1,34 +1,71 @@
 import collections
 import logging
 
+from RuleExpr import CanReach, Const, all_of, any_of, compile_rule, fold_settings, parse_rule
+
 
 def set_rules(world):
     global_rules(world)
 
     if world.bridge == 'medallions':
         # require all medallions to form the bridge
-        set_rule(world.get_entrance('Rainbow Bridge'), lambda state: state.has('Forest Medallion') and state.has('Fire Medallion') and state.has('Water Medallion') and state.has('Shadow Medallion') and state.has('Spirit Medallion') and state.has('Light Medallion'))
+        set_rule(world.get_entrance('Rainbow Bridge'), "has('Forest Medallion') and has('Fire Medallion') and has('Water Medallion') and has('Shadow Medallion') and has('Spirit Medallion') and has('Light Medallion')")
     elif world.bridge == 'vanilla':
         # require only what vanilla did to form the bridge
-        set_rule(world.get_entrance('Rainbow Bridge'), lambda state: state.has('Light Arrows') and state.has('Shadow Medallion') and state.has('Spirit Medallion'))
+        set_rule(world.get_entrance('Rainbow Bridge'), "has('Light Arrows') and has('Shadow Medallion') and has('Spirit Medallion')")
     elif world.bridge == 'dungeons':
         # require all medallions and stones to form the bridge
-        set_rule(world.get_entrance('Rainbow Bridge'), lambda state: state.has('Forest Medallion') and state.has('Fire Medallion') and state.has('Water Medallion') and state.has('Shadow Medallion') and state.has('Spirit Medallion') and state.has('Light Medallion') and state.has('Kokiri Emerald') and state.has('Goron Ruby') and state.has('Zora Sapphire'))
+        set_rule(world.get_entrance('Rainbow Bridge'), "has('Forest Medallion') and has('Fire Medallion') and has('Water Medallion') and has('Shadow Medallion') and has('Spirit Medallion') and has('Light Medallion') and has('Kokiri Emerald') and has('Goron Ruby') and has('Zora Sapphire')")
+
+    index_rules(world)
 
 
+# Access rules are strings in the rule language of RuleExpr, for example
+# "has('Bow') and is_adult()". They must be set through set_rule and add_rule,
+# which keep the parsed rule with the spot and record what it looks at. The
+# states rely on that to only check the rules that can have changed, see
+# index_rules
 def set_rule(spot, rule):
-    spot.access_rule = rule
+    world = spot.parent_region.world
+    update_rule(world, spot, parse_rule(world, rule))
 
 def set_always_allow(spot, rule):
     spot.always_allow = rule
+    spot.allowed_items.clear()
 
 
 def add_rule(spot, rule, combine='and'):
-    old_rule = spot.access_rule
+    world = spot.parent_region.world
+    rule = parse_rule(world, rule)
+    # a spot without a rule can always be reached
+    old_rule = spot.rule if spot.rule is not None else Const(True)
     if combine == 'or':
-        spot.access_rule = lambda state: rule(state) or old_rule(state)
+        update_rule(world, spot, any_of([rule, old_rule]))
     else:
-        spot.access_rule = lambda state: rule(state) and old_rule(state)
+        update_rule(world, spot, all_of([rule, old_rule]))
+
+def update_rule(world, spot, rule):
+    spot.rule = rule
+    spot.access_rule = compile_rule(world, rule)
+    spot.rule_slots = rule.slots()
+    spot.rule_reads_world = rule.reads_world()
+    spot.rule_names = frozenset(node.spot.name for node in rule.walk() if isinstance(node, CanReach) and node.spot.spot_type != 'Region')
+    spot.rule_constant = rule.value if isinstance(rule, Const) else None
+
+
+# Runs once the world is set up, after the item pool is generated, which
+# chooses the trials to skip. Folds the settings that could not be folded yet
+# when the rules were set. Rules left always true or always false are marked
+# by rule_constant, so the states can skip them
+def specialize_rules(world):
+    for region in world.regions:
+        for spot in region.exits + region.locations:
+            if spot.rule is not None:
+                rule = fold_settings(world, spot.rule)
+                if rule is not spot.rule:
+                    update_rule(world, spot, rule)
+
+    index_rules(world)
 
 def add_item_rule(spot, rule, combine='and'):
     old_rule = spot.item_rule
@@ -36,23 +73,45 @@ def add_item_rule(spot, rule, combine='and'):
         spot.item_rule = lambda item: rule(item) or old_rule(item)
     else:
         spot.item_rule = lambda item: rule(item) and old_rule(item)
+    spot.allowed_items.clear()
 
 def forbid_item(location, item):
     old_rule = location.item_rule
     location.item_rule = lambda i: i.name != item and old_rule(i)
+    location.allowed_items.clear()
 
 
-def item_in_locations(state, item, locations):
-    for location in locations:
-        if item_name(state, location) == item:
-            return True
-    return False
+# Builds the item -> spots index of the world from what set_rule recorded for
+# every rule. A rule that asks whether another location or entrance can be
+# reached also depends on what the rule of that spot looks at
+def index_rules(world):
+    spots = {}
+    for region in world.regions:
+        for spot in region.exits + region.locations:
+            spots[spot.name] = spot
 
-def item_name(state, location):
-    location = state.world.get_location(location)
-    if location.item is None:
-        return None
-    return location.item.name
+    changed = True
+    while changed:
+        changed = False
+        for spot in spots.values():
+            if not spot.rule_reads_world:
+                continue
+            slots = spot.rule_slots
+            for name in spot.rule_names:
+                slots = slots | spots[name].rule_slots
+            if slots != spot.rule_slots:
+                spot.rule_slots = slots
+                changed = True
+
+    world.entrances_by_slot = {}
+    world.locations_by_slot = {}
+    for spot in spots.values():
+        if spot.spot_type == 'Entrance':
+            index = world.entrances_by_slot
+        else:
+            index = world.locations_by_slot
+        for slot in spot.rule_slots:
+            index.setdefault(slot, []).append(spot)
 
 
 def global_rules(world):
@@ -62,380 +121,377 @@ def global_rules(world):
     # ganon can only carry triforce
     world.get_location('Ganon').item_rule = lambda item: item.name == 'Triforce'
 
-    # these are default save&quit points and always accessible
-    world.get_region('Links House').can_reach = lambda state: True
-
     # overworld requirements
-    set_rule(world.get_entrance('Deku Tree'), lambda state: state.has('Kokiri Sword') or world.open_forest)
-    set_rule(world.get_entrance('Lost Woods Bridge'), lambda state: world.open_forest or (state.has('Slingshot') and state.has('Kokiri Sword')))
-    set_rule(world.get_entrance('Deku Tree Basement Path'), lambda state: state.has('Slingshot'))
-    set_rule(world.get_location('Skull Kid'), lambda state: state.can_play('Sarias Song'))
-    set_rule(world.get_location('Ocarina Memory Game'), lambda state: (not world.logic_no_memory_game) and state.has_ocarina())
-    set_rule(world.get_location('Target in Woods'), lambda state: state.has('Slingshot'))
-    set_rule(world.get_location('Deku Theater Skull Mask'), lambda state: (not world.logic_no_trade_skull_mask) and state.has('Zeldas Letter'))
-    set_rule(world.get_location('Deku Theater Mask of Truth'), lambda state: (not world.logic_no_trade_mask_of_truth) and (state.has('Zeldas Letter') and state.can_play('Sarias Song') and state.has('Kokiri Emerald') and state.has('Goron Ruby') and state.has('Zora Sapphire') and state.guarantee_hint())) #Must befriend Skull Kid to sell Skull Mask, all stones to spawn running man.
-    set_rule(world.get_location('Anju as Adult'), lambda state: state.is_adult())
-    set_rule(world.get_location('Man on Roof'), lambda state: world.logic_man_on_roof or (state.has('Progressive Hookshot') and state.is_adult()))
-    set_rule(world.get_location('10 Gold Skulltulla Reward'), lambda state: (expected_skulltulas >= 10) and state.has('Gold Skulltulla Token', 10))
-    set_rule(world.get_location('20 Gold Skulltulla Reward'), lambda state: (expected_skulltulas >= 20) and state.has('Gold Skulltulla Token', 20))
-    set_rule(world.get_location('30 Gold Skulltulla Reward'), lambda state: (expected_skulltulas >= 30) and state.has('Gold Skulltulla Token', 30) and state.guarantee_hint())
-    set_rule(world.get_location('40 Gold Skulltulla Reward'), lambda state: (expected_skulltulas >= 40) and state.has('Gold Skulltulla Token', 40) and state.guarantee_hint())
-    set_rule(world.get_location('50 Gold Skulltulla Reward'), lambda state: (expected_skulltulas >= 50) and state.has('Gold Skulltulla Token', 50) and state.guarantee_hint())
-    set_rule(world.get_location('Heart Piece Grave Chest'), lambda state: state.can_play('Suns Song'))
-    set_rule(world.get_entrance('Composer Grave'), lambda state: state.can_play('Zeldas Lullaby'))
-    set_rule(world.get_location('Composer Grave Chest'), lambda state: state.has_fire_source())
-    set_rule(world.get_entrance('Bottom of the Well'), lambda state: state.can_play('Song of Storms'))
-    set_rule(world.get_location('Bottom of the Well Front Left Hidden Wall'), lambda state: state.can_see_with_lens())
-    set_rule(world.get_location('Bottom of the Well Front Center Bombable'), lambda state: state.has_explosives())
-    set_rule(world.get_location('Bottom of the Well Right Bottom Hidden Wall'), lambda state: state.can_see_with_lens())
-    set_rule(world.get_location('Bottom of the Well Center Large Chest'), lambda state: state.can_see_with_lens())
-    set_rule(world.get_location('Bottom of the Well Center Small Chest'), lambda state: state.can_see_with_lens())
-    set_rule(world.get_location('Bottom of the Well Back Left Bombable'), lambda state: state.has_explosives())
-    set_rule(world.get_location('Bottom of the Well Defeat Boss'), lambda state: state.can_play('Zeldas Lullaby') and (state.has('Kokiri Sword') or world.logic_child_deadhand)) #Sword not strictly necessary but frankly being forced to do this with sticks isn't fair
-    set_rule(world.get_location('Bottom of the Well Invisible Chest'), lambda state: state.can_play('Zeldas Lullaby') and state.can_see_with_lens())
-    set_rule(world.get_location('Bottom of the Well Underwater Front Chest'), lambda state: state.can_play('Zeldas Lullaby'))
-    set_rule(world.get_location('Bottom of the Well Underwater Left Chest'), lambda state: state.can_play('Zeldas Lullaby'))
-    set_rule(world.get_location('Bottom of the Well Basement Chest'), lambda state: state.has_explosives())
-    set_rule(world.get_location('Bottom of the Well Locked Pits'), lambda state: state.has('Small Key (Bottom of the Well)', 3) and state.can_see_with_lens()) #These pits are really unfair.
-    set_rule(world.get_location('Bottom of the Well Behind Right Grate'), lambda state: state.has('Small Key (Bottom of the Well)', 3) and state.can_see_with_lens())
-    set_rule(world.get_entrance('Death Mountain Entrance'), lambda state: state.has('Zeldas Letter') or state.is_adult())
-    set_rule(world.get_location('Death Mountain Bombable Chest'), lambda state: state.can_blast_or_smash())
-    set_rule(world.get_location('Biggoron'), lambda state: (not world.logic_no_trade_biggoron) and (state.can_blast_or_smash() and state.is_adult() and state.can_finish_adult_trades() and state.guarantee_hint()))
-    set_rule(world.get_location('Goron City Leftmost Maze Chest'), lambda state: state.is_adult() and (state.has('Progressive Strength Upgrade', 2) or state.has('Hammer')))
-    set_rule(world.get_location('Goron City Left Maze Chest'), lambda state: state.can_blast_or_smash() or (state.has('Progressive Strength Upgrade', 2) and state.is_adult()))
-    set_rule(world.get_location('Goron City Right Maze Chest'), lambda state: state.can_blast_or_smash() or (state.has('Progressive Strength Upgrade', 2) and state.is_adult()))
-    set_rule(world.get_location('Rolling Goron as Child'), lambda state: state.has('Bomb Bag'))
-    set_rule(world.get_location('Goron City Pot Freestanding PoH'), lambda state: (state.has('Bomb Bag') or state.has('Progressive Strength Upgrade')) and (state.can_play('Zeldas Lullaby') or (state.has('Dins Fire') and state.has('Magic Meter'))))
-    set_rule(world.get_entrance('Darunias Chamber'), lambda state: state.can_play('Zeldas Lullaby'))
-    set_rule(world.get_location('Darunias Joy'), lambda state: state.can_play('Sarias Song'))
-    set_rule(world.get_entrance('Goron City from Woods'), lambda state: state.can_blast_or_smash() and (world.open_forest or (state.has('Slingshot') and state.has('Kokiri Sword'))))
-    set_rule(world.get_entrance('Dodongos Cavern Rocks'), lambda state: state.can_blast_or_smash() or state.has('Progressive Strength Upgrade') or state.is_adult())
-    set_rule(world.get_entrance('Dodongos Cavern Lobby'), lambda state: state.can_blast_or_smash() or state.has('Progressive Strength Upgrade'))
-    set_rule(world.get_entrance('Dodongos Cavern Left Door'), lambda state: state.has_explosives() or state.has('Progressive Strength Upgrade') or (state.has('Dins Fire') and state.has('Magic Meter')))
-    set_rule(world.get_entrance('Dodongos Cavern Slingshot Target'), lambda state: state.has('Slingshot') or ((state.has('Bow') or state.has('Hover Boots') or world.logic_dc_jump) and state.is_adult()))
-    set_rule(world.get_location('Dodongos Cavern End of Bridge Chest'), lambda state: state.has_explosives() or ((state.has('Bow') or state.has('Hover Boots') or world.logic_dc_jump) and state.is_adult() and state.has('Hammer')))
-    set_rule(world.get_entrance('Dodongos Cavern Bomb Drop'), lambda state: state.has_explosives())
-    set_rule(world.get_location('King Dodongo'), lambda state: state.has('Bomb Bag') or state.has('Progressive Strength Upgrade'))
-    set_rule(world.get_location('King Dodongo Heart'), lambda state: state.has('Bomb Bag') or state.has('Progressive Strength Upgrade'))
-    set_rule(world.get_location('Song from Saria'), lambda state: state.has('Zeldas Letter'))
-    set_rule(world.get_entrance('Mountain Summit Fairy'), lambda state: state.can_blast_or_smash())
-    set_rule(world.get_location('Crater Fairy Reward'), lambda state: state.can_play('Zeldas Lullaby'))
-    set_rule(world.get_location('Mountain Summit Fairy Reward'), lambda state: state.can_play('Zeldas Lullaby'))
-    set_rule(world.get_entrance('Mountain Crater Entrance'), lambda state: state.can_blast_or_smash())
-    set_rule(world.get_entrance('Hyrule Castle Fairy'), lambda state: state.has_explosives())
-    set_rule(world.get_location('Hyrule Castle Fairy Reward'), lambda state: state.can_play('Zeldas Lullaby'))
-    set_rule(world.get_entrance('Hyrule Castle Garden'), lambda state: state.has('Weird Egg') or (not world.shuffle_weird_egg))    
-    set_rule(world.get_entrance('Ganons Castle Grounds'), lambda state: state.is_adult())
-    set_rule(world.get_entrance('Ganons Castle Fairy'), lambda state: state.has('Progressive Strength Upgrade', 3))
-    set_rule(world.get_location('Ganons Castle Fairy Reward'), lambda state: state.can_play('Zeldas Lullaby'))
-    set_rule(world.get_location('Bombchu Bowling Bomb Bag'), lambda state: state.has_bombchus())
-    set_rule(world.get_location('Bombchu Bowling Piece of Heart'), lambda state: state.has_bombchus())
-    set_rule(world.get_location('Adult Shooting Gallery'), lambda state: state.has('Bow') and state.is_adult())
-    set_rule(world.get_location('10 Big Poes'), lambda state: (not world.logic_no_big_poes) and (state.has('Bow') and state.has('Epona') and state.has_bottle() and state.is_adult() and state.guarantee_hint()))
-    set_rule(world.get_location('Treasure Chest Game'), lambda state: state.has('Lens of Truth') and state.has('Magic Meter'))
-    set_rule(world.get_entrance('Lost Woods Dive Warp'), lambda state: state.can_dive() and (world.open_forest or (state.has('Slingshot') and state.has('Kokiri Sword'))))
-    set_rule(world.get_entrance('Zora River Dive Warp'), lambda state: state.can_dive())
-    set_rule(world.get_entrance('Lake Hylia Dive Warp'), lambda state: state.can_dive())
-    set_rule(world.get_entrance('Zoras Domain Dive Warp'), lambda state: state.can_dive())
-    set_rule(world.get_entrance('Zora River Waterfall'), lambda state: state.can_play('Zeldas Lullaby'))
-    set_rule(world.get_entrance('Zora River Rocks'), lambda state: state.has_explosives())
-    set_rule(world.get_location('Zora River Lower Freestanding PoH'), lambda state: state.has_explosives() or state.has('Progressive Scale') or (state.has('Hover Boots') and state.is_adult()))
-    set_rule(world.get_location('Zora River Upper Freestanding PoH'), lambda state: state.has_explosives() or state.has('Progressive Scale') or (state.has('Hover Boots') and state.is_adult()))
-    set_rule(world.get_location('Frog Ocarina Game'), lambda state: state.can_play('Zeldas Lullaby') and state.can_play('Sarias Song') and state.can_play('Suns Song') and state.can_play('Eponas Song') and state.can_play('Song of Time') and state.can_play('Song of Storms'))
-    set_rule(world.get_location('Frogs in the Rain'), lambda state: state.can_play('Song of Storms'))
-    set_rule(world.get_location('Underwater Bottle'), lambda state: state.can_dive())
-    set_rule(world.get_location('King Zora Moves'), lambda state: state.has('Bottle with Letter'))
-    set_rule(world.get_entrance('Behind King Zora'), lambda state: state.has('Bottle with Letter'))
-    set_rule(world.get_entrance('Zora River Adult'), lambda state: state.is_adult())
-    set_rule(world.get_entrance('Zoras Domain Adult Access'), lambda state: state.can_play('Zeldas Lullaby'))
-    set_rule(world.get_entrance('Zoras Fountain Adult Access'), lambda state: state.can_reach('Zoras Fountain'))
-    set_rule(world.get_entrance('Jabu Jabus Belly'), lambda state: state.has_bottle())
-    set_rule(world.get_entrance('Zoras Fountain Fairy'), lambda state: state.has_explosives())
-    set_rule(world.get_location('Zoras Fountain Fairy Reward'), lambda state: state.can_play('Zeldas Lullaby'))
-    set_rule(world.get_entrance('Jabu Jabus Belly Ceiling Switch'), lambda state: state.has('Slingshot') or state.has_explosives() or state.has('Boomerang'))
-    set_rule(world.get_entrance('Jabu Jabus Belly Tentacles'), lambda state: state.has('Boomerang'))
-    set_rule(world.get_location('Ice Cavern Map Chest'), lambda state: state.has_bottle())
-    set_rule(world.get_location('Ice Cavern Compass Chest'), lambda state: state.has_bottle())
-    set_rule(world.get_location('Ice Cavern Freestanding PoH'), lambda state: state.has_bottle())
-    set_rule(world.get_location('Ice Cavern Iron Boots Chest'), lambda state: state.has_bottle())
-    set_rule(world.get_location('Sheik in Ice Cavern'), lambda state: state.has_bottle() and state.is_adult())
-    set_rule(world.get_location('Ocarina of Time'), lambda state: state.has('Kokiri Emerald') and state.has('Goron Ruby') and state.has('Zora Sapphire') and state.guarantee_hint())
-    set_rule(world.get_location('Song from Ocarina of Time'), lambda state: state.has('Kokiri Emerald') and state.has('Goron Ruby') and state.has('Zora Sapphire') and state.guarantee_hint())
-    set_rule(world.get_entrance('Door of Time'), lambda state: state.can_play('Song of Time') or world.open_door_of_time)
-    set_rule(world.get_location('Talons Chickens'), lambda state: state.has('Zeldas Letter'))
-    set_rule(world.get_location('Song from Malon'), lambda state: state.has('Zeldas Letter') and state.has_ocarina())
-    set_rule(world.get_location('Epona'), lambda state: state.can_play('Eponas Song') and state.is_adult())
-    set_rule(world.get_entrance('Adult Forest Warp Pad'), lambda state: state.can_play('Minuet of Forest') and state.is_adult())
-    set_rule(world.get_entrance('Child Forest Warp Pad'), lambda state: state.can_play('Minuet of Forest'))
-    set_rule(world.get_entrance('Adult Meadow Access'), lambda state: state.can_play('Sarias Song') and state.is_adult())
-    set_rule(world.get_entrance('Forest Temple Entrance'), lambda state: state.has('Progressive Hookshot') and state.is_adult())
-    set_rule(world.get_entrance('Forest Temple Song of Time Block'), lambda state: state.can_play('Song of Time'))
-    set_rule(world.get_entrance('Forest Temple Lobby Eyeball Switch'), lambda state: state.has('Bow') and state.is_adult())
-    set_rule(world.get_entrance('Forest Temple Lobby Locked Door'), lambda state: state.has('Progressive Strength Upgrade') and state.has('Small Key (Forest Temple)', 1))
-    set_rule(world.get_entrance('Forest Temple Well Connection'), lambda state: ((state.has('Iron Boots') or state.has('Progressive Hookshot', 2)) and state.is_adult()) or state.has('Progressive Scale', 2)) #Longshot can grab some very high up vines to drain the well.
-    set_rule(world.get_entrance('Forest Temple Scarecrows Song'), lambda state: False) #For some reason you can't actually activate this from below. Cool game.
-    set_rule(world.get_entrance('Forest Temple Elevator'), lambda state: state.has('Bow') and state.is_adult() and state.has('Progressive Strength Upgrade') and state.has('Small Key (Forest Temple)', 3))
-    set_rule(world.get_entrance('Forest Temple Outside Backdoor'), lambda state: state.has('Hover Boots') and state.is_adult())
-    set_rule(world.get_entrance('Forest Temple Twisted Hall'), lambda state: state.has('Small Key (Forest Temple)', 3))
-    set_rule(world.get_entrance('Forest Temple Straightened Hall'), lambda state: state.has('Small Key (Forest Temple)', 2) and state.has('Bow'))
-    set_rule(world.get_entrance('Forest Temple Drop to Falling Room'), lambda state: state.has('Small Key (Forest Temple)', 5) and (state.has('Bow') or (state.has('Dins Fire') and state.has('Magic Meter'))))
-    set_rule(world.get_location('Forest Temple Block Push Chest'), lambda state: state.has('Bow') and state.is_adult())
-    set_rule(world.get_location('Forest Temple Red Poe Chest'), lambda state: state.has('Bow') and state.is_adult())
-    set_rule(world.get_location('Forest Temple Blue Poe Chest'), lambda state: state.has('Bow') and state.is_adult())
-    set_rule(world.get_location('Phantom Ganon'), lambda state: state.has('Boss Key (Forest Temple)'))
-    set_rule(world.get_location('Phantom Ganon Heart'), lambda state: state.has('Boss Key (Forest Temple)'))
-    set_rule(world.get_entrance('Dampes Grave'), lambda state: state.is_adult())
-    set_rule(world.get_location('Dampe Race Freestanding PoH'), lambda state: not world.logic_no_second_dampe_race)
-    set_rule(world.get_location('Graveyard Freestanding PoH'), lambda state: state.is_adult() and (state.has('Magic Bean') or state.has('Progressive Hookshot', 2)))
-    set_rule(world.get_location('Song at Windmill'), lambda state: state.is_adult() and state.has_ocarina())
-    set_rule(world.get_location('Windmill Freestanding PoH'), lambda state: (state.is_adult() and ( world.logic_windmill_hp or state.can_play('Song of Time') )) or state.has('Boomerang'))
-    set_rule(world.get_entrance('Temple Warp Pad'), lambda state: state.can_play('Prelude of Light'))
-    set_rule(world.get_location('Sheik at Temple'), lambda state: state.has('Forest Medallion') and state.is_adult())
-    set_rule(world.get_location('Diving in the Lab'), lambda state: state.has('Progressive Scale', 2))
-    set_rule(world.get_location('Child Fishing'), lambda state: (not world.logic_no_child_fishing) and state.has('Kokiri Sword'))
-    set_rule(world.get_location('Adult Fishing'), lambda state: (not world.logic_no_adult_fishing) and (state.is_adult() and ((state.has('Progressive Hookshot') and state.has_ocarina()) or state.has('Magic Bean'))))
-    set_rule(world.get_location('Lake Hylia Freestanding PoH'), lambda state: state.is_adult() and ((state.has('Progressive Hookshot') and state.has_ocarina()) or state.has('Magic Bean')))
-    set_rule(world.get_location('Lake Hylia Sun'), lambda state: ((state.has('Progressive Hookshot', 2) and state.has_ocarina()) or state.can_reach(world.get_location('Morpha'))) and state.has('Bow') and state.is_adult())
-    set_rule(world.get_entrance('Crater Hover Boots'), lambda state: state.is_adult() and state.has('Hover Boots'))
-    set_rule(world.get_entrance('Crater Ascent'), lambda state: state.is_adult())
-    set_rule(world.get_entrance('Crater Scarecrow'), lambda state: state.is_adult() and state.has_ocarina() and state.has('Progressive Hookshot', 2))
-    set_rule(world.get_entrance('Crater Bridge'), lambda state: state.is_adult() and (state.has('Hover Boots') or state.has('Progressive Hookshot')))
-    set_rule(world.get_entrance('Crater Bridge Reverse'), lambda state: state.is_adult() and (state.has('Hover Boots') or state.has('Progressive Hookshot')))
-    set_rule(world.get_entrance('Crater Warp Pad'), lambda state: state.can_play('Bolero of Fire'))
-    set_rule(world.get_entrance('Crater Fairy'), lambda state: state.is_adult() and state.has('Hammer'))
-    set_rule(world.get_location('DM Crater Volcano Freestanding PoH'), lambda state: state.is_adult() and state.has('Magic Bean') and state.can_play('Bolero of Fire'))
-    set_rule(world.get_entrance('Fire Temple Entrance'), lambda state: state.is_adult())
-    set_rule(world.get_entrance('Fire Temple Early Climb'), lambda state: state.has_GoronTunic() and state.has('Small Key (Fire Temple)', 3) and state.has('Progressive Strength Upgrade') and (state.has_explosives() or ((state.has('Bow') or state.has('Progressive Hookshot')) and state.is_adult())))
-    set_rule(world.get_entrance('Fire Temple Fire Maze Escape'), lambda state: state.has('Small Key (Fire Temple)', 7) or (state.has('Small Key (Fire Temple)', 6) and state.has('Hover Boots') and state.has('Hammer') and state.is_adult()))
-    set_rule(world.get_location('Fire Temple Fire Dancer Chest'), lambda state: state.is_adult() and state.has('Hammer'))
-    set_rule(world.get_location('Fire Temple Boss Key Chest'), lambda state: state.is_adult() and state.has('Hammer'))
-    set_rule(world.get_location('Fire Temple Big Lava Room Bombable Chest'), lambda state: state.has('Small Key (Fire Temple)', 1) and state.has_explosives())
-    set_rule(world.get_location('Fire Temple Big Lava Room Open Chest'), lambda state: state.has('Small Key (Fire Temple)', 1))
-    set_rule(world.get_location('Fire Temple Map Chest'), lambda state: state.has('Small Key (Fire Temple)', 5) or (state.has('Small Key (Fire Temple)', 4) and state.is_adult() and state.has('Bow')))
-    set_rule(world.get_location('Fire Temple Boulder Maze Upper Chest'), lambda state: state.has('Small Key (Fire Temple)', 5))
-    set_rule(world.get_location('Fire Temple Boulder Maze Bombable Pit'), lambda state: state.has('Small Key (Fire Temple)', 5) and state.has_explosives())
-    set_rule(world.get_location('Fire Temple Scarecrow Chest'), lambda state: state.has_ocarina() and state.has('Small Key (Fire Temple)', 5) and state.has('Progressive Hookshot') and state.is_adult())
-    set_rule(world.get_location('Fire Temple Compass Chest'), lambda state: state.has('Small Key (Fire Temple)', 6))
-    set_rule(world.get_location('Fire Temple Highest Goron Chest'), lambda state: state.can_play('Song of Time') and state.has('Hammer') and state.is_adult())
-    set_rule(world.get_location('Fire Temple Megaton Hammer Chest'), lambda state: state.has_explosives())
-    set_rule(world.get_location('Volvagia'), lambda state: state.has_GoronTunic() and state.has('Hammer') and state.is_adult() and state.has('Boss Key (Fire Temple)') and (state.has('Hover Boots') or (state.can_reach('Fire Temple Upper') and (state.can_play('Song of Time') or state.has_explosives()))))
-    set_rule(world.get_location('Volvagia Heart'), lambda state: state.has_GoronTunic() and state.has('Hammer') and state.is_adult() and state.has('Boss Key (Fire Temple)') and (state.has('Hover Boots') or (state.can_reach('Fire Temple Upper') and (state.can_play('Song of Time') or state.has_explosives()))))
-    set_rule(world.get_location('Sheik in Crater'), lambda state: state.is_adult())
-    set_rule(world.get_location('Link the Goron'), lambda state: state.is_adult() and (state.has('Progressive Strength Upgrade') or state.has_explosives() or state.has('Bow')))
-    set_rule(world.get_entrance('Crater Access'), lambda state: state.is_adult() and (state.has('Progressive Strength Upgrade') or state.can_blast_or_smash()))
-    set_rule(world.get_entrance('Lake Warp Pad'), lambda state: state.can_play('Serenade of Water'))
-    set_rule(world.get_location('King Zora Thawed'), lambda state: state.has_bottle() and (state.can_reach('Ice Cavern') or state.can_reach('Ganons Castle Water Trial') or state.has('Progressive Wallet', 2)))
-    set_rule(world.get_location('Zoras Fountain Bottom Freestanding PoH'), lambda state: state.has('Iron Boots'))
-    set_rule(world.get_entrance('Water Temple Entrance'), lambda state: state.is_adult() and state.has('Iron Boots') and state.has('Progressive Hookshot'))
-    set_rule(world.get_entrance('Water Temple Central Pillar'), lambda state: (state.has('Bow') or (state.has('Dins Fire') and state.has('Magic Meter')) or state.has('Small Key (Water Temple)', 5)) and state.can_play('Zeldas Lullaby'))
-    set_rule(world.get_entrance('Water Temple Upper Locked Door'), lambda state: state.has('Small Key (Water Temple)', 5) and (state.can_play('Zeldas Lullaby') or world.keysanity))
-    set_rule(world.get_location('Water Temple Torches Chest'), lambda state: (state.has('Bow') or (state.has('Dins Fire') and state.has('Magic Meter'))) and state.can_play('Zeldas Lullaby'))
-    set_rule(world.get_location('Water Temple Dragon Chest'), lambda state: (state.has('Progressive Strength Upgrade') and state.can_play('Zeldas Lullaby')) or (state.has('Small Key (Water Temple)', 6) and (state.can_play('Zeldas Lullaby') or world.keysanity) and state.can_play('Song of Time') and state.has('Bow')))
-    set_rule(world.get_location('Water Temple Central Bow Target Chest'), lambda state: state.has('Bow') and state.has('Progressive Strength Upgrade') and state.can_play('Zeldas Lullaby') and (state.has('Hover Boots') or state.has('Progressive Hookshot', 2)))
+    set_rule(world.get_entrance('Deku Tree'), "has('Kokiri Sword') or open_forest")
+    set_rule(world.get_entrance('Lost Woods Bridge'), "open_forest or (has('Slingshot') and has('Kokiri Sword'))")
+    set_rule(world.get_entrance('Deku Tree Basement Path'), "has('Slingshot')")
+    set_rule(world.get_location('Skull Kid'), "can_play('Sarias Song')")
+    set_rule(world.get_location('Ocarina Memory Game'), "(not logic_no_memory_game) and has_ocarina()")
+    set_rule(world.get_location('Target in Woods'), "has('Slingshot')")
+    set_rule(world.get_location('Deku Theater Skull Mask'), "(not logic_no_trade_skull_mask) and has('Zeldas Letter')")
+    set_rule(world.get_location('Deku Theater Mask of Truth'), "(not logic_no_trade_mask_of_truth) and (has('Zeldas Letter') and can_play('Sarias Song') and has('Kokiri Emerald') and has('Goron Ruby') and has('Zora Sapphire') and guarantee_hint())") #Must befriend Skull Kid to sell Skull Mask, all stones to spawn running man.
+    set_rule(world.get_location('Anju as Adult'), "is_adult()")
+    set_rule(world.get_location('Man on Roof'), "logic_man_on_roof or (has('Progressive Hookshot') and is_adult())")
+    set_rule(world.get_location('10 Gold Skulltulla Reward'), "(logic_skulltulas >= 10) and has('Gold Skulltulla Token', 10)")
+    set_rule(world.get_location('20 Gold Skulltulla Reward'), "(logic_skulltulas >= 20) and has('Gold Skulltulla Token', 20)")
+    set_rule(world.get_location('30 Gold Skulltulla Reward'), "(logic_skulltulas >= 30) and has('Gold Skulltulla Token', 30) and guarantee_hint()")
+    set_rule(world.get_location('40 Gold Skulltulla Reward'), "(logic_skulltulas >= 40) and has('Gold Skulltulla Token', 40) and guarantee_hint()")
+    set_rule(world.get_location('50 Gold Skulltulla Reward'), "(logic_skulltulas >= 50) and has('Gold Skulltulla Token', 50) and guarantee_hint()")
+    set_rule(world.get_location('Heart Piece Grave Chest'), "can_play('Suns Song')")
+    set_rule(world.get_entrance('Composer Grave'), "can_play('Zeldas Lullaby')")
+    set_rule(world.get_location('Composer Grave Chest'), "has_fire_source()")
+    set_rule(world.get_entrance('Bottom of the Well'), "can_play('Song of Storms')")
+    set_rule(world.get_location('Bottom of the Well Front Left Hidden Wall'), "can_see_with_lens()")
+    set_rule(world.get_location('Bottom of the Well Front Center Bombable'), "has_explosives()")
+    set_rule(world.get_location('Bottom of the Well Right Bottom Hidden Wall'), "can_see_with_lens()")
+    set_rule(world.get_location('Bottom of the Well Center Large Chest'), "can_see_with_lens()")
+    set_rule(world.get_location('Bottom of the Well Center Small Chest'), "can_see_with_lens()")
+    set_rule(world.get_location('Bottom of the Well Back Left Bombable'), "has_explosives()")
+    set_rule(world.get_location('Bottom of the Well Defeat Boss'), "can_play('Zeldas Lullaby') and (has('Kokiri Sword') or logic_child_deadhand)") #Sword not strictly necessary but frankly being forced to do this with sticks isn't fair
+    set_rule(world.get_location('Bottom of the Well Invisible Chest'), "can_play('Zeldas Lullaby') and can_see_with_lens()")
+    set_rule(world.get_location('Bottom of the Well Underwater Front Chest'), "can_play('Zeldas Lullaby')")
+    set_rule(world.get_location('Bottom of the Well Underwater Left Chest'), "can_play('Zeldas Lullaby')")
+    set_rule(world.get_location('Bottom of the Well Basement Chest'), "has_explosives()")
+    set_rule(world.get_location('Bottom of the Well Locked Pits'), "has('Small Key (Bottom of the Well)', 3) and can_see_with_lens()") #These pits are really unfair.
+    set_rule(world.get_location('Bottom of the Well Behind Right Grate'), "has('Small Key (Bottom of the Well)', 3) and can_see_with_lens()")
+    set_rule(world.get_entrance('Death Mountain Entrance'), "has('Zeldas Letter') or is_adult()")
+    set_rule(world.get_location('Death Mountain Bombable Chest'), "can_blast_or_smash()")
+    set_rule(world.get_location('Biggoron'), "(not logic_no_trade_biggoron) and (can_blast_or_smash() and is_adult() and can_finish_adult_trades() and guarantee_hint())")
+    set_rule(world.get_location('Goron City Leftmost Maze Chest'), "is_adult() and (has('Progressive Strength Upgrade', 2) or has('Hammer'))")
+    set_rule(world.get_location('Goron City Left Maze Chest'), "can_blast_or_smash() or (has('Progressive Strength Upgrade', 2) and is_adult())")
+    set_rule(world.get_location('Goron City Right Maze Chest'), "can_blast_or_smash() or (has('Progressive Strength Upgrade', 2) and is_adult())")
+    set_rule(world.get_location('Rolling Goron as Child'), "has('Bomb Bag')")
+    set_rule(world.get_location('Goron City Pot Freestanding PoH'), "(has('Bomb Bag') or has('Progressive Strength Upgrade')) and (can_play('Zeldas Lullaby') or (has('Dins Fire') and has('Magic Meter')))")
+    set_rule(world.get_entrance('Darunias Chamber'), "can_play('Zeldas Lullaby')")
+    set_rule(world.get_location('Darunias Joy'), "can_play('Sarias Song')")
+    set_rule(world.get_entrance('Goron City from Woods'), "can_blast_or_smash() and (open_forest or (has('Slingshot') and has('Kokiri Sword')))")
+    set_rule(world.get_entrance('Dodongos Cavern Rocks'), "can_blast_or_smash() or has('Progressive Strength Upgrade') or is_adult()")
+    set_rule(world.get_entrance('Dodongos Cavern Lobby'), "can_blast_or_smash() or has('Progressive Strength Upgrade')")
+    set_rule(world.get_entrance('Dodongos Cavern Left Door'), "has_explosives() or has('Progressive Strength Upgrade') or (has('Dins Fire') and has('Magic Meter'))")
+    set_rule(world.get_entrance('Dodongos Cavern Slingshot Target'), "has('Slingshot') or ((has('Bow') or has('Hover Boots') or logic_dc_jump) and is_adult())")
+    set_rule(world.get_location('Dodongos Cavern End of Bridge Chest'), "has_explosives() or ((has('Bow') or has('Hover Boots') or logic_dc_jump) and is_adult() and has('Hammer'))")
+    set_rule(world.get_entrance('Dodongos Cavern Bomb Drop'), "has_explosives()")
+    set_rule(world.get_location('King Dodongo'), "has('Bomb Bag') or has('Progressive Strength Upgrade')")
+    set_rule(world.get_location('King Dodongo Heart'), "has('Bomb Bag') or has('Progressive Strength Upgrade')")
+    set_rule(world.get_location('Song from Saria'), "has('Zeldas Letter')")
+    set_rule(world.get_entrance('Mountain Summit Fairy'), "can_blast_or_smash()")
+    set_rule(world.get_location('Crater Fairy Reward'), "can_play('Zeldas Lullaby')")
+    set_rule(world.get_location('Mountain Summit Fairy Reward'), "can_play('Zeldas Lullaby')")
+    set_rule(world.get_entrance('Mountain Crater Entrance'), "can_blast_or_smash()")
+    set_rule(world.get_entrance('Hyrule Castle Fairy'), "has_explosives()")
+    set_rule(world.get_location('Hyrule Castle Fairy Reward'), "can_play('Zeldas Lullaby')")
+    set_rule(world.get_entrance('Hyrule Castle Garden'), "has('Weird Egg') or (not shuffle_weird_egg)")    
+    set_rule(world.get_entrance('Ganons Castle Grounds'), "is_adult()")
+    set_rule(world.get_entrance('Ganons Castle Fairy'), "has('Progressive Strength Upgrade', 3)")
+    set_rule(world.get_location('Ganons Castle Fairy Reward'), "can_play('Zeldas Lullaby')")
+    set_rule(world.get_location('Bombchu Bowling Bomb Bag'), "has_bombchus()")
+    set_rule(world.get_location('Bombchu Bowling Piece of Heart'), "has_bombchus()")
+    set_rule(world.get_location('Adult Shooting Gallery'), "has('Bow') and is_adult()")
+    set_rule(world.get_location('10 Big Poes'), "(not logic_no_big_poes) and (has('Bow') and has('Epona') and has_bottle() and is_adult() and guarantee_hint())")
+    set_rule(world.get_location('Treasure Chest Game'), "has('Lens of Truth') and has('Magic Meter')")
+    set_rule(world.get_entrance('Lost Woods Dive Warp'), "can_dive() and (open_forest or (has('Slingshot') and has('Kokiri Sword')))")
+    set_rule(world.get_entrance('Zora River Dive Warp'), "can_dive()")
+    set_rule(world.get_entrance('Lake Hylia Dive Warp'), "can_dive()")
+    set_rule(world.get_entrance('Zoras Domain Dive Warp'), "can_dive()")
+    set_rule(world.get_entrance('Zora River Waterfall'), "can_play('Zeldas Lullaby')")
+    set_rule(world.get_entrance('Zora River Rocks'), "has_explosives()")
+    set_rule(world.get_location('Zora River Lower Freestanding PoH'), "has_explosives() or has('Progressive Scale') or (has('Hover Boots') and is_adult())")
+    set_rule(world.get_location('Zora River Upper Freestanding PoH'), "has_explosives() or has('Progressive Scale') or (has('Hover Boots') and is_adult())")
+    set_rule(world.get_location('Frog Ocarina Game'), "can_play('Zeldas Lullaby') and can_play('Sarias Song') and can_play('Suns Song') and can_play('Eponas Song') and can_play('Song of Time') and can_play('Song of Storms')")
+    set_rule(world.get_location('Frogs in the Rain'), "can_play('Song of Storms')")
+    set_rule(world.get_location('Underwater Bottle'), "can_dive()")
+    set_rule(world.get_location('King Zora Moves'), "has('Bottle with Letter')")
+    set_rule(world.get_entrance('Behind King Zora'), "has('Bottle with Letter')")
+    set_rule(world.get_entrance('Zora River Adult'), "is_adult()")
+    set_rule(world.get_entrance('Zoras Domain Adult Access'), "can_play('Zeldas Lullaby')")
+    set_rule(world.get_entrance('Zoras Fountain Adult Access'), "can_reach('Zoras Fountain')")
+    set_rule(world.get_entrance('Jabu Jabus Belly'), "has_bottle()")
+    set_rule(world.get_entrance('Zoras Fountain Fairy'), "has_explosives()")
+    set_rule(world.get_location('Zoras Fountain Fairy Reward'), "can_play('Zeldas Lullaby')")
+    set_rule(world.get_entrance('Jabu Jabus Belly Ceiling Switch'), "has('Slingshot') or has_explosives() or has('Boomerang')")
+    set_rule(world.get_entrance('Jabu Jabus Belly Tentacles'), "has('Boomerang')")
+    set_rule(world.get_location('Ice Cavern Map Chest'), "has_bottle()")
+    set_rule(world.get_location('Ice Cavern Compass Chest'), "has_bottle()")
+    set_rule(world.get_location('Ice Cavern Freestanding PoH'), "has_bottle()")
+    set_rule(world.get_location('Ice Cavern Iron Boots Chest'), "has_bottle()")
+    set_rule(world.get_location('Sheik in Ice Cavern'), "has_bottle() and is_adult()")
+    set_rule(world.get_location('Ocarina of Time'), "has('Kokiri Emerald') and has('Goron Ruby') and has('Zora Sapphire') and guarantee_hint()")
+    set_rule(world.get_location('Song from Ocarina of Time'), "has('Kokiri Emerald') and has('Goron Ruby') and has('Zora Sapphire') and guarantee_hint()")
+    set_rule(world.get_entrance('Door of Time'), "can_play('Song of Time') or open_door_of_time")
+    set_rule(world.get_location('Talons Chickens'), "has('Zeldas Letter')")
+    set_rule(world.get_location('Song from Malon'), "has('Zeldas Letter') and has_ocarina()")
+    set_rule(world.get_location('Epona'), "can_play('Eponas Song') and is_adult()")
+    set_rule(world.get_entrance('Adult Forest Warp Pad'), "can_play('Minuet of Forest') and is_adult()")
+    set_rule(world.get_entrance('Child Forest Warp Pad'), "can_play('Minuet of Forest')")
+    set_rule(world.get_entrance('Adult Meadow Access'), "can_play('Sarias Song') and is_adult()")
+    set_rule(world.get_entrance('Forest Temple Entrance'), "has('Progressive Hookshot') and is_adult()")
+    set_rule(world.get_entrance('Forest Temple Song of Time Block'), "can_play('Song of Time')")
+    set_rule(world.get_entrance('Forest Temple Lobby Eyeball Switch'), "has('Bow') and is_adult()")
+    set_rule(world.get_entrance('Forest Temple Lobby Locked Door'), "has('Progressive Strength Upgrade') and has('Small Key (Forest Temple)', 1)")
+    set_rule(world.get_entrance('Forest Temple Well Connection'), "((has('Iron Boots') or has('Progressive Hookshot', 2)) and is_adult()) or has('Progressive Scale', 2)") #Longshot can grab some very high up vines to drain the well.
+    set_rule(world.get_entrance('Forest Temple Scarecrows Song'), "False") #For some reason you can't actually activate this from below. Cool game.
+    set_rule(world.get_entrance('Forest Temple Elevator'), "has('Bow') and is_adult() and has('Progressive Strength Upgrade') and has('Small Key (Forest Temple)', 3)")
+    set_rule(world.get_entrance('Forest Temple Outside Backdoor'), "has('Hover Boots') and is_adult()")
+    set_rule(world.get_entrance('Forest Temple Twisted Hall'), "has('Small Key (Forest Temple)', 3)")
+    set_rule(world.get_entrance('Forest Temple Straightened Hall'), "has('Small Key (Forest Temple)', 2) and has('Bow')")
+    set_rule(world.get_entrance('Forest Temple Drop to Falling Room'), "has('Small Key (Forest Temple)', 5) and (has('Bow') or (has('Dins Fire') and has('Magic Meter')))")
+    set_rule(world.get_location('Forest Temple Block Push Chest'), "has('Bow') and is_adult()")
+    set_rule(world.get_location('Forest Temple Red Poe Chest'), "has('Bow') and is_adult()")
+    set_rule(world.get_location('Forest Temple Blue Poe Chest'), "has('Bow') and is_adult()")
+    set_rule(world.get_location('Phantom Ganon'), "has('Boss Key (Forest Temple)')")
+    set_rule(world.get_location('Phantom Ganon Heart'), "has('Boss Key (Forest Temple)')")
+    set_rule(world.get_entrance('Dampes Grave'), "is_adult()")
+    set_rule(world.get_location('Dampe Race Freestanding PoH'), "not logic_no_second_dampe_race")
+    set_rule(world.get_location('Graveyard Freestanding PoH'), "is_adult() and (has('Magic Bean') or has('Progressive Hookshot', 2))")
+    set_rule(world.get_location('Song at Windmill'), "is_adult() and has_ocarina()")
+    set_rule(world.get_location('Windmill Freestanding PoH'), "(is_adult() and ( logic_windmill_hp or can_play('Song of Time') )) or has('Boomerang')")
+    set_rule(world.get_entrance('Temple Warp Pad'), "can_play('Prelude of Light')")
+    set_rule(world.get_location('Sheik at Temple'), "has('Forest Medallion') and is_adult()")
+    set_rule(world.get_location('Diving in the Lab'), "has('Progressive Scale', 2)")
+    set_rule(world.get_location('Child Fishing'), "(not logic_no_child_fishing) and has('Kokiri Sword')")
+    set_rule(world.get_location('Adult Fishing'), "(not logic_no_adult_fishing) and (is_adult() and ((has('Progressive Hookshot') and has_ocarina()) or has('Magic Bean')))")
+    set_rule(world.get_location('Lake Hylia Freestanding PoH'), "is_adult() and ((has('Progressive Hookshot') and has_ocarina()) or has('Magic Bean'))")
+    set_rule(world.get_location('Lake Hylia Sun'), "((has('Progressive Hookshot', 2) and has_ocarina()) or can_reach('Morpha', 'Location')) and has('Bow') and is_adult()")
+    set_rule(world.get_entrance('Crater Hover Boots'), "is_adult() and has('Hover Boots')")
+    set_rule(world.get_entrance('Crater Ascent'), "is_adult()")
+    set_rule(world.get_entrance('Crater Scarecrow'), "is_adult() and has_ocarina() and has('Progressive Hookshot', 2)")
+    set_rule(world.get_entrance('Crater Bridge'), "is_adult() and (has('Hover Boots') or has('Progressive Hookshot'))")
+    set_rule(world.get_entrance('Crater Bridge Reverse'), "is_adult() and (has('Hover Boots') or has('Progressive Hookshot'))")
+    set_rule(world.get_entrance('Crater Warp Pad'), "can_play('Bolero of Fire')")
+    set_rule(world.get_entrance('Crater Fairy'), "is_adult() and has('Hammer')")
+    set_rule(world.get_location('DM Crater Volcano Freestanding PoH'), "is_adult() and has('Magic Bean') and can_play('Bolero of Fire')")
+    set_rule(world.get_entrance('Fire Temple Entrance'), "is_adult()")
+    set_rule(world.get_entrance('Fire Temple Early Climb'), "has_GoronTunic() and has('Small Key (Fire Temple)', 3) and has('Progressive Strength Upgrade') and (has_explosives() or ((has('Bow') or has('Progressive Hookshot')) and is_adult()))")
+    set_rule(world.get_entrance('Fire Temple Fire Maze Escape'), "has('Small Key (Fire Temple)', 7) or (has('Small Key (Fire Temple)', 6) and has('Hover Boots') and has('Hammer') and is_adult())")
+    set_rule(world.get_location('Fire Temple Fire Dancer Chest'), "is_adult() and has('Hammer')")
+    set_rule(world.get_location('Fire Temple Boss Key Chest'), "is_adult() and has('Hammer')")
+    set_rule(world.get_location('Fire Temple Big Lava Room Bombable Chest'), "has('Small Key (Fire Temple)', 1) and has_explosives()")
+    set_rule(world.get_location('Fire Temple Big Lava Room Open Chest'), "has('Small Key (Fire Temple)', 1)")
+    set_rule(world.get_location('Fire Temple Map Chest'), "has('Small Key (Fire Temple)', 5) or (has('Small Key (Fire Temple)', 4) and is_adult() and has('Bow'))")
+    set_rule(world.get_location('Fire Temple Boulder Maze Upper Chest'), "has('Small Key (Fire Temple)', 5)")
+    set_rule(world.get_location('Fire Temple Boulder Maze Bombable Pit'), "has('Small Key (Fire Temple)', 5) and has_explosives()")
+    set_rule(world.get_location('Fire Temple Scarecrow Chest'), "has_ocarina() and has('Small Key (Fire Temple)', 5) and has('Progressive Hookshot') and is_adult()")
+    set_rule(world.get_location('Fire Temple Compass Chest'), "has('Small Key (Fire Temple)', 6)")
+    set_rule(world.get_location('Fire Temple Highest Goron Chest'), "can_play('Song of Time') and has('Hammer') and is_adult()")
+    set_rule(world.get_location('Fire Temple Megaton Hammer Chest'), "has_explosives()")
+    set_rule(world.get_location('Volvagia'), "has_GoronTunic() and has('Hammer') and is_adult() and has('Boss Key (Fire Temple)') and (has('Hover Boots') or (can_reach('Fire Temple Upper') and (can_play('Song of Time') or has_explosives())))")
+    set_rule(world.get_location('Volvagia Heart'), "has_GoronTunic() and has('Hammer') and is_adult() and has('Boss Key (Fire Temple)') and (has('Hover Boots') or (can_reach('Fire Temple Upper') and (can_play('Song of Time') or has_explosives())))")
+    set_rule(world.get_location('Sheik in Crater'), "is_adult()")
+    set_rule(world.get_location('Link the Goron'), "is_adult() and (has('Progressive Strength Upgrade') or has_explosives() or has('Bow'))")
+    set_rule(world.get_entrance('Crater Access'), "is_adult() and (has('Progressive Strength Upgrade') or can_blast_or_smash())")
+    set_rule(world.get_entrance('Lake Warp Pad'), "can_play('Serenade of Water')")
+    set_rule(world.get_location('King Zora Thawed'), "has_bottle() and (can_reach('Ice Cavern') or can_reach('Ganons Castle Water Trial') or has('Progressive Wallet', 2))")
+    set_rule(world.get_location('Zoras Fountain Bottom Freestanding PoH'), "has('Iron Boots')")
+    set_rule(world.get_entrance('Water Temple Entrance'), "is_adult() and has('Iron Boots') and has('Progressive Hookshot')")
+    set_rule(world.get_entrance('Water Temple Central Pillar'), "(has('Bow') or (has('Dins Fire') and has('Magic Meter')) or has('Small Key (Water Temple)', 5)) and can_play('Zeldas Lullaby')")
+    set_rule(world.get_entrance('Water Temple Upper Locked Door'), "has('Small Key (Water Temple)', 5) and (can_play('Zeldas Lullaby') or keysanity)")
+    set_rule(world.get_location('Water Temple Torches Chest'), "(has('Bow') or (has('Dins Fire') and has('Magic Meter'))) and can_play('Zeldas Lullaby')")
+    set_rule(world.get_location('Water Temple Dragon Chest'), "(has('Progressive Strength Upgrade') and can_play('Zeldas Lullaby')) or (has('Small Key (Water Temple)', 6) and (can_play('Zeldas Lullaby') or keysanity) and can_play('Song of Time') and has('Bow'))")
+    set_rule(world.get_location('Water Temple Central Bow Target Chest'), "has('Bow') and has('Progressive Strength Upgrade') and can_play('Zeldas Lullaby') and (has('Hover Boots') or has('Progressive Hookshot', 2))")
     set_always_allow(world.get_location('Water Temple Boss Key Chest'), lambda item, state: item.name == 'Small Key (Water Temple)')
-    set_rule(world.get_location('Water Temple Boss Key Chest'), lambda state: (state.has('Small Key (Water Temple)', 6) and (state.can_play('Zeldas Lullaby') or world.keysanity) and ((state.has_explosives() and state.has('Progressive Strength Upgrade')) or state.has('Hover Boots')) and state.has('Progressive Hookshot', 2)) or item_name(state, 'Water Temple Boss Key Chest') == 'Small Key (Water Temple)') #If key for key, this lets the logic reduce the small key reqs for every other locked door.
-    set_rule(world.get_location('Morpha'), lambda state: state.has('Boss Key (Water Temple)') and state.has('Progressive Hookshot', 2))
-    set_rule(world.get_location('Morpha Heart'), lambda state: state.has('Boss Key (Water Temple)') and state.has('Progressive Hookshot', 2))
-    set_rule(world.get_location('Water Temple Cracked Wall Chest'), lambda state: state.has_explosives())
-    set_rule(world.get_location('Water Temple Dark Link Chest'), lambda state: state.has('Small Key (Water Temple)', 6) and (state.can_play('Zeldas Lullaby') or world.keysanity))
-    set_rule(world.get_location('Water Temple River Chest'), lambda state: state.has('Small Key (Water Temple)', 6) and state.can_play('Song of Time') and state.has('Bow') and (state.can_play('Zeldas Lullaby') or world.keysanity))
-    set_rule(world.get_location('Water Temple Central Pillar Chest'), lambda state: state.has_ZoraTunic())
-    set_rule(world.get_location('Sheik in Kakariko'), lambda state: state.is_adult() and state.has('Forest Medallion') and state.has('Fire Medallion') and state.has('Water Medallion'))
-    set_rule(world.get_entrance('Graveyard Warp Pad'), lambda state: state.can_play('Nocturne of Shadow'))
-    set_rule(world.get_entrance('Shadow Temple Entrance'), lambda state: state.has('Dins Fire') and state.has('Magic Meter') and state.can_see_with_lens() and state.is_adult() and (state.has('Hover Boots') or state.has('Progressive Hookshot')))
-    set_rule(world.get_entrance('Shadow Temple First Pit'), lambda state: state.has('Hover Boots'))
-    set_rule(world.get_entrance('Shadow Temple Bomb Wall'), lambda state: state.has_explosives() and state.has('Small Key (Shadow Temple)', 1))
-    set_rule(world.get_entrance('Shadow Temple Hookshot Target'), lambda state: state.has('Progressive Hookshot') and state.has('Small Key (Shadow Temple)', 3))
-    set_rule(world.get_entrance('Shadow Temple Boat'), lambda state: state.can_play('Zeldas Lullaby') and state.has('Small Key (Shadow Temple)', 4))
-    set_rule(world.get_location('Shadow Temple Falling Spikes Upper Chest'), lambda state: state.has('Progressive Strength Upgrade'))
-    set_rule(world.get_location('Shadow Temple Falling Spikes Switch Chest'), lambda state: state.has('Progressive Strength Upgrade'))
-    set_rule(world.get_location('Shadow Temple Invisible Spikes Chest'), lambda state: state.has('Small Key (Shadow Temple)', 2))
-    set_rule(world.get_location('Shadow Temple Freestanding Key'), lambda state: state.has('Small Key (Shadow Temple)', 2) and state.has('Progressive Hookshot'))
-    set_rule(world.get_location('Bongo Bongo'), lambda state: state.has('Small Key (Shadow Temple)', 5) and (state.has('Bow') or state.has('Progressive Hookshot', 2)) and state.has('Boss Key (Shadow Temple)'))
-    set_rule(world.get_location('Bongo Bongo Heart'), lambda state: state.has('Small Key (Shadow Temple)', 5) and (state.has('Bow') or state.has('Progressive Hookshot', 2)) and state.has('Boss Key (Shadow Temple)'))
-    set_rule(world.get_entrance('Bridge Crossing'), lambda state: (state.has('Epona') or state.has('Progressive Hookshot', 2) or world.gerudo_fortress == 'open') and state.is_adult())
-    set_rule(world.get_location('Gerudo Valley Hammer Rocks Chest'), lambda state: state.has('Hammer') and state.is_adult())
-    set_rule(world.get_entrance('Fortress Entrance'), lambda state: (state.has('Bow') or state.has('Progressive Hookshot') or state.has('Hover Boots') or world.gerudo_fortress == 'open' or world.gerudo_fortress == 'fast') and state.is_adult())
-    set_rule(world.get_entrance('Gerudo Training Grounds Entrance'), lambda state: state.has('Gerudo Membership Card') and state.is_adult())
-    set_rule(world.get_entrance('Haunted Wasteland Entrance'), lambda state: state.has('Gerudo Membership Card') and state.is_adult() and (state.has('Hover Boots') or state.has('Progressive Hookshot', 2)))
-    set_rule(world.get_entrance('Haunted Wasteland Crossing'), lambda state: (world.logic_lens == 'chest') or (state.has('Lens of Truth') and state.has('Magic Meter')))
-    set_rule(world.get_entrance('Colossus Warp Pad'), lambda state: state.can_play('Requiem of Spirit'))
-    set_rule(world.get_entrance('Colossus Fairy'), lambda state: state.has_explosives())
-    set_rule(world.get_location('Colossus Freestanding PoH'), lambda state: state.can_play('Requiem of Spirit') and state.has('Magic Bean') and state.is_adult())
-    set_rule(world.get_location('Desert Colossus Fairy Reward'), lambda state: state.can_play('Zeldas Lullaby'))
-    set_rule(world.get_location('Gerudo Fortress Rooftop Chest'), lambda state: (state.has('Hover Boots') or (state.has('Progressive Hookshot') and state.has_ocarina()) or (state.has('Progressive Hookshot', 2))) and state.is_adult())
-    set_rule(world.get_location('Horseback Archery 1000 Points'), lambda state: state.has('Gerudo Membership Card') and state.has('Epona') and state.has('Bow') and state.is_adult())
-    set_rule(world.get_location('Horseback Archery 1500 Points'), lambda state: (not world.logic_no_1500_archery) and (state.has('Gerudo Membership Card') and state.has('Epona') and state.has('Bow') and state.is_adult()))
-    set_rule(world.get_location('Haunted Wasteland Structure Chest'), lambda state: state.has_fire_source())
-    set_rule(world.get_entrance('Gerudo Training Ground Left Silver Rupees'), lambda state: state.has('Progressive Hookshot') and state.is_adult())
-    set_rule(world.get_entrance('Gerudo Training Ground Beamos'), lambda state: state.has_explosives())
-    set_rule(world.get_entrance('Gerudo Training Grounds Right Locked Doors'), lambda state: state.has('Small Key (Gerudo Training Grounds)', 9))
-    set_rule(world.get_entrance('Gerudo Training Grounds Maze Ledge'), lambda state: state.can_play('Song of Time'))
-    set_rule(world.get_entrance('Gerudo Training Grounds Right Hookshot Target'), lambda state: state.has('Progressive Hookshot') and state.is_adult())
-    set_rule(world.get_entrance('Gerudo Training Grounds Hammer Target'), lambda state: state.has('Hammer') and state.has('Bow') and state.is_adult())
-    set_rule(world.get_entrance('Gerudo Training Grounds Hidden Hookshot Target'), lambda state: state.has('Progressive Hookshot') and state.can_see_with_lens() and state.is_adult())
-    set_rule(world.get_location('Gerudo Training Grounds Lobby Left Chest'), lambda state: state.has('Bow') and state.is_adult())
-    set_rule(world.get_location('Gerudo Training Grounds Lobby Right Chest'), lambda state: state.has('Bow') and state.is_adult())
-    set_rule(world.get_location('Gerudo Training Grounds Beamos Chest'), lambda state: state.has_explosives())
-    set_rule(world.get_location('Gerudo Training Grounds Hidden Ceiling Chest'), lambda state: state.has('Small Key (Gerudo Training Grounds)', 3) and state.can_see_with_lens())
-    set_rule(world.get_location('Gerudo Training Grounds Maze Path First Chest'), lambda state: state.has('Small Key (Gerudo Training Grounds)', 4))
-    set_rule(world.get_location('Gerudo Training Grounds Maze Path Second Chest'), lambda state: state.has('Small Key (Gerudo Training Grounds)', 6))
-    set_rule(world.get_location('Gerudo Training Grounds Maze Path Third Chest'), lambda state: state.has('Small Key (Gerudo Training Grounds)', 7))
-    set_rule(world.get_location('Gerudo Training Grounds Maze Path Final Chest'), lambda state: (state.has('Small Key (Gerudo Training Grounds)', 9)) or (item_name(state, 'Gerudo Training Grounds Maze Path Final Chest') == 'Small Key (Gerudo Training Grounds)' and state.has('Small Key (Gerudo Training Grounds)', 8))) #Allow key for key
+    set_rule(world.get_location('Water Temple Boss Key Chest'), "(has('Small Key (Water Temple)', 6) and (can_play('Zeldas Lullaby') or keysanity) and ((has_explosives() and has('Progressive Strength Upgrade')) or has('Hover Boots')) and has('Progressive Hookshot', 2)) or item_name('Water Temple Boss Key Chest') == 'Small Key (Water Temple)'") #If key for key, this lets the logic reduce the small key reqs for every other locked door.
+    set_rule(world.get_location('Morpha'), "has('Boss Key (Water Temple)') and has('Progressive Hookshot', 2)")
+    set_rule(world.get_location('Morpha Heart'), "has('Boss Key (Water Temple)') and has('Progressive Hookshot', 2)")
+    set_rule(world.get_location('Water Temple Cracked Wall Chest'), "has_explosives()")
+    set_rule(world.get_location('Water Temple Dark Link Chest'), "has('Small Key (Water Temple)', 6) and (can_play('Zeldas Lullaby') or keysanity)")
+    set_rule(world.get_location('Water Temple River Chest'), "has('Small Key (Water Temple)', 6) and can_play('Song of Time') and has('Bow') and (can_play('Zeldas Lullaby') or keysanity)")
+    set_rule(world.get_location('Water Temple Central Pillar Chest'), "has_ZoraTunic()")
+    set_rule(world.get_location('Sheik in Kakariko'), "is_adult() and has('Forest Medallion') and has('Fire Medallion') and has('Water Medallion')")
+    set_rule(world.get_entrance('Graveyard Warp Pad'), "can_play('Nocturne of Shadow')")
+    set_rule(world.get_entrance('Shadow Temple Entrance'), "has('Dins Fire') and has('Magic Meter') and can_see_with_lens() and is_adult() and (has('Hover Boots') or has('Progressive Hookshot'))")
+    set_rule(world.get_entrance('Shadow Temple First Pit'), "has('Hover Boots')")
+    set_rule(world.get_entrance('Shadow Temple Bomb Wall'), "has_explosives() and has('Small Key (Shadow Temple)', 1)")
+    set_rule(world.get_entrance('Shadow Temple Hookshot Target'), "has('Progressive Hookshot') and has('Small Key (Shadow Temple)', 3)")
+    set_rule(world.get_entrance('Shadow Temple Boat'), "can_play('Zeldas Lullaby') and has('Small Key (Shadow Temple)', 4)")
+    set_rule(world.get_location('Shadow Temple Falling Spikes Upper Chest'), "has('Progressive Strength Upgrade')")
+    set_rule(world.get_location('Shadow Temple Falling Spikes Switch Chest'), "has('Progressive Strength Upgrade')")
+    set_rule(world.get_location('Shadow Temple Invisible Spikes Chest'), "has('Small Key (Shadow Temple)', 2)")
+    set_rule(world.get_location('Shadow Temple Freestanding Key'), "has('Small Key (Shadow Temple)', 2) and has('Progressive Hookshot')")
+    set_rule(world.get_location('Bongo Bongo'), "has('Small Key (Shadow Temple)', 5) and (has('Bow') or has('Progressive Hookshot', 2)) and has('Boss Key (Shadow Temple)')")
+    set_rule(world.get_location('Bongo Bongo Heart'), "has('Small Key (Shadow Temple)', 5) and (has('Bow') or has('Progressive Hookshot', 2)) and has('Boss Key (Shadow Temple)')")
+    set_rule(world.get_entrance('Bridge Crossing'), "(has('Epona') or has('Progressive Hookshot', 2) or gerudo_fortress == 'open') and is_adult()")
+    set_rule(world.get_location('Gerudo Valley Hammer Rocks Chest'), "has('Hammer') and is_adult()")
+    set_rule(world.get_entrance('Fortress Entrance'), "(has('Bow') or has('Progressive Hookshot') or has('Hover Boots') or gerudo_fortress == 'open' or gerudo_fortress == 'fast') and is_adult()")
+    set_rule(world.get_entrance('Gerudo Training Grounds Entrance'), "has('Gerudo Membership Card') and is_adult()")
+    set_rule(world.get_entrance('Haunted Wasteland Entrance'), "has('Gerudo Membership Card') and is_adult() and (has('Hover Boots') or has('Progressive Hookshot', 2))")
+    set_rule(world.get_entrance('Haunted Wasteland Crossing'), "(logic_lens == 'chest') or (has('Lens of Truth') and has('Magic Meter'))")
+    set_rule(world.get_entrance('Colossus Warp Pad'), "can_play('Requiem of Spirit')")
+    set_rule(world.get_entrance('Colossus Fairy'), "has_explosives()")
+    set_rule(world.get_location('Colossus Freestanding PoH'), "can_play('Requiem of Spirit') and has('Magic Bean') and is_adult()")
+    set_rule(world.get_location('Desert Colossus Fairy Reward'), "can_play('Zeldas Lullaby')")
+    set_rule(world.get_location('Gerudo Fortress Rooftop Chest'), "(has('Hover Boots') or (has('Progressive Hookshot') and has_ocarina()) or (has('Progressive Hookshot', 2))) and is_adult()")
+    set_rule(world.get_location('Horseback Archery 1000 Points'), "has('Gerudo Membership Card') and has('Epona') and has('Bow') and is_adult()")
+    set_rule(world.get_location('Horseback Archery 1500 Points'), "(not logic_no_1500_archery) and (has('Gerudo Membership Card') and has('Epona') and has('Bow') and is_adult())")
+    set_rule(world.get_location('Haunted Wasteland Structure Chest'), "has_fire_source()")
+    set_rule(world.get_entrance('Gerudo Training Ground Left Silver Rupees'), "has('Progressive Hookshot') and is_adult()")
+    set_rule(world.get_entrance('Gerudo Training Ground Beamos'), "has_explosives()")
+    set_rule(world.get_entrance('Gerudo Training Grounds Right Locked Doors'), "has('Small Key (Gerudo Training Grounds)', 9)")
+    set_rule(world.get_entrance('Gerudo Training Grounds Maze Ledge'), "can_play('Song of Time')")
+    set_rule(world.get_entrance('Gerudo Training Grounds Right Hookshot Target'), "has('Progressive Hookshot') and is_adult()")
+    set_rule(world.get_entrance('Gerudo Training Grounds Hammer Target'), "has('Hammer') and has('Bow') and is_adult()")
+    set_rule(world.get_entrance('Gerudo Training Grounds Hidden Hookshot Target'), "has('Progressive Hookshot') and can_see_with_lens() and is_adult()")
+    set_rule(world.get_location('Gerudo Training Grounds Lobby Left Chest'), "has('Bow') and is_adult()")
+    set_rule(world.get_location('Gerudo Training Grounds Lobby Right Chest'), "has('Bow') and is_adult()")
+    set_rule(world.get_location('Gerudo Training Grounds Beamos Chest'), "has_explosives()")
+    set_rule(world.get_location('Gerudo Training Grounds Hidden Ceiling Chest'), "has('Small Key (Gerudo Training Grounds)', 3) and can_see_with_lens()")
+    set_rule(world.get_location('Gerudo Training Grounds Maze Path First Chest'), "has('Small Key (Gerudo Training Grounds)', 4)")
+    set_rule(world.get_location('Gerudo Training Grounds Maze Path Second Chest'), "has('Small Key (Gerudo Training Grounds)', 6)")
+    set_rule(world.get_location('Gerudo Training Grounds Maze Path Third Chest'), "has('Small Key (Gerudo Training Grounds)', 7)")
+    set_rule(world.get_location('Gerudo Training Grounds Maze Path Final Chest'), "(has('Small Key (Gerudo Training Grounds)', 9)) or (item_name('Gerudo Training Grounds Maze Path Final Chest') == 'Small Key (Gerudo Training Grounds)' and has('Small Key (Gerudo Training Grounds)', 8))") #Allow key for key
     set_always_allow(world.get_location('Gerudo Training Grounds Maze Path Final Chest'), lambda item, state: item.name == 'Small Key (Gerudo Training Grounds)')
-    set_rule(world.get_location('Gerudo Training Grounds Underwater Silver Rupee Chest'), lambda state: state.has('Progressive Hookshot') and state.can_play('Song of Time') and state.has('Iron Boots') and state.is_adult())
-    set_rule(world.get_location('Gerudo Training Grounds Hammer Room Switch Chest'), lambda state: state.has('Hammer') and state.is_adult())
-    set_rule(world.get_location('Gerudo Training Grounds Eye Statue Chest'), lambda state: state.has('Bow') and state.is_adult())
-    set_rule(world.get_location('Gerudo Training Grounds Near Scarecrow Chest'), lambda state: state.has('Bow') and state.is_adult())
-    set_rule(world.get_location('Gerudo Training Grounds Heavy Block First Chest'), lambda state: state.has('Progressive Strength Upgrade', 2) and state.can_see_with_lens() and state.is_adult())
-    set_rule(world.get_location('Gerudo Training Grounds Heavy Block Second Chest'), lambda state: state.has('Progressive Strength Upgrade', 2) and state.can_see_with_lens() and state.is_adult())
-    set_rule(world.get_location('Gerudo Training Grounds Heavy Block Third Chest'), lambda state: state.has('Progressive Strength Upgrade', 2) and state.can_see_with_lens() and state.is_adult())
-    set_rule(world.get_location('Gerudo Training Grounds Heavy Block Fourth Chest'), lambda state: state.has('Progressive Strength Upgrade', 2) and state.can_see_with_lens() and state.is_adult())
-    set_rule(world.get_entrance('Spirit Temple Crawl Passage'), lambda state: state.can_play('Requiem of Spirit'))
-    set_rule(world.get_entrance('Spirit Temple Silver Block'), lambda state: state.has('Progressive Strength Upgrade', 2) and state.is_adult())
-    set_rule(world.get_entrance('Child Spirit Temple Passthrough'), lambda state: state.has_explosives() and state.has('Small Key (Spirit Temple)', 1))
-    set_rule(world.get_entrance('Adult Spirit Temple Passthrough'), lambda state: state.has('Small Key (Spirit Temple)', 1))
-    set_rule(world.get_entrance('Spirit Temple Central Locked Door'), lambda state: state.has('Small Key (Spirit Temple)', 4) and state.has('Progressive Strength Upgrade', 2) and state.is_adult())
-    set_rule(world.get_entrance('Spirit Temple Final Locked Door'), lambda state: state.has('Small Key (Spirit Temple)', 5) and (state.has('Progressive Hookshot') or state.has('Bow') or state.has_explosives()))
-    set_rule(world.get_location('Spirit Temple Child Left Chest'), lambda state: state.has('Boomerang') or state.has('Slingshot'))
-    set_rule(world.get_location('Spirit Temple Child Right Chest'), lambda state: state.has('Boomerang') or state.has('Slingshot'))
-    set_rule(world.get_location('Spirit Temple Compass Chest'), lambda state: state.has('Progressive Hookshot') and state.can_play('Zeldas Lullaby'))
-    set_rule(world.get_location('Spirit Temple Early Adult Right Chest'), lambda state: state.has('Bow') or state.has('Progressive Hookshot') or state.has_bombchus()) #requires a very specific Bombchu use, Hover Boots can be skipped by jumping on top of the rolling rock.
-    set_rule(world.get_location('Spirit Temple First Mirror Right Chest'), lambda state: state.has('Small Key (Spirit Temple)', 3))
-    set_rule(world.get_location('Spirit Temple First Mirror Left Chest'), lambda state: state.has('Small Key (Spirit Temple)', 3))
-    set_rule(world.get_location('Spirit Temple Map Chest'), lambda state: (state.has('Small Key (Spirit Temple)', 5) and state.can_play('Requiem of Spirit')) or (state.has('Magic Meter') and (state.has('Dins Fire') or (state.has('Fire Arrows') and state.has('Bow') and state.has('Progressive Strength Upgrade', 2) and state.has('Small Key (Spirit Temple)', 3) and state.is_adult()))))
-    set_rule(world.get_location('Spirit Temple Child Climb East Chest'), lambda state: state.has_explosives() or ((state.has('Boomerang') or state.has('Slingshot')) and (state.has('Progressive Hookshot') or state.has('Bow'))) or (state.has('Small Key (Spirit Temple)', 3) and state.has('Progressive Strength Upgrade', 2) and state.is_adult() and (state.has('Progressive Hookshot') or state.has('Bow'))) or (state.has('Small Key (Spirit Temple)', 5) and state.can_play('Requiem of Spirit') and (state.has('Boomerang') or state.has('Slingshot'))))
-    set_rule(world.get_location('Spirit Temple Child Climb North Chest'), lambda state: state.has_explosives() or ((state.has('Boomerang') or state.has('Slingshot')) and (state.has('Progressive Hookshot') or state.has('Bow'))) or (state.has('Small Key (Spirit Temple)', 3) and state.has('Progressive Strength Upgrade', 2) and state.is_adult() and (state.has('Progressive Hookshot') or state.has('Bow'))) or (state.has('Small Key (Spirit Temple)', 5) and state.can_play('Requiem of Spirit') and (state.has('Boomerang') or state.has('Slingshot'))))
-    set_rule(world.get_location('Spirit Temple Sun Block Room Chest'), lambda state: (state.has('Small Key (Spirit Temple)', 5) and state.has_explosives() and state.can_play('Requiem of Spirit')) or (state.has_fire_source() and (state.has_explosives() or state.has('Small Key (Spirit Temple)', 2))))
-    set_rule(world.get_location('Spirit Temple Statue Hand Chest'), lambda state: state.has('Small Key (Spirit Temple)', 3) and state.has('Progressive Strength Upgrade', 2) and state.is_adult() and state.can_play('Zeldas Lullaby'))
-    set_rule(world.get_location('Spirit Temple NE Main Room Chest'), lambda state: state.has('Small Key (Spirit Temple)', 3) and state.has('Progressive Strength Upgrade', 2) and state.is_adult() and state.can_play('Zeldas Lullaby') and state.has('Progressive Hookshot'))
-    set_rule(world.get_location('Mirror Shield Chest'), lambda state: state.has('Small Key (Spirit Temple)', 4) and state.has('Progressive Strength Upgrade', 2) and state.is_adult() and state.has_explosives())
-    set_rule(world.get_location('Silver Gauntlets Chest'), lambda state: (state.has('Small Key (Spirit Temple)', 3) and state.has('Progressive Hookshot', 2) and state.has_explosives()) or state.has('Small Key (Spirit Temple)', 5))
-    set_rule(world.get_location('Spirit Temple Near Four Armos Chest'), lambda state: state.has('Mirror Shield') and state.has_explosives())
-    set_rule(world.get_location('Spirit Temple Hallway Left Invisible Chest'), lambda state: state.can_see_with_lens() and state.has_explosives())
-    set_rule(world.get_location('Spirit Temple Hallway Right Invisible Chest'), lambda state: state.can_see_with_lens() and state.has_explosives())
-    set_rule(world.get_location('Spirit Temple Boss Key Chest'), lambda state: state.can_play('Zeldas Lullaby') and state.has('Bow') and state.has('Progressive Hookshot') and state.can_blast_or_smash())
-    set_rule(world.get_location('Spirit Temple Topmost Chest'), lambda state: state.has('Mirror Shield'))
-    set_rule(world.get_location('Twinrova'), lambda state: state.has('Mirror Shield') and state.has_explosives() and state.has('Progressive Hookshot') and state.has('Boss Key (Spirit Temple)'))
-    set_rule(world.get_location('Twinrova Heart'), lambda state: state.has('Mirror Shield') and state.has_explosives() and state.has('Progressive Hookshot') and state.has('Boss Key (Spirit Temple)'))
-    set_rule(world.get_location('Zelda'), lambda state: state.has('Shadow Medallion') and state.has('Spirit Medallion'))
-    set_rule(world.get_entrance('Ganons Castle Light Trial'), lambda state: state.has('Progressive Strength Upgrade', 3))
-    set_rule(world.get_entrance('Ganons Castle Tower'), lambda state: (world.skipped_trials['Forest'] or state.has('Forest Trial Clear')) and (world.skipped_trials['Fire'] or state.has('Fire Trial Clear')) and (world.skipped_trials['Water'] or state.has('Water Trial Clear')) and (world.skipped_trials['Shadow'] or state.has('Shadow Trial Clear')) and (world.skipped_trials['Spirit'] or state.has('Spirit Trial Clear')) and (world.skipped_trials['Light'] or state.has('Light Trial Clear')))
-    set_rule(world.get_location('Ganons Castle Forest Trial Clear'), lambda state: state.has('Magic Meter') and state.has('Bow') and state.has('Light Arrows') and (state.has('Fire Arrows') or (state.has('Progressive Hookshot') and state.has('Dins Fire'))))
-    set_rule(world.get_location('Ganons Castle Fire Trial Clear'), lambda state: state.has_GoronTunic() and state.has('Progressive Strength Upgrade', 3) and state.has('Magic Meter') and state.has('Bow') and state.has('Light Arrows') and state.has('Progressive Hookshot', 2))
-    set_rule(world.get_location('Ganons Castle Water Trial Clear'), lambda state: state.has_bottle() and state.has('Hammer') and state.has('Magic Meter') and state.has('Bow') and state.has('Light Arrows'))
-    set_rule(world.get_location('Ganons Castle Shadow Trial Clear'), lambda state: state.has('Magic Meter') and state.has('Bow') and state.has('Light Arrows') and state.has('Hammer') and (state.has('Fire Arrows') or state.has('Progressive Hookshot', 2)) and (state.can_see_with_lens() or (state.has('Hover Boots') and state.has('Progressive Hookshot', 2))))
-    set_rule(world.get_location('Ganons Castle Shadow Trial First Chest'), lambda state: (state.has('Magic Meter') and state.has('Bow') and state.has('Fire Arrows')) or state.has('Progressive Hookshot') or state.has('Hover Boots') or state.can_play('Song of Time'))
-    set_rule(world.get_location('Ganons Castle Shadow Trial Second Chest'), lambda state: (state.has('Magic Meter') and state.has('Bow') and state.has('Fire Arrows')) or (state.has('Progressive Hookshot', 2) and state.has('Hover Boots')))
-    set_rule(world.get_location('Ganons Castle Spirit Trial Clear'), lambda state: state.has('Magic Meter') and state.has('Bow') and state.has('Light Arrows') and state.has('Mirror Shield') and state.has_bombchus() and state.has('Progressive Hookshot'))
-    set_rule(world.get_location('Ganons Castle Spirit Trial First Chest'), lambda state: state.has('Progressive Hookshot') and (state.has('Magic Meter') or state.has_explosives()))
-    set_rule(world.get_location('Ganons Castle Spirit Trial Second Chest'), lambda state: state.has('Progressive Hookshot') and state.has('Magic Meter') and state.has_bombchus() and state.can_see_with_lens())
-    set_rule(world.get_location('Ganons Castle Light Trial Clear'), lambda state: state.has('Magic Meter') and state.has('Bow') and state.has('Progressive Hookshot') and state.has('Light Arrows') and state.has('Small Key (Ganons Castle)', 2))
-    set_rule(world.get_location('Ganons Castle Light Trail Invisible Enemies Chest'), lambda state: state.can_see_with_lens())
-    set_rule(world.get_location('Ganons Castle Light Trial Lullaby Chest'), lambda state: state.can_play('Zeldas Lullaby') and state.has('Small Key (Ganons Castle)', 1))
-    set_rule(world.get_location('Ganon'), lambda state: (state.has('Boss Key (Ganons Castle)') or world.unlocked_ganondorf) and (state.has('Magic Meter') and state.has('Bow') and state.has('Light Arrows')) )
-    set_rule(world.get_entrance('Kokiri Forest Storms Grotto'), lambda state: state.can_play('Song of Storms'))
-    set_rule(world.get_entrance('Lost Woods Generic Grotto'), lambda state: state.can_blast_or_smash())
-    set_rule(world.get_entrance('Lost Woods Sales Grotto'), lambda state: state.has_explosives() or (state.has('Hammer') and state.is_adult() and (state.can_play('Minuet of Forest') or state.can_play('Sarias Song'))))
-    set_rule(world.get_entrance('Front of Meadow Grotto'), lambda state: state.has_explosives() or (state.has('Hammer') and state.is_adult() and (state.can_play('Minuet of Forest') or state.can_play('Sarias Song'))))
-    set_rule(world.get_entrance('Remote Southern Grotto'), lambda state: state.can_blast_or_smash())
-    set_rule(world.get_entrance('Field Near Lake Inside Fence Grotto'), lambda state: state.can_blast_or_smash())
-    set_rule(world.get_entrance('Field Valley Grotto'), lambda state: state.can_blast_or_smash())
-    set_rule(world.get_entrance('Field West Castle Town Grotto'), lambda state: state.can_blast_or_smash())
-    set_rule(world.get_entrance('Field Far West Castle Town Grotto'), lambda state: state.can_blast_or_smash())
-    set_rule(world.get_entrance('Field Kakariko Grotto'), lambda state: state.can_blast_or_smash())
-    set_rule(world.get_entrance('Field North Lon Lon Grotto'), lambda state: state.can_blast_or_smash())
-    set_rule(world.get_entrance('Castle Storms Grotto'), lambda state: state.can_play('Song of Storms'))
-    set_rule(world.get_entrance('Kakariko Bombable Grotto'), lambda state: state.can_blast_or_smash())
-    set_rule(world.get_entrance('Mountain Bombable Grotto'), lambda state: state.can_blast_or_smash())
-    set_rule(world.get_entrance('Mountain Storms Grotto'), lambda state: state.can_play('Song of Storms'))
-    set_rule(world.get_entrance('Top of Crater Grotto'), lambda state: state.can_blast_or_smash())
-    set_rule(world.get_entrance('Zora River Plateau Open Grotto'), lambda state: state.has_explosives() or state.has('Progressive Scale') or state.is_adult())
-    set_rule(world.get_entrance('Zora River Plateau Bombable Grotto'), lambda state: state.can_blast_or_smash())
-    set_rule(world.get_location('Tektite Grotto Freestanding PoH'), lambda state: state.has('Progressive Scale', 2) or (state.has('Iron Boots') and state.is_adult()))
-    set_rule(world.get_location('GS Kokiri Know It All House'), lambda state: state.nighttime() and state.can_reach('Hyrule Field'))
-    set_rule(world.get_location('GS Kokiri Bean Patch'), lambda state: state.has_bottle())
-    set_rule(world.get_location('GS Kokiri House of Twins'), lambda state: state.has('Progressive Hookshot') and state.is_adult() and state.nighttime())
-    set_rule(world.get_location('GS Lost Woods Bean Patch Near Bridge'), lambda state: state.has_bottle())
-    set_rule(world.get_location('GS Lost Woods Bean Patch Near Stage'), lambda state: state.has_bottle())
-    set_rule(world.get_location('GS Lost Woods Above Stage'), lambda state: state.has('Magic Bean') and state.nighttime())
-    set_rule(world.get_location('GS Sacred Forest Meadow'), lambda state: state.has('Progressive Hookshot') and state.is_adult() and state.nighttime())
-    set_rule(world.get_location('GS Deku Tree Basement Vines'), lambda state: state.has('Slingshot') or state.has_explosives() or state.has('Boomerang') or (state.has('Dins Fire') and state.has('Magic Meter')))
-    set_rule(world.get_location('GS Deku Tree Basement Back Room'), lambda state: state.has('Boomerang') and state.has_explosives())
-    set_rule(world.get_location('GS Hyrule Field near Kakariko'), lambda state: (state.has('Boomerang') and state.has_explosives()) or (state.has('Progressive Hookshot') and state.is_adult()))
-    set_rule(world.get_location('GS Hyrule Field Near Gerudo Valley'), lambda state: (state.has('Hammer') and state.has_fire_source() and state.has('Progressive Hookshot') and state.is_adult()) or (state.has('Boomerang') and state.has_explosives() and state.has('Dins Fire') and state.has('Magic Meter')))
-    set_rule(world.get_location('GS Hyrule Castle Grotto'), lambda state: state.has('Boomerang') and state.has_explosives())
-    set_rule(world.get_location('GS Lon Lon Ranch Rain Shed'), lambda state: state.nighttime())
-    set_rule(world.get_location('GS Lon Lon Ranch House Window'), lambda state: state.has('Boomerang') and state.nighttime())
-    set_rule(world.get_location('GS Lon Lon Ranch Back Wall'), lambda state: state.has('Boomerang') and state.nighttime())
-    set_rule(world.get_location('GS Kakariko House Under Construction'), lambda state: state.nighttime())
-    set_rule(world.get_location('GS Kakariko Skulltula House'), lambda state: state.nighttime())
-    set_rule(world.get_location('GS Kakariko Guard\'s House'), lambda state: state.nighttime())
-    set_rule(world.get_location('GS Kakariko Tree'), lambda state: state.nighttime())
-    set_rule(world.get_location('GS Kakariko Watchtower'), lambda state: state.has('Slingshot') or state.has_explosives() and state.nighttime())
-    set_rule(world.get_location('GS Kakariko Above Impa\'s House'), lambda state: state.has('Progressive Hookshot') and state.is_adult() and state.nighttime())
-    set_rule(world.get_location('GS Graveyard Wall'), lambda state: state.has('Boomerang') and state.nighttime())
-    set_rule(world.get_location('GS Graveyard Bean Patch'), lambda state: state.has_bottle())
-    set_rule(world.get_location('GS Mountain Trail Bean Patch'), lambda state: state.has_bottle() and (state.has_explosives() or state.has('Progressive Strength Upgrade')))
-    set_rule(world.get_location('GS Mountain Trail Bomb Alcove'), lambda state: state.can_blast_or_smash())
-    set_rule(world.get_location('GS Mountain Trail Path to Crater'), lambda state: state.has('Hammer') and state.is_adult() and state.nighttime())
-    set_rule(world.get_location('GS Mountain Trail Above Dodongo\'s Cavern'), lambda state: state.has('Hammer') and state.is_adult() and state.nighttime())
-    set_rule(world.get_location('GS Goron City Boulder Maze'), lambda state: state.has_explosives())
-    set_rule(world.get_location('GS Goron City Center Platform'), lambda state: state.is_adult())
-    set_rule(world.get_location('GS Death Mounter Bean Patch'), lambda state: state.can_play('Bolero of Fire') and state.has_bottle())
-    set_rule(world.get_location('GS Dodongo\'s Cavern Vines Above Stairs'), lambda state: state.has_explosives() or (state.has('Boomerang') or state.has('Slingshot') and state.has('Progressive Strength Upgrade')) or (state.has('Dins Fire') and state.has('Magic Meter')) or (state.is_adult and (state.has('Progressive Hookshot') or state.has('Bow') or state.has('Biggoron Sword'))))
-    set_rule(world.get_location('GS Dodongo\'s Cavern Alcove Above Stairs'), lambda state: (state.has('Progressive Hookshot') and state.is_adult()) or (state.has('Boomerang') and (state.has_explosives() or state.has('Progressive Strength Upgrade'))))
-    set_rule(world.get_location('GS Dodongo\'s Cavern Scarecrow'), lambda state: state.is_adult() and ( (state.has('Progressive Hookshot') and state.has_ocarina()) or state.has('Progressive Hookshot', 2) ))
-    set_rule(world.get_location('GS Zora River Ladder'), lambda state: state.nighttime())
-    set_rule(world.get_location('GS Zora River Near Raised Grottos'), lambda state: state.has('Progressive Hookshot') and state.nighttime())
-    set_rule(world.get_location('GS Zora River Above Bridge'), lambda state: state.has('Progressive Hookshot') and state.nighttime())
-    set_rule(world.get_location('GS Zora\'s Domain Frozen Waterfall'), lambda state: state.nighttime() and (state.has('Progressive Hookshot') or state.has('Bow') or state.has('Magic Meter')))
-    set_rule(world.get_location('GS Zora\'s Fountain Above the Log'), lambda state: state.has('Boomerang'))
-    set_rule(world.get_location('GS Zora\'s Fountain Hidden Cave'), lambda state: state.has('Progressive Strength Upgrade', 2) and state.can_blast_or_smash() and state.has('Progressive Hookshot') and state.nighttime())
+    set_rule(world.get_location('Gerudo Training Grounds Underwater Silver Rupee Chest'), "has('Progressive Hookshot') and can_play('Song of Time') and has('Iron Boots') and is_adult()")
+    set_rule(world.get_location('Gerudo Training Grounds Hammer Room Switch Chest'), "has('Hammer') and is_adult()")
+    set_rule(world.get_location('Gerudo Training Grounds Eye Statue Chest'), "has('Bow') and is_adult()")
+    set_rule(world.get_location('Gerudo Training Grounds Near Scarecrow Chest'), "has('Bow') and is_adult()")
+    set_rule(world.get_location('Gerudo Training Grounds Heavy Block First Chest'), "has('Progressive Strength Upgrade', 2) and can_see_with_lens() and is_adult()")
+    set_rule(world.get_location('Gerudo Training Grounds Heavy Block Second Chest'), "has('Progressive Strength Upgrade', 2) and can_see_with_lens() and is_adult()")
+    set_rule(world.get_location('Gerudo Training Grounds Heavy Block Third Chest'), "has('Progressive Strength Upgrade', 2) and can_see_with_lens() and is_adult()")
+    set_rule(world.get_location('Gerudo Training Grounds Heavy Block Fourth Chest'), "has('Progressive Strength Upgrade', 2) and can_see_with_lens() and is_adult()")
+    set_rule(world.get_entrance('Spirit Temple Crawl Passage'), "can_play('Requiem of Spirit')")
+    set_rule(world.get_entrance('Spirit Temple Silver Block'), "has('Progressive Strength Upgrade', 2) and is_adult()")
+    set_rule(world.get_entrance('Child Spirit Temple Passthrough'), "has_explosives() and has('Small Key (Spirit Temple)', 1)")
+    set_rule(world.get_entrance('Adult Spirit Temple Passthrough'), "has('Small Key (Spirit Temple)', 1)")
+    set_rule(world.get_entrance('Spirit Temple Central Locked Door'), "has('Small Key (Spirit Temple)', 4) and has('Progressive Strength Upgrade', 2) and is_adult()")
+    set_rule(world.get_entrance('Spirit Temple Final Locked Door'), "has('Small Key (Spirit Temple)', 5) and (has('Progressive Hookshot') or has('Bow') or has_explosives())")
+    set_rule(world.get_location('Spirit Temple Child Left Chest'), "has('Boomerang') or has('Slingshot')")
+    set_rule(world.get_location('Spirit Temple Child Right Chest'), "has('Boomerang') or has('Slingshot')")
+    set_rule(world.get_location('Spirit Temple Compass Chest'), "has('Progressive Hookshot') and can_play('Zeldas Lullaby')")
+    set_rule(world.get_location('Spirit Temple Early Adult Right Chest'), "has('Bow') or has('Progressive Hookshot') or has_bombchus()") #requires a very specific Bombchu use, Hover Boots can be skipped by jumping on top of the rolling rock.
+    set_rule(world.get_location('Spirit Temple First Mirror Right Chest'), "has('Small Key (Spirit Temple)', 3)")
+    set_rule(world.get_location('Spirit Temple First Mirror Left Chest'), "has('Small Key (Spirit Temple)', 3)")
+    set_rule(world.get_location('Spirit Temple Map Chest'), "(has('Small Key (Spirit Temple)', 5) and can_play('Requiem of Spirit')) or (has('Magic Meter') and (has('Dins Fire') or (has('Fire Arrows') and has('Bow') and has('Progressive Strength Upgrade', 2) and has('Small Key (Spirit Temple)', 3) and is_adult())))")
+    set_rule(world.get_location('Spirit Temple Child Climb East Chest'), "has_explosives() or ((has('Boomerang') or has('Slingshot')) and (has('Progressive Hookshot') or has('Bow'))) or (has('Small Key (Spirit Temple)', 3) and has('Progressive Strength Upgrade', 2) and is_adult() and (has('Progressive Hookshot') or has('Bow'))) or (has('Small Key (Spirit Temple)', 5) and can_play('Requiem of Spirit') and (has('Boomerang') or has('Slingshot')))")
+    set_rule(world.get_location('Spirit Temple Child Climb North Chest'), "has_explosives() or ((has('Boomerang') or has('Slingshot')) and (has('Progressive Hookshot') or has('Bow'))) or (has('Small Key (Spirit Temple)', 3) and has('Progressive Strength Upgrade', 2) and is_adult() and (has('Progressive Hookshot') or has('Bow'))) or (has('Small Key (Spirit Temple)', 5) and can_play('Requiem of Spirit') and (has('Boomerang') or has('Slingshot')))")
+    set_rule(world.get_location('Spirit Temple Sun Block Room Chest'), "(has('Small Key (Spirit Temple)', 5) and has_explosives() and can_play('Requiem of Spirit')) or (has_fire_source() and (has_explosives() or has('Small Key (Spirit Temple)', 2)))")
+    set_rule(world.get_location('Spirit Temple Statue Hand Chest'), "has('Small Key (Spirit Temple)', 3) and has('Progressive Strength Upgrade', 2) and is_adult() and can_play('Zeldas Lullaby')")
+    set_rule(world.get_location('Spirit Temple NE Main Room Chest'), "has('Small Key (Spirit Temple)', 3) and has('Progressive Strength Upgrade', 2) and is_adult() and can_play('Zeldas Lullaby') and has('Progressive Hookshot')")
+    set_rule(world.get_location('Mirror Shield Chest'), "has('Small Key (Spirit Temple)', 4) and has('Progressive Strength Upgrade', 2) and is_adult() and has_explosives()")
+    set_rule(world.get_location('Silver Gauntlets Chest'), "(has('Small Key (Spirit Temple)', 3) and has('Progressive Hookshot', 2) and has_explosives()) or has('Small Key (Spirit Temple)', 5)")
+    set_rule(world.get_location('Spirit Temple Near Four Armos Chest'), "has('Mirror Shield') and has_explosives()")
+    set_rule(world.get_location('Spirit Temple Hallway Left Invisible Chest'), "can_see_with_lens() and has_explosives()")
+    set_rule(world.get_location('Spirit Temple Hallway Right Invisible Chest'), "can_see_with_lens() and has_explosives()")
+    set_rule(world.get_location('Spirit Temple Boss Key Chest'), "can_play('Zeldas Lullaby') and has('Bow') and has('Progressive Hookshot') and can_blast_or_smash()")
+    set_rule(world.get_location('Spirit Temple Topmost Chest'), "has('Mirror Shield')")
+    set_rule(world.get_location('Twinrova'), "has('Mirror Shield') and has_explosives() and has('Progressive Hookshot') and has('Boss Key (Spirit Temple)')")
+    set_rule(world.get_location('Twinrova Heart'), "has('Mirror Shield') and has_explosives() and has('Progressive Hookshot') and has('Boss Key (Spirit Temple)')")
+    set_rule(world.get_location('Zelda'), "has('Shadow Medallion') and has('Spirit Medallion')")
+    set_rule(world.get_entrance('Ganons Castle Light Trial'), "has('Progressive Strength Upgrade', 3)")
+    set_rule(world.get_entrance('Ganons Castle Tower'), "(skipped_trials['Forest'] or has('Forest Trial Clear')) and (skipped_trials['Fire'] or has('Fire Trial Clear')) and (skipped_trials['Water'] or has('Water Trial Clear')) and (skipped_trials['Shadow'] or has('Shadow Trial Clear')) and (skipped_trials['Spirit'] or has('Spirit Trial Clear')) and (skipped_trials['Light'] or has('Light Trial Clear'))")
+    set_rule(world.get_location('Ganons Castle Forest Trial Clear'), "has('Magic Meter') and has('Bow') and has('Light Arrows') and (has('Fire Arrows') or (has('Progressive Hookshot') and has('Dins Fire')))")
+    set_rule(world.get_location('Ganons Castle Fire Trial Clear'), "has_GoronTunic() and has('Progressive Strength Upgrade', 3) and has('Magic Meter') and has('Bow') and has('Light Arrows') and has('Progressive Hookshot', 2)")
+    set_rule(world.get_location('Ganons Castle Water Trial Clear'), "has_bottle() and has('Hammer') and has('Magic Meter') and has('Bow') and has('Light Arrows')")
+    set_rule(world.get_location('Ganons Castle Shadow Trial Clear'), "has('Magic Meter') and has('Bow') and has('Light Arrows') and has('Hammer') and (has('Fire Arrows') or has('Progressive Hookshot', 2)) and (can_see_with_lens() or (has('Hover Boots') and has('Progressive Hookshot', 2)))")
+    set_rule(world.get_location('Ganons Castle Shadow Trial First Chest'), "(has('Magic Meter') and has('Bow') and has('Fire Arrows')) or has('Progressive Hookshot') or has('Hover Boots') or can_play('Song of Time')")
+    set_rule(world.get_location('Ganons Castle Shadow Trial Second Chest'), "(has('Magic Meter') and has('Bow') and has('Fire Arrows')) or (has('Progressive Hookshot', 2) and has('Hover Boots'))")
+    set_rule(world.get_location('Ganons Castle Spirit Trial Clear'), "has('Magic Meter') and has('Bow') and has('Light Arrows') and has('Mirror Shield') and has_bombchus() and has('Progressive Hookshot')")
+    set_rule(world.get_location('Ganons Castle Spirit Trial First Chest'), "has('Progressive Hookshot') and (has('Magic Meter') or has_explosives())")
+    set_rule(world.get_location('Ganons Castle Spirit Trial Second Chest'), "has('Progressive Hookshot') and has('Magic Meter') and has_bombchus() and can_see_with_lens()")
+    set_rule(world.get_location('Ganons Castle Light Trial Clear'), "has('Magic Meter') and has('Bow') and has('Progressive Hookshot') and has('Light Arrows') and has('Small Key (Ganons Castle)', 2)")
+    set_rule(world.get_location('Ganons Castle Light Trail Invisible Enemies Chest'), "can_see_with_lens()")
+    set_rule(world.get_location('Ganons Castle Light Trial Lullaby Chest'), "can_play('Zeldas Lullaby') and has('Small Key (Ganons Castle)', 1)")
+    set_rule(world.get_location('Ganon'), "(has('Boss Key (Ganons Castle)') or unlocked_ganondorf) and (has('Magic Meter') and has('Bow') and has('Light Arrows'))" )
+    set_rule(world.get_entrance('Kokiri Forest Storms Grotto'), "can_play('Song of Storms')")
+    set_rule(world.get_entrance('Lost Woods Generic Grotto'), "can_blast_or_smash()")
+    set_rule(world.get_entrance('Lost Woods Sales Grotto'), "has_explosives() or (has('Hammer') and is_adult() and (can_play('Minuet of Forest') or can_play('Sarias Song')))")
+    set_rule(world.get_entrance('Front of Meadow Grotto'), "has_explosives() or (has('Hammer') and is_adult() and (can_play('Minuet of Forest') or can_play('Sarias Song')))")
+    set_rule(world.get_entrance('Remote Southern Grotto'), "can_blast_or_smash()")
+    set_rule(world.get_entrance('Field Near Lake Inside Fence Grotto'), "can_blast_or_smash()")
+    set_rule(world.get_entrance('Field Valley Grotto'), "can_blast_or_smash()")
+    set_rule(world.get_entrance('Field West Castle Town Grotto'), "can_blast_or_smash()")
+    set_rule(world.get_entrance('Field Far West Castle Town Grotto'), "can_blast_or_smash()")
+    set_rule(world.get_entrance('Field Kakariko Grotto'), "can_blast_or_smash()")
+    set_rule(world.get_entrance('Field North Lon Lon Grotto'), "can_blast_or_smash()")
+    set_rule(world.get_entrance('Castle Storms Grotto'), "can_play('Song of Storms')")
+    set_rule(world.get_entrance('Kakariko Bombable Grotto'), "can_blast_or_smash()")
+    set_rule(world.get_entrance('Mountain Bombable Grotto'), "can_blast_or_smash()")
+    set_rule(world.get_entrance('Mountain Storms Grotto'), "can_play('Song of Storms')")
+    set_rule(world.get_entrance('Top of Crater Grotto'), "can_blast_or_smash()")
+    set_rule(world.get_entrance('Zora River Plateau Open Grotto'), "has_explosives() or has('Progressive Scale') or is_adult()")
+    set_rule(world.get_entrance('Zora River Plateau Bombable Grotto'), "can_blast_or_smash()")
+    set_rule(world.get_location('Tektite Grotto Freestanding PoH'), "has('Progressive Scale', 2) or (has('Iron Boots') and is_adult())")
+    set_rule(world.get_location('GS Kokiri Know It All House'), "nighttime() and can_reach('Hyrule Field')")
+    set_rule(world.get_location('GS Kokiri Bean Patch'), "has_bottle()")
+    set_rule(world.get_location('GS Kokiri House of Twins'), "has('Progressive Hookshot') and is_adult() and nighttime()")
+    set_rule(world.get_location('GS Lost Woods Bean Patch Near Bridge'), "has_bottle()")
+    set_rule(world.get_location('GS Lost Woods Bean Patch Near Stage'), "has_bottle()")
+    set_rule(world.get_location('GS Lost Woods Above Stage'), "has('Magic Bean') and nighttime()")
+    set_rule(world.get_location('GS Sacred Forest Meadow'), "has('Progressive Hookshot') and is_adult() and nighttime()")
+    set_rule(world.get_location('GS Deku Tree Basement Vines'), "has('Slingshot') or has_explosives() or has('Boomerang') or (has('Dins Fire') and has('Magic Meter'))")
+    set_rule(world.get_location('GS Deku Tree Basement Back Room'), "has('Boomerang') and has_explosives()")
+    set_rule(world.get_location('GS Hyrule Field near Kakariko'), "(has('Boomerang') and has_explosives()) or (has('Progressive Hookshot') and is_adult())")
+    set_rule(world.get_location('GS Hyrule Field Near Gerudo Valley'), "(has('Hammer') and has_fire_source() and has('Progressive Hookshot') and is_adult()) or (has('Boomerang') and has_explosives() and has('Dins Fire') and has('Magic Meter'))")
+    set_rule(world.get_location('GS Hyrule Castle Grotto'), "has('Boomerang') and has_explosives()")
+    set_rule(world.get_location('GS Lon Lon Ranch Rain Shed'), "nighttime()")
+    set_rule(world.get_location('GS Lon Lon Ranch House Window'), "has('Boomerang') and nighttime()")
+    set_rule(world.get_location('GS Lon Lon Ranch Back Wall'), "has('Boomerang') and nighttime()")
+    set_rule(world.get_location('GS Kakariko House Under Construction'), "nighttime()")
+    set_rule(world.get_location('GS Kakariko Skulltula House'), "nighttime()")
+    set_rule(world.get_location('GS Kakariko Guard\'s House'), "nighttime()")
+    set_rule(world.get_location('GS Kakariko Tree'), "nighttime()")
+    set_rule(world.get_location('GS Kakariko Watchtower'), "has('Slingshot') or has_explosives() and nighttime()")
+    set_rule(world.get_location('GS Kakariko Above Impa\'s House'), "has('Progressive Hookshot') and is_adult() and nighttime()")
+    set_rule(world.get_location('GS Graveyard Wall'), "has('Boomerang') and nighttime()")
+    set_rule(world.get_location('GS Graveyard Bean Patch'), "has_bottle()")
+    set_rule(world.get_location('GS Mountain Trail Bean Patch'), "has_bottle() and (has_explosives() or has('Progressive Strength Upgrade'))")
+    set_rule(world.get_location('GS Mountain Trail Bomb Alcove'), "can_blast_or_smash()")
+    set_rule(world.get_location('GS Mountain Trail Path to Crater'), "has('Hammer') and is_adult() and nighttime()")
+    set_rule(world.get_location('GS Mountain Trail Above Dodongo\'s Cavern'), "has('Hammer') and is_adult() and nighttime()")
+    set_rule(world.get_location('GS Goron City Boulder Maze'), "has_explosives()")
+    set_rule(world.get_location('GS Goron City Center Platform'), "is_adult()")
+    set_rule(world.get_location('GS Death Mounter Bean Patch'), "can_play('Bolero of Fire') and has_bottle()")
+    set_rule(world.get_location('GS Dodongo\'s Cavern Vines Above Stairs'), "has_explosives() or (has('Boomerang') or has('Slingshot') and has('Progressive Strength Upgrade')) or (has('Dins Fire') and has('Magic Meter')) or (has('Progressive Hookshot') or has('Bow') or has('Biggoron Sword'))")
+    set_rule(world.get_location('GS Dodongo\'s Cavern Alcove Above Stairs'), "(has('Progressive Hookshot') and is_adult()) or (has('Boomerang') and (has_explosives() or has('Progressive Strength Upgrade')))")
+    set_rule(world.get_location('GS Dodongo\'s Cavern Scarecrow'), "is_adult() and ( (has('Progressive Hookshot') and has_ocarina()) or has('Progressive Hookshot', 2) )")
+    set_rule(world.get_location('GS Zora River Ladder'), "nighttime()")
+    set_rule(world.get_location('GS Zora River Near Raised Grottos'), "has('Progressive Hookshot') and nighttime()")
+    set_rule(world.get_location('GS Zora River Above Bridge'), "has('Progressive Hookshot') and nighttime()")
+    set_rule(world.get_location('GS Zora\'s Domain Frozen Waterfall'), "nighttime() and (has('Progressive Hookshot') or has('Bow') or has('Magic Meter'))")
+    set_rule(world.get_location('GS Zora\'s Fountain Above the Log'), "has('Boomerang')")
+    set_rule(world.get_location('GS Zora\'s Fountain Hidden Cave'), "has('Progressive Strength Upgrade', 2) and can_blast_or_smash() and has('Progressive Hookshot') and nighttime()")
 # Jabu Jabu GS need no reqs becuase the access reqs for their zones cover them.
-    set_rule(world.get_location('GS Lake Hylia Bean Patch'), lambda state: state.has_bottle())
-    set_rule(world.get_location('GS Lake Hylia Lab Wall'), lambda state: state.has('Boomerang') and state.nighttime())
-    set_rule(world.get_location('GS Lake Hylia Small Island'), lambda state: state.nighttime())
-    set_rule(world.get_location('GS Lake Hylia Giant Tree'), lambda state: state.is_adult() and state.has('Progressive Hookshot', 2))
-    set_rule(world.get_location('GS Lab Underwater Crate'), lambda state: state.is_adult() and state.has('Iron Boots') and state.has('Progressive Hookshot'))
-    set_rule(world.get_location('GS Forest Temple First Room'), lambda state: (state.has('Progressive Hookshot') or state.has('Bow') or (state.has('Dins Fire') and state.has('Magic Meter'))) and state.is_adult())
-    set_rule(world.get_location('GS Forest Temple Lobby'), lambda state: state.has('Progressive Hookshot') and state.is_adult())
-    set_rule(world.get_location('GS Forest Temple Outdoor East'), lambda state: state.has('Progressive Hookshot') and state.is_adult())
-    set_rule(world.get_location('GS Forest Temple Outdoor West'), lambda state: (state.has('Progressive Hookshot', 2) or (state.has('Progressive Hookshot') and state.can_reach('Forest Temple Outside Upper Ledge'))) and state.is_adult())
-    set_rule(world.get_location('GS Forest Temple Basement'), lambda state: state.has('Progressive Hookshot'))
-    set_rule(world.get_location('GS Fire Temple Song of Time Room'), lambda state: state.has('Small Key (Fire Temple)', 1) and state.can_play('Song of Time'))
-    set_rule(world.get_location('GS Fire Temple Unmarked Bomb Wall'), lambda state: state.has('Small Key (Fire Temple)', 3) and state.has_explosives())
-    set_rule(world.get_location('GS Fire Temple East Tower Climb'), lambda state: state.has_ocarina() and state.has('Small Key (Fire Temple)', 5) and state.has('Progressive Hookshot') and state.is_adult())
-    set_rule(world.get_location('GS Fire Temple East Tower Top'), lambda state: state.has_ocarina() and state.has('Small Key (Fire Temple)', 5) and state.has('Progressive Hookshot') and state.is_adult())
-    set_rule(world.get_location('GS Fire Temple Basement'), lambda state: state.has('Hammer') and state.is_adult())
-    set_rule(world.get_location('GS Ice Cavern Spinning Scythe Room'), lambda state: state.has('Progressive Hookshot') and state.is_adult())
-    set_rule(world.get_location('GS Ice Cavern Heart Piece Room'), lambda state: state.has('Progressive Hookshot') and state.is_adult())
-    set_rule(world.get_location('GS Ice Cavern Push Block Room'), lambda state: state.has('Progressive Hookshot') and state.is_adult())
-    set_rule(world.get_location('GS Water Temple South Basement'), lambda state: state.has_explosives() and (state.has('Magic Meter') or state.has('Biggoron Sword')))
-    set_rule(world.get_location('GS Water Temple Serpent River'), lambda state: state.can_play('Song of Time') and state.has('Small Key (Water Temple)', 6))
-    set_rule(world.get_location('GS Water Temple Falling Platform Room'), lambda state: state.has('Progressive Hookshot', 2))
-    set_rule(world.get_location('GS Water Temple Central Room'), lambda state: state.has('Progressive Hookshot', 2))
-    set_rule(world.get_location('GS Water Temple Near Boss Key Chest'), lambda state: state.has('Progressive Hookshot', 2) and ((state.has_explosives() and state.has('Progressive Strength Upgrade')) or state.has('Hover Boots')) and state.has('Small Key (Water Temple)', 6)) #5 keys would be better but it wouldn't be compatible with the key for key scenarios, 6 will be identical pre-keysanity.
-    set_rule(world.get_location('GS Well West Inner Room'), lambda state: state.has('Small Key (Bottom of the Well)', 3) and state.has('Boomerang') and (state.has('Progressive Strength Upgrade') or state.has_explosives() or state.can_see_with_lens()))
-    set_rule(world.get_location('GS Well East Inner Room'), lambda state: state.has('Small Key (Bottom of the Well)', 3) and state.has('Boomerang'))
-    set_rule(world.get_location('GS Well Like Like Cage'), lambda state: state.has('Small Key (Bottom of the Well)', 3) and state.has('Boomerang'))
-    set_rule(world.get_location('GS Shadow Temple Like Like Room'), lambda state: state.has('Progressive Hookshot'))
-    set_rule(world.get_location('GS Shadow Temple Crusher Room'), lambda state: state.has('Progressive Hookshot'))
-    set_rule(world.get_location('GS Shadow Temple Near Ship'), lambda state: state.has('Progressive Hookshot', 2) and state.has('Progressive Strength Upgrade') and state.has('Small Key (Shadow Temple)', 4))
-    set_rule(world.get_location('GS Gerudo Valley Small Bridge'), lambda state: state.has('Boomerang') and state.nighttime())
-    set_rule(world.get_location('GS Gerudo Valley Bean Patch'), lambda state: state.has_bottle())
-    set_rule(world.get_location('GS Gerudo Valley Behind Tent'), lambda state: state.has('Progressive Hookshot') and state.is_adult() and state.nighttime())
-    set_rule(world.get_location('GS Gerudo Valley Pillar'), lambda state: state.has('Progressive Hookshot') and state.is_adult() and state.nighttime())
-    set_rule(world.get_location('GS Gerudo Fortress Archery Range'), lambda state: state.has('Progressive Hookshot') and state.has('Gerudo Membership Card') and state.is_adult() and state.nighttime())
-    set_rule(world.get_location('GS Gerudo Fortress Top Floor'), lambda state: state.nighttime())
-    set_rule(world.get_location('GS Wasteland Ruins'), lambda state: state.has('Progressive Hookshot') and state.is_adult())
-    set_rule(world.get_location('GS Desert Colossus Bean Patch'), lambda state: state.has_bottle() and state.can_play('Requiem of Spirit'))
-    set_rule(world.get_location('GS Desert Colossus Tree'), lambda state: state.has('Progressive Hookshot') and state.is_adult() and state.nighttime())
-    set_rule(world.get_location('GS Desert Colossus Hill'), lambda state: ((state.has('Magic Bean') and state.can_play('Requiem of Spirit')) or state.has('Progressive Hookshot', 2)) and state.is_adult() and state.nighttime())
-    set_rule(world.get_location('GS Spirit Temple Metal Fence'), lambda state: state.has('Boomerang') or state.has('Slingshot'))
-    set_rule(world.get_location('GS Spirit Temple Hall to West Iron Knuckle'), lambda state: (state.has('Boomerang') and state.has('Progressive Hookshot')) or (state.has('Boomerang') and state.has('Small Key (Spirit Temple)', 5) and state.has_explosives() and state.can_play('Requiem of Spirit')) or (state.has('Progressive Hookshot') and state.has('Progressive Strength Upgrade', 2) and state.is_adult() and state.has('Small Key (Spirit Temple)', 3)))
-    set_rule(world.get_location('GS Spirit Temple Boulder Room'), lambda state: state.can_play('Song of Time') and (state.has('Bow') or state.has('Progressive Hookshot') or state.has_explosives()))
-    set_rule(world.get_location('GS Spirit Temple Lobby'), lambda state: state.has('Progressive Strength Upgrade', 2) and state.has('Small Key (Spirit Temple)', 3) and state.is_adult() and (state.has('Progressive Hookshot', 2) or (state.has('Progressive Hookshot') and state.has_ocarina()) or state.has('Hover Boots')))
+    set_rule(world.get_location('GS Lake Hylia Bean Patch'), "has_bottle()")
+    set_rule(world.get_location('GS Lake Hylia Lab Wall'), "has('Boomerang') and nighttime()")
+    set_rule(world.get_location('GS Lake Hylia Small Island'), "nighttime()")
+    set_rule(world.get_location('GS Lake Hylia Giant Tree'), "is_adult() and has('Progressive Hookshot', 2)")
+    set_rule(world.get_location('GS Lab Underwater Crate'), "is_adult() and has('Iron Boots') and has('Progressive Hookshot')")
+    set_rule(world.get_location('GS Forest Temple First Room'), "(has('Progressive Hookshot') or has('Bow') or (has('Dins Fire') and has('Magic Meter'))) and is_adult()")
+    set_rule(world.get_location('GS Forest Temple Lobby'), "has('Progressive Hookshot') and is_adult()")
+    set_rule(world.get_location('GS Forest Temple Outdoor East'), "has('Progressive Hookshot') and is_adult()")
+    set_rule(world.get_location('GS Forest Temple Outdoor West'), "(has('Progressive Hookshot', 2) or (has('Progressive Hookshot') and can_reach('Forest Temple Outside Upper Ledge'))) and is_adult()")
+    set_rule(world.get_location('GS Forest Temple Basement'), "has('Progressive Hookshot')")
+    set_rule(world.get_location('GS Fire Temple Song of Time Room'), "has('Small Key (Fire Temple)', 1) and can_play('Song of Time')")
+    set_rule(world.get_location('GS Fire Temple Unmarked Bomb Wall'), "has('Small Key (Fire Temple)', 3) and has_explosives()")
+    set_rule(world.get_location('GS Fire Temple East Tower Climb'), "has_ocarina() and has('Small Key (Fire Temple)', 5) and has('Progressive Hookshot') and is_adult()")
+    set_rule(world.get_location('GS Fire Temple East Tower Top'), "has_ocarina() and has('Small Key (Fire Temple)', 5) and has('Progressive Hookshot') and is_adult()")
+    set_rule(world.get_location('GS Fire Temple Basement'), "has('Hammer') and is_adult()")
+    set_rule(world.get_location('GS Ice Cavern Spinning Scythe Room'), "has('Progressive Hookshot') and is_adult()")
+    set_rule(world.get_location('GS Ice Cavern Heart Piece Room'), "has('Progressive Hookshot') and is_adult()")
+    set_rule(world.get_location('GS Ice Cavern Push Block Room'), "has('Progressive Hookshot') and is_adult()")
+    set_rule(world.get_location('GS Water Temple South Basement'), "has_explosives() and (has('Magic Meter') or has('Biggoron Sword'))")
+    set_rule(world.get_location('GS Water Temple Serpent River'), "can_play('Song of Time') and has('Small Key (Water Temple)', 6)")
+    set_rule(world.get_location('GS Water Temple Falling Platform Room'), "has('Progressive Hookshot', 2)")
+    set_rule(world.get_location('GS Water Temple Central Room'), "has('Progressive Hookshot', 2)")
+    set_rule(world.get_location('GS Water Temple Near Boss Key Chest'), "has('Progressive Hookshot', 2) and ((has_explosives() and has('Progressive Strength Upgrade')) or has('Hover Boots')) and has('Small Key (Water Temple)', 6)") #5 keys would be better but it wouldn't be compatible with the key for key scenarios, 6 will be identical pre-keysanity.
+    set_rule(world.get_location('GS Well West Inner Room'), "has('Small Key (Bottom of the Well)', 3) and has('Boomerang') and (has('Progressive Strength Upgrade') or has_explosives() or can_see_with_lens())")
+    set_rule(world.get_location('GS Well East Inner Room'), "has('Small Key (Bottom of the Well)', 3) and has('Boomerang')")
+    set_rule(world.get_location('GS Well Like Like Cage'), "has('Small Key (Bottom of the Well)', 3) and has('Boomerang')")
+    set_rule(world.get_location('GS Shadow Temple Like Like Room'), "has('Progressive Hookshot')")
+    set_rule(world.get_location('GS Shadow Temple Crusher Room'), "has('Progressive Hookshot')")
+    set_rule(world.get_location('GS Shadow Temple Near Ship'), "has('Progressive Hookshot', 2) and has('Progressive Strength Upgrade') and has('Small Key (Shadow Temple)', 4)")
+    set_rule(world.get_location('GS Gerudo Valley Small Bridge'), "has('Boomerang') and nighttime()")
+    set_rule(world.get_location('GS Gerudo Valley Bean Patch'), "has_bottle()")
+    set_rule(world.get_location('GS Gerudo Valley Behind Tent'), "has('Progressive Hookshot') and is_adult() and nighttime()")
+    set_rule(world.get_location('GS Gerudo Valley Pillar'), "has('Progressive Hookshot') and is_adult() and nighttime()")
+    set_rule(world.get_location('GS Gerudo Fortress Archery Range'), "has('Progressive Hookshot') and has('Gerudo Membership Card') and is_adult() and nighttime()")
+    set_rule(world.get_location('GS Gerudo Fortress Top Floor'), "nighttime()")
+    set_rule(world.get_location('GS Wasteland Ruins'), "has('Progressive Hookshot') and is_adult()")
+    set_rule(world.get_location('GS Desert Colossus Bean Patch'), "has_bottle() and can_play('Requiem of Spirit')")
+    set_rule(world.get_location('GS Desert Colossus Tree'), "has('Progressive Hookshot') and is_adult() and nighttime()")
+    set_rule(world.get_location('GS Desert Colossus Hill'), "((has('Magic Bean') and can_play('Requiem of Spirit')) or has('Progressive Hookshot', 2)) and is_adult() and nighttime()")
+    set_rule(world.get_location('GS Spirit Temple Metal Fence'), "has('Boomerang') or has('Slingshot')")
+    set_rule(world.get_location('GS Spirit Temple Hall to West Iron Knuckle'), "(has('Boomerang') and has('Progressive Hookshot')) or (has('Boomerang') and has('Small Key (Spirit Temple)', 5) and has_explosives() and can_play('Requiem of Spirit')) or (has('Progressive Hookshot') and has('Progressive Strength Upgrade', 2) and is_adult() and has('Small Key (Spirit Temple)', 3))")
+    set_rule(world.get_location('GS Spirit Temple Boulder Room'), "can_play('Song of Time') and (has('Bow') or has('Progressive Hookshot') or has_explosives())")
+    set_rule(world.get_location('GS Spirit Temple Lobby'), "has('Progressive Strength Upgrade', 2) and has('Small Key (Spirit Temple)', 3) and is_adult() and (has('Progressive Hookshot', 2) or (has('Progressive Hookshot') and has_ocarina()) or has('Hover Boots'))")
 
     for location in world.get_locations():
         if location.type != 'Chest':
@@ -138,10 +138,10 @@ class Settings():
         for info in setting_infos:
             if info.name not in self.__dict__:
                 if info.type == bool:
-                    self.__dict__[info.name] = True if info.gui_params['default'] == 'checked' else False
+                    self.__dict__[info.name] = True if info.gui_params and info.gui_params['default'] == 'checked' else False
                 if info.type == str:
                     if 'default' in info.args_params:
-                        self.__dict__[info.name] = info.gui_params['default'] or info.args_params['default']
+                        self.__dict__[info.name] = (info.gui_params and info.gui_params['default']) or info.args_params['default']
                     else:
                         self.__dict__[info.name] = ""
                 if info.type == int:
@@ -173,6 +173,13 @@ setting_infos = [
                     time).
                     ''',
             'type': int}),
+    Setting_Info('worker_count', int, 0, False, {
+            'help': '''\
+                    Number of processes used to generate the seeds of a batch
+                    (see --count) in parallel. Defaults to one per cpu. Each seed
+                    produces the same output no matter how many are used.
+                    ''',
+            'type': int}),
     Setting_Info('world_count', int, 0, False, {
             'help': '''\
                     Use to create a multi-world generation for co-op seeds.
@@ -218,6 +225,43 @@ setting_infos = [
             'widget': 'Checkbutton',
             'default': 'unchecked'
         }),
+    Setting_Info('create_patch', bool, 0, False, 
+        {
+            'help': 'Create a small patch file instead of the full output rom. Use --patch_file to turn it back into a rom.',
+            'action': 'store_true'
+        },
+        {
+            'text': 'Create Patch File instead of Rom',
+            'group': 'rom_tab',
+            'widget': 'Checkbutton',
+            'default': 'unchecked'
+        }),
+    Setting_Info('patch_file', str, 0, False, {
+            'default': '',
+            'help': 'Path to a patch file created with --create_patch. The patch is applied to --rom and the patched rom is written to the output directory.'
+        }),
+    Setting_Info('create_stats', bool, 0, False, 
+        {
+            'help': 'Write the time spent in each generation phase and reachability counters to a _Stats.json file next to the spoiler log.',
+            'action': 'store_true'
+        }),
+    Setting_Info('profile', bool, 0, False, 
+        {
+            'help': 'Run the generation under cProfile and write the profile to a .prof file in the output directory.',
+            'action': 'store_true'
+        }),
+    Setting_Info('fill_mode', str, 0, False, {
+            'default': 'incremental',
+            'const': 'incremental',
+            'nargs': '?',
+            'choices': ['incremental', 'rebuild'],
+            'help': '''\
+                    Select how the item placement keeps track of what can still be
+                    reached while it removes items from the pool. Both modes place
+                    items identically. (default: %(default)s)
+                    Incremental: Update the reachable locations as each item is placed.
+                    Rebuild:     Recompute the reachable locations from scratch for each item.
+                    '''}),
     Setting_Info('open_forest', bool, 1, True, 
         {
             'help': '''\
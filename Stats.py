@@ -0,0 +1,78 @@
+from collections import OrderedDict
+from contextlib import contextmanager
+import cProfile
+import json
+import time
+
+
+# Timings and counters for the seed that is being generated. Main.main resets
+# them at the start of every seed, and writes them next to the spoiler log
+# with create_stats.
+class SeedStats(object):
+
+    def __init__(self):
+        self.profiler = None
+        self.reset()
+
+    def reset(self, profile=False):
+        self.stop_profile()
+        self.start_wall = time.perf_counter()
+        self.start_cpu = time.process_time()
+        self.phases = OrderedDict()
+
+        # can_reach is called far too often for anything slower than
+        # incrementing an attribute, so CollectionState counts these directly
+        self.can_reach_calls = 0
+        self.region_cache_hits = 0
+        self.region_sweeps = 0
+
+        if profile:
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+
+    # Adds the wall and cpu time of the with block to the named phase. A phase
+    # that runs more than once, like a fill_songs attempt, adds up every run
+    @contextmanager
+    def phase(self, name):
+        start_wall = time.perf_counter()
+        start_cpu = time.process_time()
+        try:
+            yield
+        finally:
+            if name not in self.phases:
+                self.phases[name] = OrderedDict([('wall', 0.0), ('cpu', 0.0), ('calls', 0)])
+            phase = self.phases[name]
+            phase['wall'] += time.perf_counter() - start_wall
+            phase['cpu'] += time.process_time() - start_cpu
+            phase['calls'] += 1
+
+    def total_wall(self):
+        return time.perf_counter() - self.start_wall
+
+    def to_dict(self):
+        return OrderedDict([
+            ('total', OrderedDict([('wall', self.total_wall()), ('cpu', time.process_time() - self.start_cpu)])),
+            ('phases', self.phases),
+            ('counters', OrderedDict([
+                ('can_reach_calls', self.can_reach_calls),
+                ('region_cache_hits', self.region_cache_hits),
+                ('region_sweeps', self.region_sweeps),
+            ])),
+        ])
+
+    def to_file(self, filename):
+        with open(filename, 'w') as outfile:
+            json.dump(self.to_dict(), outfile, indent=4)
+
+    # Writes the cProfile data of the seed so far, see pstats to read it
+    def write_profile(self, filename):
+        if self.profiler is not None:
+            self.profiler.dump_stats(filename)
+
+    def stop_profile(self):
+        if self.profiler is not None:
+            self.profiler.disable()
+            self.profiler = None
+
+
+stats = SeedStats()
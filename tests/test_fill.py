@@ -0,0 +1,88 @@
+import random
+import unittest
+
+from BaseClasses import World, CollectionState
+from Dungeons import create_dungeons
+from EntranceShuffle import link_entrances
+import Fill
+from ItemList import generate_itempool
+from Regions import create_regions
+from Rules import set_rules, specialize_rules
+from Settings import Settings, setting_infos
+
+
+# Sets up the worlds the same way Main.generate does, up to the fill
+def make_worlds(seed, **settings_dict):
+    values = {info.name: info.args_params.get('default', False if info.type == bool else None) for info in setting_infos}
+    values.update(seed=seed, world_count=1, player_num=1)
+    values.update(settings_dict)
+    settings = Settings(values)
+
+    worlds = [World(settings) for _ in range(settings.world_count)]
+    random.seed(worlds[0].numeric_seed)
+    for id, world in enumerate(worlds):
+        world.id = id
+        create_regions(world)
+        create_dungeons(world)
+        link_entrances(world)
+        set_rules(world)
+        generate_itempool(world)
+        specialize_rules(world)
+    return worlds
+
+
+def get_placements(worlds):
+    return [[(location.name, location.item.name, location.item.world.id) for location in world.get_locations()] for world in worlds]
+
+
+def get_state_summary(state_list):
+    return [(list(state.prog_items), sorted(state.collected_locations)) for state in state_list]
+
+
+class TestIncrementalExploration(unittest.TestCase):
+
+    def setUp(self):
+        self.get_states = Fill.IncrementalExploration.get_states
+
+    def tearDown(self):
+        Fill.IncrementalExploration.get_states = self.get_states
+
+    # Every call has to give the same states as building them from scratch.
+    # Without keysanity, the dungeon items and songs are placed first with
+    # base states that already collected what they can reach
+    def check_seed(self, seed, **settings_dict):
+        calls = []
+        get_states = self.get_states
+
+        def checked_get_states(exploration):
+            state_list = get_states(exploration)
+            rebuilt_state_list = CollectionState.get_states_with_items(exploration.base_state_list, exploration.itempool)
+            calls.append((get_state_summary(state_list), get_state_summary(rebuilt_state_list)))
+            return state_list
+
+        Fill.IncrementalExploration.get_states = checked_get_states
+        worlds = make_worlds(seed, **settings_dict)
+        Fill.distribute_items_restrictive(worlds, fill_mode='incremental')
+        incremental_placements = get_placements(worlds)
+        Fill.IncrementalExploration.get_states = get_states
+
+        self.assertTrue(calls)
+        for number, (state_summary, rebuilt_state_summary) in enumerate(calls):
+            self.assertEqual(state_summary, rebuilt_state_summary, 'States differ at call %d' % number)
+
+        worlds = make_worlds(seed, **settings_dict)
+        Fill.distribute_items_restrictive(worlds, fill_mode='rebuild')
+        self.assertEqual(incremental_placements, get_placements(worlds))
+
+    def test_single_world(self):
+        self.check_seed('FILLTEST1')
+
+    def test_multiworld(self):
+        self.check_seed('FILLTEST2', world_count=2)
+
+    def test_keysanity(self):
+        self.check_seed('FILLTEST3', keysanity=True)
+
+
+if __name__ == '__main__':
+    unittest.main()